@@ -0,0 +1,188 @@
+"""Run the Bookoo integration in a test Home Assistant with simulated scales."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from tempfile import TemporaryDirectory
+import time
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
+
+from homeassistant import loader
+from homeassistant.components.bluetooth import BluetoothChange
+from homeassistant.const import CONF_ADDRESS, EVENT_STATE_CHANGED
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Event,
+    EventStateChangedData,
+    HomeAssistant,
+    callback,
+)
+from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+from custom_components.bookoo.const import CONF_IS_VALID_SCALE, DOMAIN
+from custom_components.bookoo.coordinator import BookooCoordinator
+
+from .simulator import SimulatedBookooScale
+
+
+@dataclass
+class Harness:
+    """A running Home Assistant with one config entry per simulated scale."""
+
+    hass: HomeAssistant
+    entries: list[MockConfigEntry]
+    state_writes: dict[str, int] = field(default_factory=dict)
+    # advertisement callbacks of the coordinators by scale address
+    advertisement_callbacks: dict[str, Callable[..., None]] = field(
+        default_factory=dict
+    )
+    # perf_counter at the start of the setup and seconds the setup took,
+    # including all config entries
+    setup_start: float = 0.0
+    setup_time: float = 0.0
+
+    @property
+    def coordinators(self) -> list[BookooCoordinator]:
+        """Return the coordinators of the entries."""
+        return [entry.runtime_data for entry in self.entries]
+
+    @property
+    def scales(self) -> list[SimulatedBookooScale]:
+        """Return the simulated scales."""
+        return [
+            coordinator.scale  # type: ignore[misc]
+            for coordinator in self.coordinators
+        ]
+
+    @property
+    def total_state_writes(self) -> int:
+        """Return the number of state writes, only Bookoo entities exist here."""
+        return sum(self.state_writes.values())
+
+    def reset_counters(self) -> None:
+        """Forget the state writes counted so far."""
+        self.state_writes.clear()
+
+    def advertise(self, index: int = 0) -> None:
+        """Deliver an advertisement of a simulated scale."""
+        address = scale_address(index)
+        self.advertisement_callbacks[address](
+            SimpleNamespace(address=address), BluetoothChange.ADVERTISEMENT
+        )
+
+    async def async_wait_connected(self, timeout: float = 10.0) -> None:
+        """Wait until all scales connected in the background."""
+        async with asyncio.timeout(timeout):
+            while not all(scale.connected for scale in self.scales):
+                await asyncio.sleep(0.001)
+
+
+def scale_address(index: int) -> str:
+    """Return the address of the simulated scale with the given index."""
+    return f"AA:BB:CC:00:{index // 256:02X}:{index % 256:02X}"
+
+
+@asynccontextmanager
+async def async_bookoo_harness(
+    scale_count: int = 1,
+    *,
+    connect_delay: float = 0.0,
+    powered_on: bool = True,
+    wait_connected: bool = True,
+    options: dict[str, Any] | None = None,
+) -> AsyncIterator[Harness]:
+    """Set up the integration with simulated scales and count state writes.
+
+    Scales connect in the background after setup, by default the harness
+    waits for them so replayed samples aren't dropped.
+    """
+    with TemporaryDirectory() as config_dir:
+        async with _async_harness(
+            config_dir, scale_count, connect_delay, powered_on, options or {}
+        ) as harness:
+            if wait_connected:
+                await harness.async_wait_connected()
+            yield harness
+
+
+@asynccontextmanager
+async def _async_harness(
+    config_dir: str,
+    scale_count: int,
+    connect_delay: float,
+    powered_on: bool,
+    options: dict[str, Any],
+) -> AsyncIterator[Harness]:
+    """Set up the integration in a Home Assistant using config_dir."""
+    async with async_test_home_assistant(config_dir=config_dir) as hass:
+        # what the enable_custom_integrations fixture does
+        hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+        # the simulated scales need neither a Bluetooth adapter nor the
+        # websocket API, whose commands are registered all the same
+        hass.config.components.update(
+            {"bluetooth", "bluetooth_adapters", "websocket_api"}
+        )
+
+        entries = []
+        for index in range(scale_count):
+            entry = MockConfigEntry(
+                domain=DOMAIN,
+                title=f"BOOKOO_SC {index}",
+                unique_id=scale_address(index),
+                data={CONF_ADDRESS: scale_address(index), CONF_IS_VALID_SCALE: True},
+                options=options,
+            )
+            entry.add_to_hass(hass)
+            entries.append(entry)
+        harness = Harness(hass, entries)
+
+        def create_scale(**kwargs: Any) -> SimulatedBookooScale:
+            scale = SimulatedBookooScale(**kwargs)
+            scale.connect_delay = connect_delay
+            scale.powered_on = powered_on
+            return scale
+
+        @callback
+        def register_advertisements(
+            hass: HomeAssistant,
+            advertisement_callback: Callable[..., None],
+            matcher: dict[str, Any],
+            mode: Any,
+        ) -> CALLBACK_TYPE:
+            address = matcher[CONF_ADDRESS]
+            harness.advertisement_callbacks[address] = advertisement_callback
+            return lambda: harness.advertisement_callbacks.pop(address, None)
+
+        @callback
+        def count_state_write(event: Event[EventStateChangedData]) -> None:
+            entity_id = event.data["entity_id"]
+            harness.state_writes[entity_id] = harness.state_writes.get(entity_id, 0) + 1
+
+        with (
+            patch("custom_components.bookoo.coordinator.BookooScale", create_scale),
+            patch(
+                "custom_components.bookoo.coordinator.async_register_callback",
+                register_advertisements,
+            ),
+        ):
+            harness.setup_start = time.perf_counter()
+            assert await async_setup_component(hass, DOMAIN, {})
+            harness.setup_time = time.perf_counter() - harness.setup_start
+            await hass.async_block_till_done()
+            unsubscribe = hass.bus.async_listen(EVENT_STATE_CHANGED, count_state_write)
+            try:
+                yield harness
+            finally:
+                unsubscribe()
+                for entry in entries:
+                    await hass.config_entries.async_unload(entry.entry_id)
+                await hass.async_block_till_done()
@@ -0,0 +1,456 @@
+"""Benchmarks of the Bookoo integration driven by simulated scales.
+
+Run from the repository root, e.g.::
+
+    python -m benchmarks.run
+    python -m benchmarks.run throughput memory --speed 50
+    python -m benchmarks.run writes --trace shot.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable
+import gc
+import json
+from pathlib import Path
+import sys
+import time
+import tracemalloc
+
+from homeassistant.const import STATE_UNAVAILABLE
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.device_registry import format_mac
+
+from custom_components.bookoo.const import (
+    CONF_IDLE_TIMEOUT,
+    CONF_SPIKE_FILTER,
+    DOMAIN,
+)
+from custom_components.bookoo.metrics import Histogram
+from custom_components.bookoo.snapshot import ScaleSnapshot
+from custom_components.bookoo.spikes import SpikeFilter
+
+from .harness import Harness, async_bookoo_harness
+from .simulator import (
+    SAMPLE_INTERVAL,
+    Sample,
+    add_spikes,
+    load_trace,
+    session_stream,
+    shot_stream,
+)
+
+# simulated scales of the scaling benchmark
+SCALING_COUNTS = (1, 4, 12)
+# seconds a connection attempt takes in the startup benchmark
+STARTUP_CONNECT_DELAY = 2.0
+# minutes without use before the idle benchmark's scale is disconnected
+IDLE_TIMEOUT = 0.05
+# seconds a connection attempt takes in the idle benchmark
+IDLE_CONNECT_DELAY = 0.5
+# samples per injected spike in the spikes benchmark
+SPIKE_EVERY = 50
+
+# imported in a fresh interpreter by the import benchmark; Home Assistant has
+# loaded the dependencies and entity platforms before the integration anyway
+IMPORT_PROBE = """
+import importlib, json, sys, time, tracemalloc
+import homeassistant.components.binary_sensor
+import homeassistant.components.bluetooth
+import homeassistant.components.button
+import homeassistant.components.number
+import homeassistant.components.sensor
+import homeassistant.components.switch
+import homeassistant.components.websocket_api
+import homeassistant.helpers.restore_state
+import homeassistant.helpers.update_coordinator
+before = set(sys.modules)
+tracemalloc.start()
+start = time.perf_counter()
+importlib.import_module("custom_components.bookoo")
+for platform in ("binary_sensor", "button", "number", "sensor", "switch"):
+    importlib.import_module(f"custom_components.bookoo.{platform}")
+elapsed = time.perf_counter() - start
+memory = tracemalloc.get_traced_memory()[0]
+optional = ("numpy", "pyarrow", "sqlalchemy", "homeassistant.components.recorder")
+print(json.dumps({
+    "import_ms": elapsed * 1000,
+    "import_kib": memory / 1024,
+    "modules_loaded": len(set(sys.modules) - before),
+    "optional_loaded": sum(name in sys.modules for name in optional),
+}))
+"""
+
+type Results = dict[str, float | None]
+type Benchmark = Callable[[argparse.Namespace], Awaitable[Results]]
+
+BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def benchmark(name: str) -> Callable[[Benchmark], Benchmark]:
+    """Register a benchmark."""
+
+    def register(func: Benchmark) -> Benchmark:
+        BENCHMARKS[name] = func
+        return func
+
+    return register
+
+
+def _shot(args: argparse.Namespace) -> list[Sample]:
+    """Return the stream of a single shot, recorded or synthetic."""
+    if args.trace is not None:
+        return load_trace(args.trace)
+    return list(shot_stream(seed=args.seed))
+
+
+async def _probe_loop_lag(
+    stop: asyncio.Event, lag: Histogram, interval: float = 0.005
+) -> None:
+    """Record how late the event loop wakes up a sleeping task, in ms."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lag.record(max(loop.time() - start - interval, 0.0) * 1000)
+
+
+async def _async_replay_with_probe(
+    harness: Harness, samples: list[Sample], speed: float
+) -> Histogram:
+    """Replay samples on all scales and return the event loop lag."""
+    lag = Histogram()
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe_loop_lag(stop, lag))
+    await asyncio.gather(*(scale.replay(samples, speed) for scale in harness.scales))
+    stop.set()
+    await probe
+    return lag
+
+
+@benchmark("throughput")
+async def bench_throughput(args: argparse.Namespace) -> Results:
+    """Notifications handled per second when replaying as fast as possible."""
+    samples = list(session_stream(shots=5, seed=args.seed))
+    async with async_bookoo_harness(args.scales) as harness:
+        start = time.perf_counter()
+        counts = await asyncio.gather(
+            *(scale.replay(samples, speed=0) for scale in harness.scales)
+        )
+        await harness.hass.async_block_till_done()
+        elapsed = time.perf_counter() - start
+        notifications = sum(counts)
+        callback_time = harness.coordinators[0].metrics.callback_time
+        return {
+            "notifications": notifications,
+            "notifications_per_s": notifications / elapsed,
+            "callback_p50_ms": callback_time.percentile(50),
+            "callback_p99_ms": callback_time.percentile(99),
+            "state_writes_per_notification": (
+                harness.total_state_writes / notifications
+            ),
+        }
+
+
+@benchmark("writes")
+async def bench_writes(args: argparse.Namespace) -> Results:
+    """State writes caused by a single shot replayed at the given speed."""
+    samples = _shot(args)
+    async with async_bookoo_harness() as harness:
+        harness.reset_counters()
+        notifications = await harness.scales[0].replay(samples, speed=args.speed)
+        await harness.hass.async_block_till_done()
+        results: Results = {
+            "notifications": notifications,
+            "state_writes_per_shot": harness.total_state_writes,
+            "state_writes_dropped": harness.coordinators[0].state_writes_dropped,
+        }
+        results.update(
+            (f"writes.{entity_id}", count)
+            for entity_id, count in sorted(harness.state_writes.items())
+        )
+        return results
+
+
+@benchmark("loop_blocking")
+async def bench_loop_blocking(args: argparse.Namespace) -> Results:
+    """Event loop lag while scales stream at the given speed."""
+    samples = list(session_stream(shots=2, seed=args.seed))
+    async with async_bookoo_harness(args.scales) as harness:
+        lag = await _async_replay_with_probe(harness, samples, args.speed)
+        callback_time = harness.coordinators[0].metrics.callback_time
+        return {
+            "loop_lag_p50_ms": lag.percentile(50),
+            "loop_lag_p99_ms": lag.percentile(99),
+            "loop_lag_max_ms": lag.max,
+            "callback_max_ms": callback_time.max,
+        }
+
+
+@benchmark("scaling")
+async def bench_scaling(args: argparse.Namespace) -> Results:
+    """Event loop lag and per scale cost with a growing number of scales."""
+    samples = list(shot_stream(seed=args.seed))
+    results: Results = {}
+    for count in SCALING_COUNTS:
+        async with async_bookoo_harness(count) as harness:
+            lag = await _async_replay_with_probe(harness, samples, args.speed)
+            metrics = [coordinator.metrics for coordinator in harness.coordinators]
+            results[f"{count}_scales.loop_lag_p99_ms"] = lag.percentile(99)
+            results[f"{count}_scales.loop_lag_max_ms"] = lag.max
+            results[f"{count}_scales.callback_p99_ms"] = max(
+                metric.callback_time.percentile(99) or 0.0 for metric in metrics
+            )
+            results[f"{count}_scales.connect_wait_max_ms"] = max(
+                metric.connect_wait.max for metric in metrics
+            )
+    return results
+
+
+@benchmark("memory")
+async def bench_memory(args: argparse.Namespace) -> Results:
+    """Memory retained after streaming an hour of notifications."""
+    hour = round(3600 / SAMPLE_INTERVAL)
+    stream = session_stream(shots=12, idle_between=240, seed=args.seed)
+    samples = list(stream)[:hour]
+    async with async_bookoo_harness() as harness:
+        scale = harness.scales[0]
+        # warm up so caches and the sample buffer allocation are not counted
+        await scale.replay(samples[:600], speed=0)
+        await harness.hass.async_block_till_done()
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        await scale.replay(samples, speed=0)
+        await harness.hass.async_block_till_done()
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {
+            "notifications": len(samples),
+            "retained_kib_per_hour": (current - before) / 1024,
+            "peak_kib": (peak - before) / 1024,
+        }
+
+
+@benchmark("commands")
+async def bench_commands(args: argparse.Namespace) -> Results:
+    """BLE writes sent for a burst of slider moves, a tare and a start."""
+    async with async_bookoo_harness() as harness:
+        hass = harness.hass
+        scale = harness.scales[0]
+        # a slow Bluetooth proxy
+        scale.command_delay = 0.05
+        registry = er.async_get(hass)
+
+        def entity_id(platform: str, key: str) -> str:
+            unique_id = f"{format_mac(scale.mac)}_{key}"
+            entity_id = registry.async_get_entity_id(platform, DOMAIN, unique_id)
+            assert entity_id is not None
+            return entity_id
+
+        beep_level = entity_id("number", "beep_level")
+        calls = [
+            hass.services.async_call(
+                "number",
+                "set_value",
+                {"entity_id": beep_level, "value": level % 6},
+                blocking=True,
+            )
+            for level in range(20)
+        ]
+        calls.extend(
+            hass.services.async_call(
+                "button", "press", {"entity_id": entity_id("button", key)}, True
+            )
+            for key in ("tare", "start")
+        )
+        await asyncio.gather(*calls)
+        command_time = harness.coordinators[0].metrics.command_time
+        return {
+            "commands_requested": len(calls),
+            "writes_sent": len(scale.commands),
+            "beep_level_p95_ms": command_time["beep_level"].percentile(95),
+            "tare_and_start_p95_ms": (
+                command_time["tare_and_start"].percentile(95)
+                if "tare_and_start" in command_time
+                else None
+            ),
+        }
+
+
+@benchmark("startup")
+async def bench_startup(args: argparse.Namespace) -> Results:
+    """Setup time and entities created with slow and switched off scales."""
+    results: Results = {}
+    for name, powered_on in (("slow_scale", True), ("scale_off", False)):
+        async with async_bookoo_harness(
+            args.scales,
+            connect_delay=STARTUP_CONNECT_DELAY,
+            powered_on=powered_on,
+            wait_connected=False,
+        ) as harness:
+            hass = harness.hass
+            registry = er.async_get(hass)
+            entities = [
+                entity
+                for entry in harness.entries
+                for entity in er.async_entries_for_config_entry(
+                    registry, entry.entry_id
+                )
+            ]
+            results[f"{name}_setup_ms"] = harness.setup_time * 1000
+            results[f"{name}_entities"] = sum(
+                hass.states.get(entity.entity_id) is not None for entity in entities
+            )
+            if powered_on:
+                await harness.async_wait_connected()
+                results[f"{name}_connected_ms"] = (
+                    time.perf_counter() - harness.setup_start
+                ) * 1000
+    return results
+
+
+@benchmark("idle")
+async def bench_idle(args: argparse.Namespace) -> Results:
+    """Connection released by an idle scale and the latency of getting it back."""
+    async with async_bookoo_harness(
+        connect_delay=IDLE_CONNECT_DELAY, options={CONF_IDLE_TIMEOUT: IDLE_TIMEOUT}
+    ) as harness:
+        hass = harness.hass
+        coordinator = harness.coordinators[0]
+        start = time.perf_counter()
+        # released on the first poll after the timeout
+        async with asyncio.timeout(30):
+            while not coordinator.idle:
+                await asyncio.sleep(0.1)
+        released = time.perf_counter() - start
+        # the released scale advertises right away, that mustn't reconnect it
+        harness.advertise()
+        await hass.async_block_till_done()
+        idle_after_advertisement = coordinator.idle and not harness.scales[0].connected
+
+        registry = er.async_get(hass)
+        states = [
+            state
+            for entity in er.async_entries_for_config_entry(
+                registry, harness.entries[0].entry_id
+            )
+            if (state := hass.states.get(entity.entity_id)) is not None
+        ]
+        start = time.perf_counter()
+        await coordinator.commands.async_submit("tare", lambda scale: scale.tare())
+        return {
+            "released_after_s": released,
+            "entities": len(states),
+            "available_while_idle": sum(
+                state.state != STATE_UNAVAILABLE for state in states
+            ),
+            "idle_after_advertisement": idle_after_advertisement,
+            "tare_after_idle_ms": (time.perf_counter() - start) * 1000,
+            "slot_time_saved_s": coordinator.metrics.slot_time_saved(time.monotonic()),
+            "connected": harness.scales[0].connected,
+        }
+
+
+@benchmark("spikes")
+async def bench_spikes(args: argparse.Namespace) -> Results:
+    """Cost of the spike filter per sample and the spikes it caught."""
+    samples, spikes = add_spikes(
+        session_stream(shots=5, seed=args.seed), SPIKE_EVERY, seed=args.seed
+    )
+    snapshots = [
+        ScaleSnapshot(True, weight, flow_rate, timer)
+        for _, weight, flow_rate, timer in samples
+    ]
+    spike_filter = SpikeFilter()
+    start = time.perf_counter()
+    filtered = [spike_filter.filter(snapshot) for snapshot in snapshots]
+    elapsed = time.perf_counter() - start
+    rejected = {
+        index
+        for index, (snapshot, result) in enumerate(
+            zip(snapshots, filtered, strict=True)
+        )
+        if result.weight != snapshot.weight
+    }
+
+    async with async_bookoo_harness(
+        args.scales, options={CONF_SPIKE_FILTER: True}
+    ) as harness:
+        await asyncio.gather(
+            *(scale.replay(samples, speed=0) for scale in harness.scales)
+        )
+        await harness.hass.async_block_till_done()
+        callback_time = harness.coordinators[0].metrics.callback_time
+        return {
+            "samples": len(samples),
+            "filter_us_per_sample": elapsed / len(samples) * 1e6,
+            "spikes_injected": len(spikes),
+            "spikes_rejected": len(rejected & spikes),
+            # the first two samples of each real step, e.g. removing the cup
+            "step_samples_delayed": len(rejected - spikes),
+            # what the filter's own counters report for the same stream
+            "counted_rejected": spike_filter.rejected,
+            "counted_delayed": spike_filter.delayed,
+            "callback_p50_ms": callback_time.percentile(50),
+            "callback_p99_ms": callback_time.percentile(99),
+        }
+
+
+@benchmark("import")
+async def bench_import(args: argparse.Namespace) -> Results:
+    """Time and memory to import the integration and its platforms."""
+    process = await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-c",
+        IMPORT_PROBE,
+        cwd=Path(__file__).parent.parent,
+        stdout=asyncio.subprocess.PIPE,
+    )
+    stdout, _ = await process.communicate()
+    if process.returncode:
+        raise RuntimeError("Importing the integration failed")
+    results: Results = json.loads(stdout)
+    return results
+
+
+def _format(name: str, results: Results) -> list[str]:
+    """Format the results of a benchmark as lines."""
+    lines = []
+    for metric, value in results.items():
+        text = "-" if value is None else f"{value:.3f}".rstrip("0").rstrip(".")
+        lines.append(f"{name}.{metric} {text}")
+    return lines
+
+
+def main() -> None:
+    """Run the selected benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "benchmarks", nargs="*", metavar="BENCHMARK", help=", ".join(BENCHMARKS)
+    )
+    parser.add_argument(
+        "--speed", type=float, default=10.0, help="replay speed, 1 is real time"
+    )
+    parser.add_argument("--scales", type=int, default=1, help="simulated scales")
+    parser.add_argument("--trace", type=Path, help="recorded shot, CSV or JSON Lines")
+    parser.add_argument("--seed", type=int, default=1, help="seed of the streams")
+    parser.add_argument("--output", type=Path, help="also write results to a file")
+    args = parser.parse_args()
+    if unknown := set(args.benchmarks) - set(BENCHMARKS):
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    lines = []
+    for name in args.benchmarks or BENCHMARKS:
+        for line in _format(name, asyncio.run(BENCHMARKS[name](args))):
+            print(line, flush=True)
+            lines.append(line)
+    if args.output is not None:
+        args.output.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
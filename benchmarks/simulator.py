@@ -0,0 +1,317 @@
+"""Simulated Bookoo scale replaying recorded or synthetic notification streams."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Iterable, Iterator
+import csv
+from dataclasses import dataclass
+import json
+import math
+from pathlib import Path
+import random
+import time
+
+from aiobookoo.exceptions import BookooDeviceNotFound
+
+# the real scale notifies about 10 times per second while streaming
+SAMPLE_INTERVAL = 0.1
+
+# seconds since the start of the stream, weight, flow rate, timer
+type Sample = tuple[float, float, float, float]
+
+
+@dataclass
+class SimulatedDeviceState:
+    """Device state as decoded by aiobookoo."""
+
+    battery_level: int = 87
+    unit: str = "g"
+    buzzer_gear: int = 3
+    standby_time: int = 5
+    flow_rate_smoothing: bool = False
+
+
+class SimulatedBookooScale:
+    """Drop-in replacement for aiobookoo.bookooscale.BookooScale.
+
+    Nothing is sent over Bluetooth: ``push`` and ``replay`` set the decoded
+    values and call the notify callback like the notification handler of
+    the real scale does.
+    """
+
+    def __init__(
+        self,
+        address_or_ble_device: str,
+        name: str | None = None,
+        is_valid_scale: bool = True,
+        notify_callback: Callable[[], None] | None = None,
+    ) -> None:
+        """Initialize the scale."""
+        self.address = self.mac = address_or_ble_device
+        self.name = name
+        self.model = "Themis"
+        self.is_valid_scale = is_valid_scale
+        self._notify_callback = notify_callback
+
+        self.connected = False
+        self.weight: float | None = None
+        self.flow_rate: float | None = None
+        self.timer: float | None = None
+        self.device_state: SimulatedDeviceState | None = None
+        self.last_disconnect_time: float | None = None
+        self.process_queue_task: asyncio.Task[None] | None = None
+
+        # knobs and counters used by the benchmarks
+        self.powered_on = True
+        self.connect_delay = 0.0
+        self.command_delay = 0.0
+        self.connect_attempts = 0
+        self.commands: list[tuple[str, object]] = []
+
+    def _notify(self) -> None:
+        """Call the notify callback."""
+        if self._notify_callback is not None:
+            self._notify_callback()
+
+    async def connect(self, setup_tasks: bool = True) -> None:
+        """Connect to the scale."""
+        self.connect_attempts += 1
+        if self.connect_delay:
+            await asyncio.sleep(self.connect_delay)
+        if not self.powered_on:
+            raise BookooDeviceNotFound("Simulated scale is powered off")
+        self.connected = True
+        self.device_state = SimulatedDeviceState()
+        self.weight = 0.0
+        self.flow_rate = 0.0
+        self.timer = 0.0
+        self._notify()
+
+    async def disconnect(self) -> None:
+        """Disconnect from the scale."""
+        self.device_disconnected_handler()
+
+    async def process_queue(self) -> None:
+        """Wait until disconnected, the real scale processes its queue here."""
+        while self.connected:
+            await asyncio.sleep(1)
+
+    def device_disconnected_handler(self, notify: bool = True) -> None:
+        """Handle a disconnect."""
+        self.connected = False
+        self.last_disconnect_time = time.time()
+        if notify:
+            self._notify()
+
+    async def _command(self, name: str, value: object = None) -> None:
+        """Record a command and simulate its round trip."""
+        self.commands.append((name, value))
+        if self.command_delay:
+            await asyncio.sleep(self.command_delay)
+
+    async def tare(self) -> None:
+        """Tare the scale."""
+        await self._command("tare")
+        self.push(0.0, 0.0, self.timer or 0.0)
+
+    async def reset_timer(self) -> None:
+        """Reset the timer."""
+        await self._command("reset_timer")
+        self.push(self.weight or 0.0, self.flow_rate or 0.0, 0.0)
+
+    async def start_timer(self) -> None:
+        """Start the timer."""
+        await self._command("start_timer")
+
+    async def stop_timer(self) -> None:
+        """Stop the timer."""
+        await self._command("stop_timer")
+
+    async def tare_and_start_timer(self) -> None:
+        """Tare and start the timer."""
+        await self._command("tare_and_start_timer")
+        self.push(0.0, 0.0, 0.0)
+
+    async def set_beep_level(self, level: int) -> None:
+        """Set the beep level."""
+        await self._command("set_beep_level", level)
+        if self.device_state is not None:
+            self.device_state.buzzer_gear = level
+            self._notify()
+
+    async def set_auto_off(self, minutes: int) -> None:
+        """Set the auto off time."""
+        await self._command("set_auto_off", minutes)
+        if self.device_state is not None:
+            self.device_state.standby_time = minutes
+            self._notify()
+
+    async def set_flow_smoothing(self, enabled: bool) -> None:
+        """Set flow smoothing."""
+        await self._command("set_flow_smoothing", enabled)
+        if self.device_state is not None:
+            self.device_state.flow_rate_smoothing = enabled
+            self._notify()
+
+    def push(self, weight: float, flow_rate: float, timer: float) -> None:
+        """Deliver one weight notification."""
+        self.weight = weight
+        self.flow_rate = flow_rate
+        self.timer = timer
+        self._notify()
+
+    async def replay(self, samples: Iterable[Sample], speed: float = 1.0) -> int:
+        """Replay samples, speed 0 delivers them as fast as possible."""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        count = 0
+        for offset, weight, flow_rate, timer in samples:
+            if speed:
+                delay = start + offset / speed - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            else:
+                # let the coordinator's coalesced updates run in between
+                await asyncio.sleep(0)
+            self.push(weight, flow_rate, timer)
+            count += 1
+        return count
+
+
+def idle_stream(
+    seconds: float,
+    weight: float = 0.0,
+    *,
+    start: float = 0.0,
+    noise: float = 0.05,
+    seed: int | None = None,
+) -> Iterator[Sample]:
+    """Yield samples of a scale with nothing happening on it."""
+    rng = random.Random(seed)
+    for i in range(round(seconds / SAMPLE_INTERVAL)):
+        reading = round(weight + rng.gauss(0, noise), 1)
+        yield (start + i * SAMPLE_INTERVAL, reading, 0.0, 0.0)
+
+
+def shot_stream(
+    *,
+    yield_weight: float = 36.0,
+    peak_flow: float = 1.8,
+    preinfusion: float = 6.0,
+    cup: float = 0.0,
+    start: float = 0.0,
+    noise: float = 0.05,
+    seed: int | None = None,
+) -> Iterator[Sample]:
+    """Yield samples of a synthetic espresso shot.
+
+    Two seconds of idle, then the timer starts, nothing drips during
+    preinfusion, the flow ramps up to peak_flow until yield_weight is
+    reached, then the timer stops and the cup drips and settles for 10 seconds.
+    """
+    rng = random.Random(seed)
+    i = 0
+    t = 0.0
+    weight = cup
+    flow = 0.0
+    timer = 0.0
+    stopped_at: float | None = None
+
+    def sample() -> Sample:
+        reading = round(weight + rng.gauss(0, noise), 1)
+        return (start + t, reading, round(flow, 2), round(timer, 1))
+
+    for i in range(round(2 / SAMPLE_INTERVAL)):
+        t = i * SAMPLE_INTERVAL
+        yield sample()
+
+    shot_start = t + SAMPLE_INTERVAL
+    while True:
+        i += 1
+        t = i * SAMPLE_INTERVAL
+        elapsed = t - shot_start
+        if stopped_at is None:
+            timer = elapsed
+            if elapsed > preinfusion:
+                flow = peak_flow * (1 - math.exp(-(elapsed - preinfusion) / 1.5))
+            if weight - cup >= yield_weight:
+                stopped_at = t
+        else:
+            # drip after the machine stopped
+            flow = flow * math.exp(-SAMPLE_INTERVAL / 0.8)
+            if t - stopped_at > 10:
+                break
+        weight += flow * SAMPLE_INTERVAL
+        yield sample()
+
+
+def session_stream(
+    shots: int, idle_between: float = 60.0, seed: int | None = None
+) -> Iterator[Sample]:
+    """Yield a session of shots separated by idle periods."""
+    rng = random.Random(seed)
+    offset = 0.0
+    for _ in range(shots):
+        for sample in idle_stream(idle_between, start=offset, seed=rng.random()):
+            yield sample
+        offset = sample[0] + SAMPLE_INTERVAL
+        for sample in shot_stream(
+            yield_weight=rng.uniform(30, 45),
+            peak_flow=rng.uniform(1.2, 2.5),
+            start=offset,
+            seed=rng.random(),
+        ):
+            yield sample
+        offset = sample[0] + SAMPLE_INTERVAL
+
+
+def add_spikes(
+    samples: Iterable[Sample],
+    every: int,
+    size: float = 25.0,
+    seed: int | None = None,
+) -> tuple[list[Sample], set[int]]:
+    """Return the samples with single-sample weight spikes and their indices.
+
+    A spike of up to size grams, up or down, is added to one random sample
+    in each run of every samples, like bumping the drip tray.
+    """
+    rng = random.Random(seed)
+    spiked = list(samples)
+    indices = set()
+    for start in range(0, len(spiked) - every + 1, every):
+        index = start + rng.randrange(every)
+        timestamp, weight, flow_rate, timer = spiked[index]
+        spike = rng.choice((-1, 1)) * rng.uniform(size / 2, size)
+        spiked[index] = (timestamp, round(weight + spike, 1), flow_rate, timer)
+        indices.add(index)
+    return spiked, indices
+
+
+def load_trace(path: Path) -> list[Sample]:
+    """Load a recorded stream from CSV or JSON Lines.
+
+    Rows need the columns timestamp, weight, flow_rate and timer, as written
+    by the export action. Timestamps are made relative to the first row.
+    """
+    with path.open(encoding="utf-8") as file:
+        if path.suffix == ".csv":
+            rows: Iterable[dict[str, object]] = csv.DictReader(file)
+        else:
+            rows = (json.loads(line) for line in file if line.strip())
+        samples = [
+            (
+                float(row["timestamp"]),  # type: ignore[arg-type]
+                float(row["weight"]),  # type: ignore[arg-type]
+                float(row.get("flow_rate") or 0.0),  # type: ignore[arg-type]
+                float(row.get("timer") or 0.0),  # type: ignore[arg-type]
+            )
+            for row in rows
+            # exports leave missing weights empty or null
+            if row["weight"] not in ("", None)
+        ]
+    if not samples:
+        return samples
+    first = samples[0][0]
+    return [(t - first, w, f, timer) for t, w, f, timer in samples]
@@ -4,9 +4,16 @@ from __future__ import annotations
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 
 from .const import DOMAIN
 from .coordinator import BookooConfigEntry, BookooCoordinator
+from .manager import async_get_manager
+from .services import async_setup_services
+from .websocket_api import async_setup_websocket_api
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
 PLATFORMS = [
     Platform.BINARY_SENSOR,
@@ -17,19 +24,41 @@ PLATFORMS = [
 ]
 
 
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the bookoo integration."""
+
+    async_get_manager(hass)
+    async_setup_services(hass)
+    async_setup_websocket_api(hass)
+
+    return True
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: BookooConfigEntry) -> bool:
     """Set up bookoo as config entry."""
 
     coordinator = BookooCoordinator(hass, entry)
-    await coordinator.async_config_entry_first_refresh()
-
     entry.runtime_data = coordinator
+    coordinator.async_start()
 
+    # entities come up with their restored states and become available once
+    # connected, the scale may well be switched off during startup
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_create_background_task(
+        hass, coordinator.async_refresh(), name="bookoo_first_connect"
+    )
+
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
 
     return True
 
 
+async def async_update_options(hass: HomeAssistant, entry: BookooConfigEntry) -> None:
+    """Reload the config entry when its options change."""
+
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: BookooConfigEntry) -> bool:
     """Unload a config entry."""
 
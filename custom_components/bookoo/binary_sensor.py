@@ -3,28 +3,30 @@
 from collections.abc import Callable
 from dataclasses import dataclass
 
-from aiobookoo.bookooscale import BookooScale
-
 from homeassistant.components.binary_sensor import (
     BinarySensorDeviceClass,
     BinarySensorEntity,
     BinarySensorEntityDescription,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .coordinator import BookooConfigEntry
-from .entity import BookooEntity
+from .const import BookooSource
+from .coordinator import BookooConfigEntry, BookooCoordinator
+from .entity import BookooEntity, BookooEntityDescription
+from .snapshot import ScaleSnapshot
 
 # Coordinator is used to centralize the data updates
 PARALLEL_UPDATES = 0
 
 
 @dataclass(kw_only=True, frozen=True)
-class BookooBinarySensorEntityDescription(BinarySensorEntityDescription):
+class BookooBinarySensorEntityDescription(
+    BookooEntityDescription, BinarySensorEntityDescription
+):
     """Description for Bookoo binary sensor entities."""
 
-    is_on_fn: Callable[[BookooScale], bool]
+    is_on_fn: Callable[[ScaleSnapshot], bool]
 
 
 BINARY_SENSORS: tuple[BookooBinarySensorEntityDescription, ...] = (
@@ -32,7 +34,27 @@ BINARY_SENSORS: tuple[BookooBinarySensorEntityDescription, ...] = (
         key="connected",
         translation_key="connected",
         device_class=BinarySensorDeviceClass.CONNECTIVITY,
-        is_on_fn=lambda scale: scale.connected,
+        sources=frozenset({BookooSource.CONNECTION}),
+        is_on_fn=lambda snapshot: snapshot.connected,
+    ),
+)
+
+
+@dataclass(kw_only=True, frozen=True)
+class BookooDerivedBinarySensorEntityDescription(
+    BookooEntityDescription, BinarySensorEntityDescription
+):
+    """Description for binary sensors computed by the integration."""
+
+    is_on_fn: Callable[[BookooCoordinator], bool]
+
+
+DERIVED_BINARY_SENSORS: tuple[BookooDerivedBinarySensorEntityDescription, ...] = (
+    BookooDerivedBinarySensorEntityDescription(
+        key="weight_settled",
+        translation_key="weight_settled",
+        sources=frozenset({BookooSource.SETTLED}),
+        is_on_fn=lambda coordinator: coordinator.settle.settled,
     ),
 )
 
@@ -45,9 +67,14 @@ async def async_setup_entry(
     """Set up binary sensors."""
 
     coordinator = entry.runtime_data
-    async_add_entities(
+    entities: list[BinarySensorEntity] = [
         BookooBinarySensor(coordinator, description) for description in BINARY_SENSORS
+    ]
+    entities.extend(
+        BookooDerivedBinarySensor(coordinator, description)
+        for description in DERIVED_BINARY_SENSORS
     )
+    async_add_entities(entities)
 
 
 class BookooBinarySensor(BookooEntity, BinarySensorEntity):
@@ -56,6 +83,27 @@ class BookooBinarySensor(BookooEntity, BinarySensorEntity):
     entity_description: BookooBinarySensorEntityDescription
 
     @property
-    def is_on(self) -> bool:
-        """Return true if the binary sensor is on."""
-        return self.entity_description.is_on_fn(self._scale)
+    def _written_value(self) -> bool | None:
+        """Return the value compared against the last written state."""
+        return self._attr_is_on
+
+    @callback
+    def _async_update_attrs(self) -> None:
+        """Update the cached entity attributes from the snapshot."""
+        self._attr_is_on = self.entity_description.is_on_fn(self.coordinator.snapshot)
+
+
+class BookooDerivedBinarySensor(BookooEntity, BinarySensorEntity):
+    """Representation of a binary sensor computed by the integration."""
+
+    entity_description: BookooDerivedBinarySensorEntityDescription
+
+    @property
+    def _written_value(self) -> bool | None:
+        """Return the value compared against the last written state."""
+        return self._attr_is_on
+
+    @callback
+    def _async_update_attrs(self) -> None:
+        """Update the cached entity attributes from the coordinator."""
+        self._attr_is_on = self.entity_description.is_on_fn(self.coordinator)
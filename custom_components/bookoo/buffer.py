@@ -0,0 +1,148 @@
+"""Ring buffer of the samples streamed by the scale."""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterator
+import math
+
+# the scale notifies about 10 times per second while streaming
+SAMPLE_RATE = 10
+
+COLUMNS = ("timestamp", "weight", "flow_rate", "timer")
+
+type Sample = tuple[float, float, float, float]
+
+
+class SampleBuffer:
+    """Fixed size ring buffer of (timestamp, weight, flow rate, timer) samples.
+
+    Samples are stored in preallocated ``array('d')`` columns, so appending
+    never allocates. Every sample gets a sequence number, which readers use
+    as a cursor into the buffer. Missing values are stored as NaN.
+    """
+
+    __slots__ = ("_columns", "_next", "capacity", "total")
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize the buffer."""
+        self.capacity = capacity
+        self._columns = tuple(array("d", bytes(8 * capacity)) for _ in COLUMNS)
+        self._next = 0
+        # number of samples ever appended, the sequence number of the next one
+        self.total = 0
+
+    @classmethod
+    def for_minutes(cls, minutes: float) -> SampleBuffer:
+        """Create a buffer holding the given number of minutes of samples."""
+        return cls(max(1, int(minutes * 60 * SAMPLE_RATE)))
+
+    def __len__(self) -> int:
+        """Return the number of samples held."""
+        return min(self.total, self.capacity)
+
+    @property
+    def first_seq(self) -> int:
+        """Return the sequence number of the oldest sample held."""
+        return self.total - len(self)
+
+    def append(
+        self,
+        timestamp: float,
+        weight: float | None,
+        flow_rate: float | None,
+        timer: float | None,
+    ) -> None:
+        """Append a sample, overwriting the oldest one when full."""
+        i = self._next
+        ts, w, f, t = self._columns
+        ts[i] = timestamp
+        w[i] = math.nan if weight is None else weight
+        f[i] = math.nan if flow_rate is None else flow_rate
+        t[i] = math.nan if timer is None else timer
+        i += 1
+        self._next = 0 if i == self.capacity else i
+        self.total += 1
+
+    def latest(self) -> Sample | None:
+        """Return the newest sample."""
+        if not self.total:
+            return None
+        i = (self.total - 1) % self.capacity
+        ts, w, f, t = self._columns
+        return (ts[i], w[i], f[i], t[i])
+
+    def view(
+        self, start_seq: int | None = None, end_seq: int | None = None
+    ) -> SampleView:
+        """Return a view of the samples between two sequence numbers."""
+        first = self.first_seq
+        start = first if start_seq is None else min(max(start_seq, first), self.total)
+        end = self.total if end_seq is None else min(max(end_seq, start), self.total)
+        return SampleView(self, start, end)
+
+    def view_last(self, count: int) -> SampleView:
+        """Return a view of the newest samples."""
+        return self.view(self.total - count)
+
+    def view_since(self, timestamp: float) -> SampleView:
+        """Return a view of the samples taken at or after a monotonic time."""
+        first = self.first_seq
+        capacity = self.capacity
+        ts = self._columns[0]
+        # timestamps increase with the sequence number, so bisect over those
+        offset = bisect_left(
+            range(first, self.total),
+            timestamp,
+            key=lambda seq: ts[seq % capacity],
+        )
+        return self.view(first + offset)
+
+
+class SampleView:
+    """Window of a sample buffer addressed by sequence numbers.
+
+    The view does not copy the samples. It is only valid until the buffer
+    wraps over its start, so read it in the same event loop iteration it
+    was created in, or copy the columns out with ``column``.
+    """
+
+    __slots__ = ("_buffer", "end", "start")
+
+    def __init__(self, buffer: SampleBuffer, start: int, end: int) -> None:
+        """Initialize the view."""
+        self._buffer = buffer
+        self.start = start
+        self.end = end
+
+    def __len__(self) -> int:
+        """Return the number of samples in the view."""
+        return self.end - self.start
+
+    def segments(self, name: str) -> tuple[memoryview, ...]:
+        """Return the column as at most two zero-copy memoryview slices."""
+        buffer = self._buffer
+        if not len(self):
+            return ()
+        data = memoryview(buffer._columns[COLUMNS.index(name)])  # noqa: SLF001
+        begin = self.start % buffer.capacity
+        stop = begin + len(self)
+        if stop <= buffer.capacity:
+            return (data[begin:stop],)
+        return (data[begin:], data[: stop - buffer.capacity])
+
+    def column(self, name: str) -> array[float]:
+        """Return a compact copy of a column."""
+        result = array("d")
+        for segment in self.segments(name):
+            result.frombytes(segment.cast("B"))
+        return result
+
+    def __iter__(self) -> Iterator[Sample]:
+        """Iterate over the samples in the view."""
+        columns = self._buffer._columns  # noqa: SLF001
+        capacity = self._buffer.capacity
+        for seq in range(self.start, self.end):
+            i = seq % capacity
+            yield tuple(column[i] for column in columns)  # type: ignore[misc]
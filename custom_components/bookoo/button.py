@@ -1,5 +1,7 @@
 """Button entities for Bookoo scales."""
 
+from __future__ import annotations
+
 from collections.abc import Callable, Coroutine
 from dataclasses import dataclass
 from typing import Any
@@ -10,17 +12,19 @@ from homeassistant.components.button import ButtonEntity, ButtonEntityDescriptio
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
+from .const import BookooSource
 from .coordinator import BookooConfigEntry
-from .entity import BookooEntity
+from .entity import BookooEntity, BookooEntityDescription
 
 PARALLEL_UPDATES = 0
 
 
 @dataclass(kw_only=True, frozen=True)
-class BookooButtonEntityDescription(ButtonEntityDescription):
+class BookooButtonEntityDescription(BookooEntityDescription, ButtonEntityDescription):
     """Description for bookoo button entities."""
 
     press_fn: Callable[[BookooScale], Coroutine[Any, Any, None]]
+    sources: frozenset[BookooSource] | None = frozenset({BookooSource.CONNECTION})
 
 
 BUTTONS: tuple[BookooButtonEntityDescription, ...] = (
@@ -72,4 +76,6 @@ class BookooButton(BookooEntity, ButtonEntity):
 
     async def async_press(self) -> None:
         """Handle the button press."""
-        await self.entity_description.press_fn(self._scale)
+        await self.coordinator.commands.async_submit(
+            self.entity_description.key, self.entity_description.press_fn
+        )
@@ -0,0 +1,178 @@
+"""Command scheduling for Bookoo scales."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+import time
+
+from aiobookoo.bookooscale import BookooScale
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+
+from .metrics import BookooMetrics
+
+type SendFn = Callable[[BookooScale], Awaitable[None]]
+
+# queued control commands sent back to back are merged into one write
+MERGED_COMMANDS: dict[tuple[str, str], tuple[str, SendFn]] = {
+    ("tare", "start"): (
+        "tare_and_start",
+        lambda scale: scale.tare_and_start_timer(),
+    ),
+}
+
+
+@dataclass(slots=True)
+class _Command:
+    """A queued command and everyone waiting for it."""
+
+    name: str
+    send: SendFn
+    queued_at: float
+    futures: list[asyncio.Future[None]] = field(default_factory=list)
+
+
+class CommandQueue:
+    """Send the commands of one scale one at a time.
+
+    Control commands like tare or starting the timer are time critical and
+    go before settings. A setting queued while an older value of the same
+    setting is still waiting replaces it, so dragging a slider writes only
+    the last value. A queued tare followed by a start is sent as a single
+    tare and start command. Latency from queueing to completion and
+    failures are recorded per command, including reconnecting a scale
+    whose connection was released while idle.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        scale: BookooScale,
+        metrics: BookooMetrics,
+        *,
+        connect: Callable[[], Awaitable[None]] | None = None,
+        sent: Callable[[str], None] | None = None,
+    ) -> None:
+        """Initialize the queue.
+
+        connect is awaited before each command, sent is called with the
+        name of each command sent successfully.
+        """
+        self._hass = hass
+        self._connect = connect
+        self._sent = sent
+        self._entry = entry
+        self._scale = scale
+        self._metrics = metrics
+        self._control: deque[_Command] = deque()
+        # insertion ordered, superseded values are replaced in place
+        self._settings: dict[str, _Command] = {}
+        self._sending: _Command | None = None
+        self._worker: asyncio.Task[None] | None = None
+
+    def __len__(self) -> int:
+        """Return the number of queued commands."""
+        return len(self._control) + len(self._settings)
+
+    @property
+    def sending(self) -> str | None:
+        """Return the name of the command being sent."""
+        return self._sending.name if self._sending is not None else None
+
+    @callback
+    def async_submit(
+        self, name: str, send: SendFn, *, setting: bool = False
+    ) -> asyncio.Future[None]:
+        """Queue a command and return a future resolved once it was sent."""
+        future: asyncio.Future[None] = self._hass.loop.create_future()
+        now = time.monotonic()
+        if not setting:
+            self._control.append(_Command(name, send, now, [future]))
+        elif (queued := self._settings.get(name)) is not None:
+            # last value wins, the superseded write resolves with this one
+            queued.send = send
+            queued.futures.append(future)
+        else:
+            self._settings[name] = _Command(name, send, now, [future])
+
+        if self._worker is None or self._worker.done():
+            # not started eagerly, commands submitted in the same loop
+            # iteration are queued before the first one is sent
+            self._worker = self._entry.async_create_background_task(
+                self._hass,
+                self._async_run(),
+                name="bookoo_command_queue",
+                eager_start=False,
+            )
+        return future
+
+    def _pop(self) -> _Command | None:
+        """Return the next command to send, merging control commands."""
+        if self._control:
+            command = self._control.popleft()
+            if self._control and (
+                merged := MERGED_COMMANDS.get((command.name, self._control[0].name))
+            ):
+                following = self._control.popleft()
+                command = _Command(
+                    merged[0],
+                    merged[1],
+                    command.queued_at,
+                    command.futures + following.futures,
+                )
+            return command
+        if self._settings:
+            name = next(iter(self._settings))
+            return self._settings.pop(name)
+        return None
+
+    async def _async_run(self) -> None:
+        """Send queued commands until the queue is empty."""
+        while (command := self._pop()) is not None:
+            self._sending = command
+            try:
+                if self._connect is not None:
+                    await self._connect()
+                await command.send(self._scale)
+            except Exception as err:  # noqa: BLE001
+                # raised to the callers awaiting the command instead
+                self._finish(command, err)
+            else:
+                self._finish(command, None)
+            self._sending = None
+
+    def _finish(self, command: _Command, error: Exception | None) -> None:
+        """Record the latency of a command and resolve its futures."""
+        self._metrics.record_command(
+            command.name, time.monotonic() - command.queued_at, error is None
+        )
+        if error is None and self._sent is not None:
+            self._sent(command.name)
+        for future in command.futures:
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(error)
+
+    @callback
+    def async_cancel(self) -> None:
+        """Cancel all queued commands."""
+        pending = [*self._control, *self._settings.values()]
+        if self._sending is not None:
+            pending.append(self._sending)
+            self._sending = None
+        for command in pending:
+            for future in command.futures:
+                future.cancel()
+        self._control.clear()
+        self._settings.clear()
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
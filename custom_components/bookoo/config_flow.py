@@ -4,27 +4,137 @@ import logging
 from typing import Any
 
 from aiobookoo.exceptions import BookooDeviceNotFound, BookooError, BookooUnknownDevice
-from aiobookoo.helpers import is_bookoo_scale
 import voluptuous as vol
 
 from homeassistant.components.bluetooth import (
     BluetoothServiceInfoBleak,
     async_discovered_service_info,
 )
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlow,
+)
 from homeassistant.const import CONF_ADDRESS, CONF_NAME
+from homeassistant.core import callback
 from homeassistant.helpers.device_registry import format_mac
 from homeassistant.helpers.selector import (
+    BooleanSelector,
+    NumberSelector,
+    NumberSelectorConfig,
+    NumberSelectorMode,
     SelectOptionDict,
     SelectSelector,
     SelectSelectorConfig,
     SelectSelectorMode,
 )
 
-from .const import CONF_IS_VALID_SCALE, DOMAIN
+from .const import (
+    CONF_BUFFER_MINUTES,
+    CONF_FLOW_METHOD,
+    CONF_FLOW_WINDOW,
+    CONF_FRAME_INTERVAL,
+    CONF_IDLE_TIMEOUT,
+    CONF_IS_VALID_SCALE,
+    CONF_LONG_TERM_STATISTICS,
+    CONF_SETTLE_TIME,
+    CONF_SETTLE_TOLERANCE,
+    CONF_SPIKE_FILTER,
+    DEFAULT_BUFFER_MINUTES,
+    DEFAULT_FLOW_METHOD,
+    DEFAULT_FLOW_WINDOW,
+    DEFAULT_FRAME_INTERVAL,
+    DEFAULT_IDLE_TIMEOUT,
+    DEFAULT_LONG_TERM_STATISTICS,
+    DEFAULT_SETTLE_TIME,
+    DEFAULT_SETTLE_TOLERANCE,
+    DEFAULT_SPIKE_FILTER,
+    DOMAIN,
+)
+from .discovery import async_classify_device, is_bookoo_advertisement
+from .flow import FlowMethod
 
 _LOGGER = logging.getLogger(__name__)
 
+OPTIONS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(
+            CONF_FRAME_INTERVAL, default=DEFAULT_FRAME_INTERVAL
+        ): NumberSelector(
+            NumberSelectorConfig(
+                min=0,
+                max=5,
+                step=0.05,
+                unit_of_measurement="s",
+                mode=NumberSelectorMode.BOX,
+            )
+        ),
+        vol.Optional(
+            CONF_BUFFER_MINUTES, default=DEFAULT_BUFFER_MINUTES
+        ): NumberSelector(
+            NumberSelectorConfig(
+                min=1,
+                max=120,
+                step=1,
+                unit_of_measurement="min",
+                mode=NumberSelectorMode.BOX,
+            )
+        ),
+        vol.Optional(CONF_FLOW_METHOD, default=DEFAULT_FLOW_METHOD): SelectSelector(
+            SelectSelectorConfig(
+                options=[method.value for method in FlowMethod],
+                mode=SelectSelectorMode.DROPDOWN,
+                translation_key=CONF_FLOW_METHOD,
+            )
+        ),
+        vol.Optional(CONF_FLOW_WINDOW, default=DEFAULT_FLOW_WINDOW): NumberSelector(
+            NumberSelectorConfig(
+                min=0.5,
+                max=5,
+                step=0.1,
+                unit_of_measurement="s",
+                mode=NumberSelectorMode.BOX,
+            )
+        ),
+        vol.Optional(
+            CONF_LONG_TERM_STATISTICS, default=DEFAULT_LONG_TERM_STATISTICS
+        ): BooleanSelector(),
+        vol.Optional(
+            CONF_SPIKE_FILTER, default=DEFAULT_SPIKE_FILTER
+        ): BooleanSelector(),
+        vol.Optional(
+            CONF_SETTLE_TOLERANCE, default=DEFAULT_SETTLE_TOLERANCE
+        ): NumberSelector(
+            NumberSelectorConfig(
+                min=0.05,
+                max=2,
+                step=0.05,
+                unit_of_measurement="g",
+                mode=NumberSelectorMode.BOX,
+            )
+        ),
+        vol.Optional(CONF_SETTLE_TIME, default=DEFAULT_SETTLE_TIME): NumberSelector(
+            NumberSelectorConfig(
+                min=0.3,
+                max=5,
+                step=0.1,
+                unit_of_measurement="s",
+                mode=NumberSelectorMode.BOX,
+            )
+        ),
+        vol.Optional(CONF_IDLE_TIMEOUT, default=DEFAULT_IDLE_TIMEOUT): NumberSelector(
+            NumberSelectorConfig(
+                min=0,
+                max=120,
+                step=1,
+                unit_of_measurement="min",
+                mode=NumberSelectorMode.BOX,
+            )
+        ),
+    }
+)
+
 
 class BookooConfigFlow(ConfigFlow, domain=DOMAIN):
     """Handle a config flow for bookoo."""
@@ -32,7 +142,13 @@ class BookooConfigFlow(ConfigFlow, domain=DOMAIN):
     def __init__(self) -> None:
         """Initialize the config flow."""
         self._discovered: dict[str, Any] = {}
-        self._discovered_devices: dict[str, str] = {}
+        self._discovered_devices: dict[str, BluetoothServiceInfoBleak] = {}
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Create the options flow."""
+        return BookooOptionsFlow()
 
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
@@ -44,7 +160,9 @@ class BookooConfigFlow(ConfigFlow, domain=DOMAIN):
         if user_input is not None:
             mac = user_input[CONF_ADDRESS]
             try:
-                is_valid_bookoo_scale = await is_bookoo_scale(mac)
+                is_valid_bookoo_scale = await async_classify_device(
+                    self.hass, mac, self._discovered_devices.get(mac)
+                )
             except BookooDeviceNotFound:
                 errors["base"] = "device_not_found"
             except BookooError:
@@ -58,15 +176,21 @@ class BookooConfigFlow(ConfigFlow, domain=DOMAIN):
 
             if not errors:
                 return self.async_create_entry(
-                    title=self._discovered_devices[mac],
+                    title=self._discovered_devices[mac].name,
                     data={
                         CONF_ADDRESS: mac,
                         CONF_IS_VALID_SCALE: is_valid_bookoo_scale,
                     },
                 )
 
+        current_addresses = self._async_current_ids(include_ignore=False)
         for device in async_discovered_service_info(self.hass):
-            self._discovered_devices[device.address] = device.name
+            # only offer devices that can be a scale and aren't set up yet
+            if (
+                is_bookoo_advertisement(device)
+                and format_mac(device.address) not in current_addresses
+            ):
+                self._discovered_devices[device.address] = device
 
         if not self._discovered_devices:
             return self.async_abort(reason="no_devices_found")
@@ -74,9 +198,9 @@ class BookooConfigFlow(ConfigFlow, domain=DOMAIN):
         options = [
             SelectOptionDict(
                 value=device_mac,
-                label=f"{device_name} ({device_mac})",
+                label=f"{device.name} ({device_mac})",
             )
-            for device_mac, device_name in self._discovered_devices.items()
+            for device_mac, device in self._discovered_devices.items()
         ]
 
         return self.async_show_form(
@@ -106,8 +230,8 @@ class BookooConfigFlow(ConfigFlow, domain=DOMAIN):
         self._abort_if_unique_id_configured()
 
         try:
-            self._discovered[CONF_IS_VALID_SCALE] = await is_bookoo_scale(
-                discovery_info.address
+            self._discovered[CONF_IS_VALID_SCALE] = await async_classify_device(
+                self.hass, discovery_info.address, discovery_info
             )
         except BookooDeviceNotFound:
             _LOGGER.debug("Device not found during discovery")
@@ -147,3 +271,22 @@ class BookooConfigFlow(ConfigFlow, domain=DOMAIN):
             step_id="bluetooth_confirm",
             description_placeholders=placeholders,
         )
+
+
+class BookooOptionsFlow(OptionsFlow):
+    """Handle options for a bookoo scale."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the options."""
+
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=self.add_suggested_values_to_schema(
+                OPTIONS_SCHEMA, self.config_entry.options
+            ),
+        )
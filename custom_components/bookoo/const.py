@@ -1,4 +1,79 @@
 """Constants for component."""
 
+from enum import StrEnum
+
 DOMAIN = "bookoo"
 CONF_IS_VALID_SCALE = "is_valid_scale"
+
+CONF_FRAME_INTERVAL = "frame_interval"
+DEFAULT_FRAME_INTERVAL = 0.0
+CONF_BUFFER_MINUTES = "buffer_minutes"
+DEFAULT_BUFFER_MINUTES = 10
+CONF_FLOW_METHOD = "flow_method"
+DEFAULT_FLOW_METHOD = "least_squares"
+CONF_FLOW_WINDOW = "flow_window"
+DEFAULT_FLOW_WINDOW = 1.0
+CONF_LONG_TERM_STATISTICS = "long_term_statistics"
+DEFAULT_LONG_TERM_STATISTICS = False
+CONF_IDLE_TIMEOUT = "idle_timeout"
+DEFAULT_IDLE_TIMEOUT = 0
+CONF_SETTLE_TOLERANCE = "settle_tolerance"
+DEFAULT_SETTLE_TOLERANCE = 0.1
+CONF_SETTLE_TIME = "settle_time"
+DEFAULT_SETTLE_TIME = 0.5
+CONF_SPIKE_FILTER = "spike_filter"
+DEFAULT_SPIKE_FILTER = False
+
+
+class BookooSource(StrEnum):
+    """Scale fields entities can subscribe to."""
+
+    WEIGHT = "weight"
+    FLOW = "flow"
+    TIMER = "timer"
+    DEVICE_STATE = "device_state"
+    CONNECTION = "connection"
+    SHOT = "shot"
+    TARGET = "target"
+    SETTLED = "settled"
+
+
+class ExportFormat(StrEnum):
+    """File format of an export."""
+
+    CSV = "csv"
+    JSONL = "jsonl"
+    PARQUET = "parquet"
+
+
+class ExportSource(StrEnum):
+    """Where exported samples are read from."""
+
+    HISTORY = "history"
+    BUFFER = "buffer"
+
+
+EVENT_SHOT_STARTED = f"{DOMAIN}_shot_started"
+EVENT_SHOT_ENDED = f"{DOMAIN}_shot_ended"
+EVENT_SHOT_CANCELLED = f"{DOMAIN}_shot_cancelled"
+EVENT_TARGET_REACHED = f"{DOMAIN}_target_reached"
+EVENT_TARE = f"{DOMAIN}_tare"
+EVENT_WEIGHT_SETTLED = f"{DOMAIN}_weight_settled"
+EVENT_CONNECTED = f"{DOMAIN}_connected"
+EVENT_DISCONNECTED = f"{DOMAIN}_disconnected"
+
+SERVICE_SET_TARGET_WEIGHT = "set_target_weight"
+SERVICE_FIND_SIMILAR_SHOTS = "find_similar_shots"
+SERVICE_SET_REFERENCE_SHOT = "set_reference_shot"
+SERVICE_EXPORT_SHOTS = "export_shots"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_TARGET_WEIGHT = "target_weight"
+ATTR_LAG = "lag"
+ATTR_SHOT_ID = "shot_id"
+ATTR_LIMIT = "limit"
+ATTR_FILENAME = "filename"
+ATTR_FORMAT = "format"
+ATTR_SOURCE = "source"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_SHOT_IDS = "shot_ids"
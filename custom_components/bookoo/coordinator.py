@@ -2,26 +2,102 @@
 
 from __future__ import annotations
 
-from datetime import timedelta
+from array import array
+import asyncio
+from collections.abc import Callable
+from datetime import datetime, timedelta
 import logging
+import time
+from typing import Any
 
 from aiobookoo.bookooscale import BookooScale
 from aiobookoo.exceptions import BookooDeviceNotFound, BookooError
 
+from homeassistant.components.bluetooth import (
+    BluetoothCallbackMatcher,
+    BluetoothChange,
+    BluetoothScanningMode,
+    BluetoothServiceInfoBleak,
+    async_register_callback,
+)
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_ADDRESS
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
 
-from .const import CONF_IS_VALID_SCALE
+from .buffer import SampleBuffer
+from .commands import CommandQueue
+from .const import (
+    CONF_BUFFER_MINUTES,
+    CONF_FLOW_METHOD,
+    CONF_FLOW_WINDOW,
+    CONF_FRAME_INTERVAL,
+    CONF_IDLE_TIMEOUT,
+    CONF_IS_VALID_SCALE,
+    CONF_LONG_TERM_STATISTICS,
+    CONF_SETTLE_TIME,
+    CONF_SETTLE_TOLERANCE,
+    CONF_SPIKE_FILTER,
+    DEFAULT_BUFFER_MINUTES,
+    DEFAULT_FLOW_METHOD,
+    DEFAULT_FLOW_WINDOW,
+    DEFAULT_FRAME_INTERVAL,
+    DEFAULT_IDLE_TIMEOUT,
+    DEFAULT_LONG_TERM_STATISTICS,
+    DEFAULT_SETTLE_TIME,
+    DEFAULT_SETTLE_TOLERANCE,
+    DEFAULT_SPIKE_FILTER,
+    DOMAIN,
+    EVENT_CONNECTED,
+    EVENT_DISCONNECTED,
+    EVENT_SHOT_CANCELLED,
+    EVENT_SHOT_ENDED,
+    EVENT_SHOT_STARTED,
+    EVENT_TARE,
+    EVENT_TARGET_REACHED,
+    EVENT_WEIGHT_SETTLED,
+    BookooSource,
+)
+from .flow import FlowEstimator, FlowMethod, create_estimator, window_size
+from .history import ShotHistory, ShotTrace
+from .idle import IdleTracker
+from .manager import async_get_manager
+from .metrics import BookooMetrics
+from .profiles import ProfileIndex, profile_value, resample_profile
+from .reconnect import ReconnectBackoff
+from .settle import SettleDetector
+from .shot import Shot, ShotDetector, ShotEvent, ShotState
+from .snapshot import ScaleSnapshot
+from .spikes import SpikeFilter
+from .target import TargetReached, TargetWeightController
 
 SCAN_INTERVAL = timedelta(seconds=5)
 
 _LOGGER = logging.getLogger(__name__)
 
+SHOT_EVENTS = {
+    ShotEvent.STARTED: EVENT_SHOT_STARTED,
+    ShotEvent.ENDED: EVENT_SHOT_ENDED,
+    ShotEvent.CANCELLED: EVENT_SHOT_CANCELLED,
+}
+# commands after which the scale reads 0
+TARE_COMMANDS = frozenset({"tare", "tare_and_start"})
+
 type BookooConfigEntry = ConfigEntry[BookooCoordinator]
 
 
+def _wakes(sources: frozenset[BookooSource] | None, changed: set[BookooSource]) -> bool:
+    """Return whether a listener of the sources is woken for the changes."""
+    # availability depends on the connection, so a change wakes everyone
+    return (
+        sources is None
+        or BookooSource.CONNECTION in changed
+        or not changed.isdisjoint(sources)
+    )
+
+
 class BookooCoordinator(DataUpdateCoordinator[None]):
     """Class to handle fetching data from the scale."""
 
@@ -37,37 +113,519 @@ class BookooCoordinator(DataUpdateCoordinator[None]):
             config_entry=entry,
         )
 
+        self._frame_interval: float = entry.options.get(
+            CONF_FRAME_INTERVAL, DEFAULT_FRAME_INTERVAL
+        )
+        self._flush_handle: asyncio.Handle | None = None
+        self._last_flush: float = 0.0
+        self._pending_sources: set[BookooSource] = set()
+        # notifications merged into the pending update since the last flush
+        self._coalesced = 0
+        # decoded once per notification, entities read their values from it
+        self.snapshot = ScaleSnapshot()
+        # replaces single-sample spikes before the entities and the shot,
+        # flow and settle detection see the sample, the buffer keeps it raw
+        self.spikes: SpikeFilter | None = (
+            SpikeFilter()
+            if entry.options.get(CONF_SPIKE_FILTER, DEFAULT_SPIKE_FILTER)
+            else None
+        )
+
+        self.samples = SampleBuffer.for_minutes(
+            entry.options.get(CONF_BUFFER_MINUTES, DEFAULT_BUFFER_MINUTES)
+        )
+        self.flow: FlowEstimator = create_estimator(
+            FlowMethod(entry.options.get(CONF_FLOW_METHOD, DEFAULT_FLOW_METHOD)),
+            window_size(entry.options.get(CONF_FLOW_WINDOW, DEFAULT_FLOW_WINDOW)),
+        )
+        self.settle = SettleDetector(
+            entry.options.get(CONF_SETTLE_TOLERANCE, DEFAULT_SETTLE_TOLERANCE),
+            entry.options.get(CONF_SETTLE_TIME, DEFAULT_SETTLE_TIME),
+        )
+        self._sample_listeners: list[Callable[[], None]] = []
+        self.shots = ShotDetector()
+        self.target = TargetWeightController()
+        self.history = ShotHistory(hass, entry.data[CONF_ADDRESS])
+        self.last_shot_id: int | None = None
+        self._profiles: ProfileIndex | None = None
+        self._profiles_lock = asyncio.Lock()
+        self.reference: array[float] | None = None
+        self.reference_shot_id: int | None = None
+        self.reference_deviation: float | None = None
+        # shots are imported as long-term statistics, high rate sensors are
+        # throttled and compile no statistics of their own
+        self.long_term_statistics: bool = entry.options.get(
+            CONF_LONG_TERM_STATISTICS, DEFAULT_LONG_TERM_STATISTICS
+        )
+
+        self._backoff = ReconnectBackoff()
+        self._manager = async_get_manager(hass)
+        self._connect_lock = asyncio.Lock()
+        # the connection of an idle scale is released for the other scales,
+        # the entities keep their last values meanwhile
+        self._idle = IdleTracker(
+            entry.options.get(CONF_IDLE_TIMEOUT, DEFAULT_IDLE_TIMEOUT) * 60
+        )
+        self.idle = False
+
+        self.metrics = BookooMetrics()
+        self.notifications_received = 0
+        self.state_writes_dropped = 0
+
         self._scale = BookooScale(
             address_or_ble_device=entry.data[CONF_ADDRESS],
             name=entry.title,
             is_valid_scale=entry.data[CONF_IS_VALID_SCALE],
-            notify_callback=self.async_update_listeners,
+            notify_callback=self._async_handle_notification,
+        )
+        self.commands = CommandQueue(
+            hass,
+            entry,
+            self._scale,
+            self.metrics,
+            connect=self.async_ensure_connected,
+            sent=self._async_command_sent,
         )
+        self._device_id: str | None = None
 
     @property
     def scale(self) -> BookooScale:
         """Return the scale object."""
         return self._scale
 
+    @callback
+    def async_start(self) -> None:
+        """Listen for advertisements of the scale."""
+        self.config_entry.async_on_unload(
+            async_register_callback(
+                self.hass,
+                self._async_handle_advertisement,
+                BluetoothCallbackMatcher(address=self.config_entry.data[CONF_ADDRESS]),
+                BluetoothScanningMode.PASSIVE,
+            )
+        )
+
+    @callback
+    def _async_handle_advertisement(
+        self, service_info: BluetoothServiceInfoBleak, change: BluetoothChange
+    ) -> None:
+        """Connect right away when the scale advertises."""
+        now = time.monotonic()
+        after_gap = self._idle.advertised(now)
+        self._manager.async_advertised(service_info.address)
+        if self._scale.connected:
+            return
+        if self.idle:
+            # a disconnected scale keeps advertising until it switches itself
+            # off, advertising again after a gap means it was switched on
+            if not after_gap:
+                return
+            _LOGGER.debug(
+                "Idle scale %s is advertising again, reconnecting",
+                service_info.address,
+            )
+            self._async_wake(now)
+        elif not self._backoff.failures:
+            return
+        else:
+            _LOGGER.debug(
+                "Scale %s is advertising, reconnecting", service_info.address
+            )
+            self._backoff.reset()
+        self.config_entry.async_create_background_task(
+            self.hass, self.async_request_refresh(), name="bookoo_reconnect"
+        )
+
+    @callback
+    def _async_handle_notification(self) -> None:
+        """Handle a notification from the scale."""
+        start = time.perf_counter()
+        now = time.monotonic()
+        self.notifications_received += 1
+        self.metrics.record_notification(now)
+        previous = self.snapshot
+        snapshot = raw = ScaleSnapshot.from_scale(self._scale)
+        if self.spikes is not None:
+            if snapshot.connected:
+                snapshot = self.spikes.filter(raw)
+            else:
+                self.spikes.reset()
+        self.snapshot = snapshot
+        changed = snapshot.changed_sources(previous)
+        if BookooSource.CONNECTION in changed and not snapshot.connected:
+            self.metrics.timeline.disconnected(
+                self._scale.last_disconnect_time or time.time()
+            )
+            self._async_fire_event(EVENT_DISCONNECTED, {"idle": self.idle})
+        changed.update(self._async_process_sample(snapshot, raw, now))
+        self._async_schedule_flush(changed)
+        self.metrics.callback_time.record((time.perf_counter() - start) * 1000)
+
+    @callback
+    def _async_schedule_flush(self, changed: set[BookooSource]) -> None:
+        """Schedule a listener update for the changed sources."""
+        # notifications arrive at ~10 Hz while streaming; coalesce them into
+        # at most one listener update per frame
+        if self._flush_handle is not None or not changed:
+            # coalesced into the pending update, or nothing to update at all
+            self._pending_sources.update(changed)
+            if changed:
+                self._coalesced += 1
+            return
+
+        self._pending_sources.update(changed)
+        delay = self._last_flush + self._frame_interval - self.hass.loop.time()
+        if delay > 0:
+            self._flush_handle = self.hass.loop.call_later(
+                delay, self._async_flush_listeners
+            )
+        else:
+            self._flush_handle = self.hass.loop.call_soon(self._async_flush_listeners)
+
+    @callback
+    def _async_process_sample(
+        self, snapshot: ScaleSnapshot, raw: ScaleSnapshot, now: float
+    ) -> set[BookooSource]:
+        """Run the sample pipeline and return the derived sources it changed.
+
+        The sample buffer keeps the raw sample, everything derived from the
+        sample uses the snapshot with spikes replaced.
+        """
+        changed: set[BookooSource] = set()
+        if not snapshot.connected:
+            shot_event = self.shots.finish(self.samples.total, now)
+            if self.settle.reset():
+                changed.add(BookooSource.SETTLED)
+        else:
+            weight = snapshot.weight
+            self._idle.update(now, weight, snapshot.timer)
+            self.samples.append(now, raw.weight, raw.flow_rate, raw.timer)
+            for sample_listener in self._sample_listeners:
+                sample_listener()
+            if weight is not None:
+                self.flow.update(now, weight)
+                if self.settle.update(weight):
+                    changed.add(BookooSource.SETTLED)
+                    if self.settle.settled:
+                        self._async_fire_event(
+                            EVENT_WEIGHT_SETTLED, {"weight": self.settle.value}
+                        )
+            shot_event = self.shots.update(
+                self.samples.total - 1,
+                now,
+                weight,
+                snapshot.flow_rate,
+                snapshot.timer,
+            )
+            if shot_event is ShotEvent.STARTED:
+                self.target.start()
+            if self.shots.state is ShotState.BREWING and weight is not None:
+                flow = self.flow.value
+                if flow is None:
+                    flow = snapshot.flow_rate or 0.0
+                yield_weight = weight - self.shots.start_weight
+                reached = self.target.update(now, yield_weight, flow)
+                if reached is not None:
+                    self._async_fire_target_reached(reached)
+                    changed.add(BookooSource.TARGET)
+                if self.reference is not None:
+                    self.reference_deviation = yield_weight - profile_value(
+                        self.reference, now - self.shots.start
+                    )
+
+        if shot_event is not None or self.shots.state is ShotState.BREWING:
+            changed.add(BookooSource.SHOT)
+        if shot_event is not None:
+            self._async_fire_shot_event(shot_event)
+        if shot_event is ShotEvent.ENDED and (shot := self.shots.last_shot):
+            self.target.learn(shot.yield_weight, shot.end)
+            changed.add(BookooSource.TARGET)
+            self._async_store_shot(shot, now)
+        return changed
+
+    @callback
+    def _async_fire_event(
+        self, event_type: str, data: dict[str, Any] | None = None
+    ) -> None:
+        """Fire an event of the scale, device triggers match on device_id."""
+        self.hass.bus.async_fire(
+            event_type,
+            {
+                "address": self.config_entry.data[CONF_ADDRESS],
+                "device_id": self.device_id,
+                **(data or {}),
+            },
+        )
+
+    @callback
+    def _async_fire_shot_event(self, shot_event: ShotEvent) -> None:
+        """Fire an event on the bus for a shot transition."""
+        data: dict[str, Any] = {}
+        if shot_event is ShotEvent.ENDED and (shot := self.shots.last_shot):
+            data["duration"] = round(shot.duration, 1)
+            data["yield"] = round(shot.yield_weight, 1)
+            data["final_weight"] = round(shot.final_weight, 1)
+            data["peak_flow"] = round(shot.peak_flow, 2)
+        self._async_fire_event(SHOT_EVENTS[shot_event], data)
+
+    @callback
+    def _async_fire_target_reached(self, reached: TargetReached) -> None:
+        """Fire an event on the bus when the shot should be stopped."""
+        self._async_fire_event(
+            EVENT_TARGET_REACHED,
+            {
+                "target": reached.target,
+                "yield": round(reached.yield_weight, 1),
+                "predicted_yield": round(reached.predicted_yield, 1),
+                "flow": round(reached.flow, 2),
+                "lag": round(reached.lag, 2),
+            },
+        )
+
+    @callback
+    def _async_store_shot(self, shot: Shot, now: float) -> None:
+        """Copy a completed shot out of the sample buffer and store it."""
+        trace = ShotTrace.from_view(
+            self.samples.view(shot.start_seq, shot.end_seq), shot.start
+        )
+        started_at = dt_util.utcnow() - timedelta(seconds=now - shot.start)
+        self.config_entry.async_create_background_task(
+            self.hass,
+            self._async_add_shot(shot, started_at, trace),
+            name="bookoo_store_shot",
+        )
+
+    async def _async_add_shot(
+        self, shot: Shot, started_at: datetime, trace: ShotTrace
+    ) -> None:
+        """Store a shot, index its profile and import its statistics."""
+        profile = resample_profile(trace.timestamp, trace.weight)
+        shot_id = await self.history.async_add(shot, started_at, trace, profile)
+        if shot_id is None:
+            # the entry was unloaded meanwhile
+            return
+        self.last_shot_id = shot_id
+        if self._profiles is not None or self._profiles_lock.locked():
+            # loaded or being loaded, the load might have missed this shot
+            (await self.async_get_profiles()).add(shot_id, profile)
+        if self.long_term_statistics and "recorder" in self.hass.config.components:
+            # imports the recorder models, only load them when enabled
+            from .statistics import (  # noqa: PLC0415
+                async_import_shot_statistics,
+            )
+
+            await async_import_shot_statistics(
+                self.hass,
+                self.history,
+                self.config_entry.data[CONF_ADDRESS],
+                self.config_entry.title,
+                started_at,
+            )
+
+    @callback
+    def _async_command_sent(self, name: str) -> None:
+        """Fire the tare event once a tare was sent."""
+        if name in TARE_COMMANDS:
+            self._async_fire_event(EVENT_TARE)
+
+    @property
+    def device_id(self) -> str | None:
+        """Return the device registry id of the scale."""
+        if self._device_id is None:
+            # looked up once, the events of the scale all carry it
+            device = dr.async_get(self.hass).async_get_device(
+                identifiers={(DOMAIN, dr.format_mac(self._scale.mac))}
+            )
+            self._device_id = device.id if device is not None else None
+        return self._device_id
+
+    @callback
+    def async_add_sample_listener(
+        self, sample_listener: Callable[[], None]
+    ) -> CALLBACK_TYPE:
+        """Call a listener whenever a sample is appended to the buffer."""
+        self._sample_listeners.append(sample_listener)
+
+        @callback
+        def remove_listener() -> None:
+            self._sample_listeners.remove(sample_listener)
+
+        return remove_listener
+
+    @callback
+    def _async_request_update(self, source: BookooSource) -> None:
+        """Update the listeners of a source outside of a notification."""
+        self._pending_sources.add(source)
+        if self._flush_handle is None:
+            self._flush_handle = self.hass.loop.call_soon(self._async_flush_listeners)
+
+    @callback
+    def async_set_target(self, target: float | None, lag: float | None = None) -> None:
+        """Set the target yield and optionally the stop lag."""
+        self.target.target = target or None
+        if lag is not None:
+            self.target.lag = lag
+        self._async_request_update(BookooSource.TARGET)
+
+    async def async_get_profiles(self) -> ProfileIndex:
+        """Return the profile index of the stored shots, loading it once."""
+        async with self._profiles_lock:
+            if self._profiles is None:
+                profiles = ProfileIndex()
+                for shot_id, profile in await self.history.async_load_profiles():
+                    profiles.add(shot_id, profile)
+                self._profiles = profiles
+        return self._profiles
+
+    @callback
+    def current_profile(self) -> array[float] | None:
+        """Return the profile of the running shot so far."""
+        if self.shots.state is not ShotState.BREWING:
+            return None
+        view = self.samples.view(self.shots.start_seq)
+        timestamps = view.column("timestamp")
+        start = self.shots.start
+        return resample_profile([t - start for t in timestamps], view.column("weight"))
+
+    async def async_set_reference(self, shot_id: int | None) -> bool:
+        """Compare shots to a stored shot, return False if it doesn't exist."""
+        profile = None
+        if shot_id is not None:
+            profile = (await self.async_get_profiles()).get(shot_id)
+            if profile is None:
+                return False
+        self.reference = profile
+        self.reference_shot_id = shot_id
+        self.reference_deviation = None
+        self._async_request_update(BookooSource.SHOT)
+        return True
+
+    @callback
+    def _async_flush_listeners(self) -> None:
+        """Wake the listeners whose source fields changed."""
+        self._flush_handle = None
+        self._last_flush = self.hass.loop.time()
+        changed, self._pending_sources = self._pending_sources, set()
+        coalesced, self._coalesced = self._coalesced, 0
+
+        woken = 0
+        for update_callback, sources in list(self._listeners.values()):
+            if _wakes(sources, changed):
+                update_callback()
+                woken += 1
+            else:
+                self.state_writes_dropped += 1
+        # each coalesced notification would have woken these listeners again
+        self.state_writes_dropped += coalesced * woken
+
+    async def async_shutdown(self) -> None:
+        """Cancel pending updates and commands and close the shot history."""
+        await super().async_shutdown()
+        self.commands.async_cancel()
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+            self._coalesced = 0
+        await self.history.async_close()
+
+    @callback
+    def _async_wake(self, now: float) -> None:
+        """Leave the idle state so the scale is connected again."""
+        self.idle = False
+        self.metrics.idle_ended(now)
+        self._idle.activity(now)
+        self._backoff.reset()
+
+    async def async_ensure_connected(self) -> None:
+        """Reconnect a scale released while idle, commands call this first."""
+        now = time.monotonic()
+        self._idle.activity(now)
+        if not self.idle:
+            return
+        _LOGGER.debug(
+            "Command for idle scale %s, reconnecting",
+            self.config_entry.data[CONF_ADDRESS],
+        )
+        self._async_wake(now)
+        await self.async_refresh()
+
+    async def _async_release_connection(self) -> None:
+        """Disconnect an idle scale to free its connection slot."""
+        _LOGGER.debug(
+            "Scale %s is idle, releasing its connection",
+            self.config_entry.data[CONF_ADDRESS],
+        )
+        now = time.monotonic()
+        self.idle = True
+        self.metrics.idle_started(now)
+        # the scale advertises right after the disconnect, that's no wake up
+        self._idle.released(now)
+        await self._scale.disconnect()
+        if self.snapshot.connected:
+            # the entities have to see the disconnect to stop streaming
+            self._scale.device_disconnected_handler()
+
     async def _async_update_data(self) -> None:
         """Fetch data."""
 
-        # scale is already connected, return
+        # polls, advertisements and commands may try to connect at once
+        async with self._connect_lock:
+            await self._async_connect()
+
+    async def _async_connect(self) -> None:
+        """Connect to the scale unless connected, idle or backing off."""
+
+        # scale is already connected, release it if it is not being used
         if self._scale.connected:
+            if (
+                self._idle.is_idle(time.monotonic())
+                and self.shots.state is not ShotState.BREWING
+                and not self.commands
+            ):
+                await self._async_release_connection()
+            return
+
+        # released while idle, an advertisement or a command reconnects it
+        if self.idle:
             return
 
-        # scale is not connected, try to connect
+        # scale is not connected, try to connect unless backing off
+        if not self._backoff.ready(time.monotonic()):
+            return
+        priority = self._manager.priority(
+            self.config_entry.data[CONF_ADDRESS], self._scale.last_disconnect_time
+        )
+        wait_start = time.perf_counter()
         try:
-            await self._scale.connect(setup_tasks=False)
+            # the adapters and proxies are shared with the other scales
+            async with self._manager.async_connect_slot(priority):
+                start = time.perf_counter()
+                self.metrics.connect_wait.record((start - wait_start) * 1000)
+                await self._scale.connect(setup_tasks=False)
         except (BookooDeviceNotFound, BookooError, TimeoutError) as ex:
+            self.metrics.connect_failures += 1
+            self.metrics.timeline.connect_failed(
+                time.time(), time.perf_counter() - start, repr(ex)
+            )
+            delay = self._backoff.failed(time.monotonic())
             _LOGGER.debug(
-                "Could not connect to scale: %s, Error: %s",
+                "Could not connect to scale: %s, Error: %s, retrying in %.0f s",
                 self.config_entry.data[CONF_ADDRESS],
                 ex,
+                delay,
             )
             self._scale.device_disconnected_handler(notify=False)
             return
 
+        self._backoff.reset()
+        self._idle.activity(time.monotonic())
+        attempt = time.perf_counter() - start
+        self.metrics.connect_time.record(attempt * 1000)
+        self.metrics.timeline.connected(time.time(), attempt)
+        self._async_fire_event(EVENT_CONNECTED)
+        # the listeners are updated after the refresh, show them the new state
+        self.snapshot = ScaleSnapshot.from_scale(self._scale)
+
         # connected, set up background tasks
 
         if not self._scale.process_queue_task or self._scale.process_queue_task.done():
@@ -0,0 +1,82 @@
+"""Device triggers for Bookoo scales."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components.device_automation import DEVICE_TRIGGER_BASE_SCHEMA
+from homeassistant.components.homeassistant.triggers import event as event_trigger
+from homeassistant.const import (
+    CONF_DEVICE_ID,
+    CONF_DOMAIN,
+    CONF_PLATFORM,
+    CONF_TYPE,
+)
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+from homeassistant.helpers.trigger import TriggerActionType, TriggerInfo
+from homeassistant.helpers.typing import ConfigType
+
+from .const import (
+    DOMAIN,
+    EVENT_CONNECTED,
+    EVENT_DISCONNECTED,
+    EVENT_SHOT_CANCELLED,
+    EVENT_SHOT_ENDED,
+    EVENT_SHOT_STARTED,
+    EVENT_TARE,
+    EVENT_TARGET_REACHED,
+    EVENT_WEIGHT_SETTLED,
+)
+
+# each trigger listens to one event of the scale, nothing is evaluated on
+# the weight updates in between
+TRIGGER_EVENTS = {
+    "shot_started": EVENT_SHOT_STARTED,
+    "shot_ended": EVENT_SHOT_ENDED,
+    "shot_cancelled": EVENT_SHOT_CANCELLED,
+    "target_reached": EVENT_TARGET_REACHED,
+    "tare": EVENT_TARE,
+    "weight_settled": EVENT_WEIGHT_SETTLED,
+    "connected": EVENT_CONNECTED,
+    "disconnected": EVENT_DISCONNECTED,
+}
+
+TRIGGER_SCHEMA = DEVICE_TRIGGER_BASE_SCHEMA.extend(
+    {vol.Required(CONF_TYPE): vol.In(TRIGGER_EVENTS)}
+)
+
+
+async def async_get_triggers(
+    hass: HomeAssistant, device_id: str
+) -> list[dict[str, Any]]:
+    """Return the triggers of a Bookoo scale."""
+    return [
+        {
+            CONF_PLATFORM: "device",
+            CONF_DOMAIN: DOMAIN,
+            CONF_DEVICE_ID: device_id,
+            CONF_TYPE: trigger_type,
+        }
+        for trigger_type in TRIGGER_EVENTS
+    ]
+
+
+async def async_attach_trigger(
+    hass: HomeAssistant,
+    config: ConfigType,
+    action: TriggerActionType,
+    trigger_info: TriggerInfo,
+) -> CALLBACK_TYPE:
+    """Listen to the event of a trigger, fired by this scale only."""
+    event_config = event_trigger.TRIGGER_SCHEMA(
+        {
+            event_trigger.CONF_PLATFORM: "event",
+            event_trigger.CONF_EVENT_TYPE: TRIGGER_EVENTS[config[CONF_TYPE]],
+            event_trigger.CONF_EVENT_DATA: {CONF_DEVICE_ID: config[CONF_DEVICE_ID]},
+        }
+    )
+    return await event_trigger.async_attach_trigger(
+        hass, event_config, action, trigger_info, platform_type="device"
+    )
@@ -3,11 +3,32 @@
 from __future__ import annotations
 
 from dataclasses import asdict
+import math
+import time
 from typing import Any
 
 from homeassistant.core import HomeAssistant
 
 from . import BookooConfigEntry
+from .buffer import COLUMNS, SampleBuffer
+from .manager import async_get_manager
+
+# seconds of buffered samples included in the diagnostics
+TRACE_SECONDS = 60.0
+
+
+def _trace(samples: SampleBuffer) -> dict[str, list[float | None]]:
+    """Return the latest samples as columns, timestamps relative to now."""
+    now = time.monotonic()
+    view = samples.view_since(now - TRACE_SECONDS)
+    trace: dict[str, list[float | None]] = {
+        "timestamp": [round(t - now, 3) for t in view.column("timestamp")]
+    }
+    for name in COLUMNS[1:]:
+        trace[name] = [
+            None if math.isnan(value) else value for value in view.column(name)
+        ]
+    return trace
 
 
 async def async_get_config_entry_diagnostics(
@@ -28,4 +49,25 @@ async def async_get_config_entry_diagnostics(
         "last_disconnect_time": scale.last_disconnect_time,
         "timer": scale.timer,
         "weight": scale.weight,
+        "notifications_received": coordinator.notifications_received,
+        "state_writes_dropped": coordinator.state_writes_dropped,
+        "samples_buffered": len(coordinator.samples),
+        "command_queue_depth": len(coordinator.commands),
+        "command_sending": coordinator.commands.sending,
+        "idle": coordinator.idle,
+        "spikes_rejected": (
+            {
+                "weight": coordinator.spikes.weight.rejected,
+                "flow_rate": coordinator.spikes.flow_rate.rejected,
+            }
+            if coordinator.spikes is not None
+            else None
+        ),
+        "step_samples_delayed": (
+            coordinator.spikes.delayed if coordinator.spikes is not None else None
+        ),
+        "connect_slots_waiting": async_get_manager(hass).waiting,
+        "connection_timeline": coordinator.metrics.timeline.as_list(),
+        "trace": _trace(coordinator.samples),
+        "metrics": coordinator.metrics.as_dict(),
     }
@@ -0,0 +1,140 @@
+"""Classification of discovered Bluetooth devices without connecting."""
+
+from __future__ import annotations
+
+import time
+from typing import Any, TypedDict
+
+from aiobookoo.exceptions import BookooUnknownDevice
+from aiobookoo.helpers import is_bookoo_scale
+
+from homeassistant.components.bluetooth import BluetoothServiceInfoBleak
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.device_registry import format_mac
+from homeassistant.helpers.storage import Store
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+
+DATA_DISCOVERY_CACHE: HassKey[DiscoveryCache] = HassKey(f"{DOMAIN}_discovery")
+
+STORAGE_KEY = f"{DOMAIN}.discovery"
+STORAGE_VERSION = 1
+# seconds before a cached classification is checked again
+CACHE_TTL = 30 * 24 * 3600.0
+# seconds the cache waits to collect changes before writing them
+SAVE_DELAY = 10.0
+
+LOCAL_NAME_PREFIX = "BOOKOO"
+SERVICE_UUID = "00000ffe-0000-1000-8000-00805f9b34fb"
+
+
+class _CachedClassification(TypedDict):
+    """Stored classification of a device."""
+
+    # is_valid_scale, None for devices that are no Bookoo scale
+    valid: bool | None
+    # Unix time of the classification
+    checked: float
+
+
+def is_bookoo_advertisement(service_info: BluetoothServiceInfoBleak) -> bool:
+    """Return whether an advertisement looks like a Bookoo device."""
+    return (
+        service_info.name.upper().startswith(LOCAL_NAME_PREFIX)
+        or SERVICE_UUID in service_info.service_uuids
+    )
+
+
+def is_scale_advertisement(service_info: BluetoothServiceInfoBleak) -> bool:
+    """Return whether an advertisement identifies a scale on its own.
+
+    Scales advertise both their name and the scale service, anything
+    matching only one of them needs a connection to tell.
+    """
+    return (
+        service_info.name.upper().startswith(LOCAL_NAME_PREFIX)
+        and SERVICE_UUID in service_info.service_uuids
+    )
+
+
+class DiscoveryCache:
+    """Classifications of devices by MAC address, kept across restarts."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the cache."""
+        self._store: Store[dict[str, _CachedClassification]] = Store(
+            hass, STORAGE_VERSION, STORAGE_KEY
+        )
+        self._devices: dict[str, _CachedClassification] = {}
+        self._loaded = False
+
+    async def async_load(self) -> None:
+        """Load the stored classifications unless already loaded."""
+        if self._loaded:
+            return
+        # concurrent loads share one read of the store
+        data = await self._store.async_load()
+        if not self._loaded:
+            self._devices = data or {}
+            self._loaded = True
+
+    def get(self, address: str) -> _CachedClassification | None:
+        """Return the classification of a device unless it is outdated."""
+        cached = self._devices.get(format_mac(address))
+        if cached is None or time.time() - cached["checked"] > CACHE_TTL:
+            return None
+        return cached
+
+    def set(self, address: str, valid: bool | None) -> None:
+        """Remember the classification of a device."""
+        self._devices[format_mac(address)] = {"valid": valid, "checked": time.time()}
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the classifications to store, dropping outdated ones."""
+        now = time.time()
+        return {
+            address: cached
+            for address, cached in self._devices.items()
+            if now - cached["checked"] <= CACHE_TTL
+        }
+
+
+async def async_get_discovery_cache(hass: HomeAssistant) -> DiscoveryCache:
+    """Return the discovery cache, loading it on first use."""
+    if (cache := hass.data.get(DATA_DISCOVERY_CACHE)) is None:
+        cache = hass.data[DATA_DISCOVERY_CACHE] = DiscoveryCache(hass)
+    await cache.async_load()
+    return cache
+
+
+async def async_classify_device(
+    hass: HomeAssistant,
+    address: str,
+    service_info: BluetoothServiceInfoBleak | None = None,
+) -> bool:
+    """Return is_valid_scale of a device, connecting only when unavoidable.
+
+    The advertisement decides if it is conclusive, then a classification
+    cached within CACHE_TTL, and only then the device is connected to.
+    Raises the errors of aiobookoo's is_bookoo_scale, BookooUnknownDevice
+    also for devices cached as unsupported.
+    """
+    cache = await async_get_discovery_cache(hass)
+    if service_info is not None and is_scale_advertisement(service_info):
+        if (cached := cache.get(address)) is None or cached["valid"] is not True:
+            cache.set(address, True)
+        return True
+    if (cached := cache.get(address)) is not None:
+        if cached["valid"] is None:
+            raise BookooUnknownDevice
+        return cached["valid"]
+
+    try:
+        valid = await is_bookoo_scale(address)
+    except BookooUnknownDevice:
+        cache.set(address, None)
+        raise
+    cache.set(address, valid)
+    return valid
@@ -1,7 +1,11 @@
 """Base class for Bookoo entities."""
 
+import asyncio
 from dataclasses import dataclass
+import time
+from typing import Any
 
+from homeassistant.core import callback
 from homeassistant.helpers.device_registry import (
     CONNECTION_BLUETOOTH,
     DeviceInfo,
@@ -10,24 +14,52 @@ from homeassistant.helpers.device_registry import (
 from homeassistant.helpers.entity import EntityDescription
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN
+from .const import DOMAIN, BookooSource
 from .coordinator import BookooCoordinator
 
+# seconds between state writes of high rate entities in long-term statistics mode
+HIGH_RATE_WRITE_INTERVAL = 5.0
+
+
+@dataclass(frozen=True, kw_only=True)
+class BookooEntityDescription(EntityDescription):
+    """Description shared by all Bookoo entities."""
+
+    # scale fields the entity depends on, None wakes it on every update
+    sources: frozenset[BookooSource] | None = None
+    # numeric changes within these bands of the last written value are skipped
+    deadband: float | None = None
+    relative_deadband: float | None = None
+    # minimum seconds between two state writes, the latest value is written late
+    min_write_interval: float | None = None
+    # updates with every notification, throttled in long-term statistics mode
+    high_rate: bool = False
+
 
-@dataclass
 class BookooEntity(CoordinatorEntity[BookooCoordinator]):
     """Common elements for all entities."""
 
     _attr_has_entity_name = True
 
+    entity_description: BookooEntityDescription
+    _last_written: tuple[bool, Any] | None = None
+    _last_write_time: float = 0.0
+    _pending_write: asyncio.TimerHandle | None = None
+
     def __init__(
         self,
         coordinator: BookooCoordinator,
-        entity_description: EntityDescription,
+        entity_description: BookooEntityDescription,
     ) -> None:
         """Initialize the entity."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=entity_description.sources)
         self.entity_description = entity_description
+        self._min_write_interval = entity_description.min_write_interval
+        self._throttled = (
+            coordinator.long_term_statistics and entity_description.high_rate
+        )
+        if self._throttled:
+            self._min_write_interval = HIGH_RATE_WRITE_INTERVAL
         self._scale = coordinator.scale
         formatted_mac = format_mac(self._scale.mac)
         self._attr_unique_id = f"{formatted_mac}_{entity_description.key}"
@@ -43,4 +75,122 @@ class BookooEntity(CoordinatorEntity[BookooCoordinator]):
     @property
     def available(self) -> bool:
         """Returns whether entity is available."""
-        return super().available and self._scale.connected
+        return self._attr_available
+
+    @property
+    def _written_value(self) -> Any:
+        """Return the value compared against the last written state."""
+        return None
+
+    async def async_added_to_hass(self) -> None:
+        """Handle entity which will be added."""
+        await super().async_added_to_hass()
+        self._async_update_available()
+        self._async_update_attrs()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel a pending delayed write."""
+        await super().async_will_remove_from_hass()
+        self._async_cancel_pending_write()
+
+    @callback
+    def _async_cancel_pending_write(self) -> None:
+        """Cancel a delayed write."""
+        if self._pending_write is not None:
+            self._pending_write.cancel()
+            self._pending_write = None
+
+    @callback
+    def _async_update_available(self) -> None:
+        """Update the cached availability from the coordinator."""
+        self._attr_available = (
+            self.coordinator.last_update_success
+            # an idle scale was disconnected on purpose, keep its last values
+            and (self.coordinator.snapshot.connected or self.coordinator.idle)
+        )
+
+    @callback
+    def _async_update_attrs(self) -> None:
+        """Update the cached entity attributes from the snapshot."""
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        self._async_update_available()
+        self._async_update_attrs()
+        self._async_write_if_changed()
+
+    @callback
+    def _async_write_if_changed(self) -> None:
+        """Write the state unless it is within the deadband of the last write."""
+        state = (self.available, self._written_value)
+        if self._last_written is not None and self._last_written[0] != state[0]:
+            # availability changes are written right away, a delayed write
+            # would keep showing a disconnected scale as available
+            self._async_cancel_pending_write()
+            self._async_write_state(state)
+            return
+
+        if self._last_written is not None and self._is_within_deadband(
+            self._last_written, state
+        ):
+            self.coordinator.state_writes_dropped += 1
+            return
+
+        if self._pending_write is not None:
+            # a delayed write is scheduled and will pick up the latest value
+            self.coordinator.state_writes_dropped += 1
+            return
+
+        min_interval = self._min_write_interval
+        if min_interval and self._last_written is not None:
+            remaining = self._last_write_time + min_interval - time.monotonic()
+            if remaining > 0:
+                self.coordinator.state_writes_dropped += 1
+                self._pending_write = self.hass.loop.call_later(
+                    remaining, self._async_delayed_write
+                )
+                return
+
+        self._async_write_state(state)
+
+    @callback
+    def _async_delayed_write(self) -> None:
+        """Write the latest state after the minimum write interval."""
+        self._pending_write = None
+        state = (self.available, self._written_value)
+        if self._last_written is None or not self._is_within_deadband(
+            self._last_written, state
+        ):
+            self._async_write_state(state)
+
+    @callback
+    def _async_write_state(self, state: tuple[bool, Any]) -> None:
+        """Write the state and remember what was written."""
+        self._last_written = state
+        self._last_write_time = time.monotonic()
+        self.coordinator.metrics.state_writes[self.entity_description.key] += 1
+        self.async_write_ha_state()
+
+    def _is_within_deadband(
+        self, last: tuple[bool, Any], current: tuple[bool, Any]
+    ) -> bool:
+        """Return whether the current state needs no write."""
+        if last == current:
+            return True
+        (last_available, last_value), (available, value) = last, current
+        if last_available != available:
+            return False
+        if not isinstance(value, (int, float)) or not isinstance(
+            last_value, (int, float)
+        ):
+            return False
+
+        delta = abs(value - last_value)
+        description = self.entity_description
+        if description.deadband is not None and delta <= description.deadband:
+            return True
+        return (
+            description.relative_deadband is not None
+            and delta <= description.relative_deadband * abs(last_value)
+        )
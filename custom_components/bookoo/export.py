@@ -0,0 +1,299 @@
+"""Export of shot traces and buffered samples to files."""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from array import array
+from collections.abc import Iterable, Iterator
+import csv
+from dataclasses import dataclass
+from datetime import datetime
+import importlib.util
+import json
+import math
+from pathlib import Path
+import time
+from typing import IO, Any
+
+from homeassistant.core import HomeAssistant
+
+from .buffer import SampleBuffer
+from .const import DOMAIN, ExportFormat
+from .history import ShotHistory
+
+EXPORT_DIRECTORY = f"{DOMAIN}_exports"
+EXPORT_COLUMNS = ("shot_id", "timestamp", "weight", "flow_rate", "timer")
+# samples collected into one Parquet row group
+ROW_GROUP_SIZE = 65536
+
+
+@dataclass(slots=True)
+class ExportResult:
+    """Summary of a finished export."""
+
+    path: str
+    shots: int = 0
+    samples: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class Chunk:
+    """Samples of one shot, or of the buffer, with Unix timestamps."""
+
+    shot_id: int | None
+    timestamp: array[float]
+    weight: array[float]
+    flow_rate: array[float]
+    timer: array[float]
+
+
+def parquet_available() -> bool:
+    """Return whether pyarrow is installed."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def resolve_path(hass: HomeAssistant, filename: str) -> Path | None:
+    """Return the path to export to, None if it is not allowed.
+
+    Relative names are placed in the export directory of the configuration
+    directory and may not leave it, absolute paths have to be allowlisted.
+    """
+    path = Path(filename)
+    if path.is_absolute():
+        return path if hass.config.is_allowed_path(filename) else None
+    directory = Path(hass.config.path(EXPORT_DIRECTORY)).resolve()
+    path = (directory / path).resolve()
+    return path if path.is_relative_to(directory) else None
+
+
+def _value(value: float) -> float | None:
+    """Return None for missing values."""
+    return None if math.isnan(value) else value
+
+
+class _Writer(ABC):
+    """Write chunks of samples to an open file."""
+
+    def __init__(self, file: IO[Any]) -> None:
+        """Initialize the writer."""
+        self._file = file
+
+    @abstractmethod
+    def write(self, chunk: Chunk) -> None:
+        """Write a chunk."""
+
+    def close(self) -> None:
+        """Write anything still pending."""
+
+
+class _CsvWriter(_Writer):
+    """CSV with a header row, missing values are empty."""
+
+    def __init__(self, file: IO[Any]) -> None:
+        """Initialize the writer."""
+        super().__init__(file)
+        self._csv = csv.writer(file)
+        self._csv.writerow(EXPORT_COLUMNS)
+
+    def write(self, chunk: Chunk) -> None:
+        """Write a chunk."""
+        self._csv.writerows(
+            (
+                "" if chunk.shot_id is None else chunk.shot_id,
+                *("" if math.isnan(value) else value for value in sample),
+            )
+            for sample in zip(
+                chunk.timestamp, chunk.weight, chunk.flow_rate, chunk.timer, strict=True
+            )
+        )
+
+
+class _JsonLinesWriter(_Writer):
+    """One JSON object per sample, missing values are null."""
+
+    def write(self, chunk: Chunk) -> None:
+        """Write a chunk."""
+        self._file.writelines(
+            json.dumps(
+                {
+                    "shot_id": chunk.shot_id,
+                    "timestamp": timestamp,
+                    "weight": _value(weight),
+                    "flow_rate": _value(flow_rate),
+                    "timer": _value(timer),
+                }
+            )
+            + "\n"
+            for timestamp, weight, flow_rate, timer in zip(
+                chunk.timestamp, chunk.weight, chunk.flow_rate, chunk.timer, strict=True
+            )
+        )
+
+
+class _ParquetWriter(_Writer):
+    """Parquet file written in row groups of ROW_GROUP_SIZE samples."""
+
+    def __init__(self, file: IO[Any]) -> None:
+        """Initialize the writer."""
+        super().__init__(file)
+        import pyarrow as pa  # noqa: PLC0415
+        from pyarrow import parquet as pq  # noqa: PLC0415
+
+        self._pa = pa
+        self._schema = pa.schema(
+            [
+                ("shot_id", pa.int64()),
+                ("timestamp", pa.float64()),
+                ("weight", pa.float64()),
+                ("flow_rate", pa.float64()),
+                ("timer", pa.float64()),
+            ]
+        )
+        self._parquet = pq.ParquetWriter(file, self._schema)
+        self._pending: list[Chunk] = []
+        self._pending_samples = 0
+
+    def write(self, chunk: Chunk) -> None:
+        """Write a chunk once a row group is full."""
+        self._pending.append(chunk)
+        self._pending_samples += len(chunk.timestamp)
+        if self._pending_samples >= ROW_GROUP_SIZE:
+            self._flush()
+
+    def _flush(self) -> None:
+        """Write the pending chunks as one row group."""
+        if not self._pending:
+            return
+        pa = self._pa
+        columns: dict[str, Any] = {
+            "shot_id": pa.array(
+                [
+                    chunk.shot_id
+                    for chunk in self._pending
+                    for _ in range(len(chunk.timestamp))
+                ],
+                pa.int64(),
+            )
+        }
+        for name in EXPORT_COLUMNS[1:]:
+            values = array("d")
+            for chunk in self._pending:
+                values.extend(getattr(chunk, name))
+            # NaN marks missing values, store them as nulls
+            columns[name] = pa.array(
+                [_value(value) for value in values], pa.float64()
+            )
+        self._parquet.write_table(pa.table(columns, schema=self._schema))
+        self._pending.clear()
+        self._pending_samples = 0
+
+    def close(self) -> None:
+        """Write the last row group and the footer."""
+        self._flush()
+        self._parquet.close()
+
+
+WRITERS: dict[ExportFormat, type[_Writer]] = {
+    ExportFormat.CSV: _CsvWriter,
+    ExportFormat.JSONL: _JsonLinesWriter,
+    ExportFormat.PARQUET: _ParquetWriter,
+}
+
+
+def write_chunks(
+    path: Path, export_format: ExportFormat, chunks: Iterable[Chunk]
+) -> ExportResult:
+    """Write chunks to a file, blocking, run in the executor.
+
+    Only one chunk is held at a time (a row group for Parquet), so memory
+    doesn't grow with the size of the export. The file is written under a
+    temporary name and renamed when complete.
+    """
+    result = ExportResult(str(path))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f".{path.name}.partial")
+    binary = export_format is ExportFormat.PARQUET
+    try:
+        with partial.open(
+            "wb" if binary else "w",
+            encoding=None if binary else "utf-8",
+            newline=None if binary else "",
+        ) as file:
+            writer = WRITERS[export_format](file)
+            for chunk in chunks:
+                writer.write(chunk)
+                if chunk.shot_id is not None:
+                    result.shots += 1
+                result.samples += len(chunk.timestamp)
+            writer.close()
+        partial.replace(path)
+    finally:
+        partial.unlink(missing_ok=True)
+    return result
+
+
+def _history_chunks(
+    history: ShotHistory,
+    start: datetime | None,
+    end: datetime | None,
+    shot_ids: list[int] | None,
+) -> Iterator[Chunk]:
+    """Yield the stored shots as chunks with Unix timestamps."""
+    for record, trace in history.iter_traces(start, end, shot_ids):
+        offset = record.started_at.timestamp()
+        timestamp = array("d", (t + offset for t in trace.timestamp))
+        yield Chunk(record.id, timestamp, trace.weight, trace.flow_rate, trace.timer)
+
+
+async def async_export_history(
+    hass: HomeAssistant,
+    history: ShotHistory,
+    path: Path,
+    export_format: ExportFormat,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    shot_ids: list[int] | None = None,
+) -> ExportResult:
+    """Export stored shots, reading and writing them in the executor."""
+    return await hass.async_add_executor_job(
+        write_chunks,
+        path,
+        export_format,
+        _history_chunks(history, start, end, shot_ids),
+    )
+
+
+def _seq_at(buffer: SampleBuffer, timestamp: float) -> int:
+    """Return the sequence number of the first sample at or after a time."""
+    return buffer.view_since(timestamp).start
+
+
+async def async_export_buffer(
+    hass: HomeAssistant,
+    buffer: SampleBuffer,
+    path: Path,
+    export_format: ExportFormat,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> ExportResult:
+    """Export the buffered samples taken between two times."""
+    # buffer timestamps are monotonic
+    offset = time.time() - time.monotonic()
+    view = buffer.view(
+        None if start is None else _seq_at(buffer, start.timestamp() - offset),
+        None if end is None else _seq_at(buffer, end.timestamp() - offset),
+    )
+    # copy on the event loop, the buffer keeps changing
+    timestamp = view.column("timestamp")
+    for i, value in enumerate(timestamp):
+        timestamp[i] = value + offset
+    chunk = Chunk(
+        None,
+        timestamp,
+        view.column("weight"),
+        view.column("flow_rate"),
+        view.column("timer"),
+    )
+    return await hass.async_add_executor_job(
+        write_chunks, path, export_format, [chunk]
+    )
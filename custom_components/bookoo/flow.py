@@ -0,0 +1,234 @@
+"""Flow rate estimation from the weight samples of the scale."""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from array import array
+from enum import StrEnum
+
+from .buffer import SAMPLE_RATE
+
+# the Savitzky-Golay filter fits a quadratic, which needs a few more samples
+MIN_WINDOW = 5
+
+
+class FlowMethod(StrEnum):
+    """Method used to estimate the flow rate."""
+
+    LEAST_SQUARES = "least_squares"
+    SAVITZKY_GOLAY = "savitzky_golay"
+    KALMAN = "kalman"
+
+
+def window_size(seconds: float) -> int:
+    """Return the number of samples in a window of the given length."""
+    return max(MIN_WINDOW, round(seconds * SAMPLE_RATE))
+
+
+class FlowEstimator(ABC):
+    """Base class for incremental flow estimators.
+
+    ``update`` is called with every weight sample and costs O(1), the
+    current estimate in g/s is kept in ``value``.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        """Initialize the estimator."""
+        self.value: float | None = None
+
+    @abstractmethod
+    def update(self, timestamp: float, weight: float) -> float | None:
+        """Feed a sample and return the new estimate."""
+
+
+class LeastSquaresFlow(FlowEstimator):
+    """Slope of a least squares line through a sliding window of samples."""
+
+    __slots__ = (
+        "_count",
+        "_next",
+        "_size",
+        "_st",
+        "_stt",
+        "_stw",
+        "_sw",
+        "_t",
+        "_t0",
+        "_w",
+    )
+
+    def __init__(self, size: int) -> None:
+        """Initialize the estimator."""
+        super().__init__()
+        self._size = size
+        self._t = array("d", bytes(8 * size))
+        self._w = array("d", bytes(8 * size))
+        self._count = 0
+        self._next = 0
+        self._t0 = 0.0
+        self._st = self._sw = self._stt = self._stw = 0.0
+
+    def update(self, timestamp: float, weight: float) -> float | None:
+        """Feed a sample and return the new estimate."""
+        i = self._next
+        if not self._count:
+            self._t0 = timestamp
+        if self._count == self._size:
+            t = self._t[i] - self._t0
+            w = self._w[i]
+            self._st -= t
+            self._sw -= w
+            self._stt -= t * t
+            self._stw -= t * w
+        else:
+            self._count += 1
+        self._t[i] = timestamp
+        self._w[i] = weight
+        t = timestamp - self._t0
+        self._st += t
+        self._sw += weight
+        self._stt += t * t
+        self._stw += t * weight
+
+        self._next = i = (i + 1) % self._size
+        if not i:
+            # rebuild the sums once per window so rounding errors don't add up
+            self._rebuild()
+
+        n = self._count
+        denominator = n * self._stt - self._st * self._st
+        if n < 2 or denominator <= 0:
+            self.value = None
+        else:
+            self.value = (n * self._stw - self._st * self._sw) / denominator
+        return self.value
+
+    def _rebuild(self) -> None:
+        """Recompute the sums relative to the oldest sample."""
+        self._t0 = t0 = self._t[self._next]
+        self._st = self._sw = self._stt = self._stw = 0.0
+        for t, w in zip(self._t, self._w, strict=True):
+            t -= t0
+            self._st += t
+            self._sw += w
+            self._stt += t * t
+            self._stw += t * w
+
+
+def savitzky_golay_coefficients(size: int) -> tuple[float, ...]:
+    """Return the weights of the slope of a quadratic fit at the newest sample.
+
+    Samples are assumed to be evenly spaced one unit apart, the result has to
+    be divided by the actual sample spacing.
+    """
+    xs = [float(k - size + 1) for k in range(size)]
+    # normal equations of the fit w = a + b x + c x^2, solved for b
+    moments = [sum(x**p for x in xs) for p in range(5)]
+    matrix = [[moments[row + col] for col in range(3)] for row in range(3)]
+    inverse = _invert3(matrix)
+    return tuple(
+        inverse[1][0] + inverse[1][1] * x + inverse[1][2] * x * x for x in xs
+    )
+
+
+def _invert3(m: list[list[float]]) -> list[list[float]]:
+    """Invert a 3x3 matrix."""
+    (a, b, c), (d, e, f), (g, h, i) = m
+    cofactors = [
+        [e * i - f * h, c * h - b * i, b * f - c * e],
+        [f * g - d * i, a * i - c * g, c * d - a * f],
+        [d * h - e * g, b * g - a * h, a * e - b * d],
+    ]
+    determinant = a * cofactors[0][0] + b * cofactors[1][0] + c * cofactors[2][0]
+    return [[value / determinant for value in row] for row in cofactors]
+
+
+class SavitzkyGolayFlow(FlowEstimator):
+    """Slope of a quadratic Savitzky-Golay fit evaluated at the newest sample."""
+
+    __slots__ = ("_coefficients", "_count", "_next", "_size", "_t", "_w")
+
+    def __init__(self, size: int) -> None:
+        """Initialize the estimator."""
+        super().__init__()
+        self._size = size
+        self._coefficients = savitzky_golay_coefficients(size)
+        self._t = array("d", bytes(8 * size))
+        self._w = array("d", bytes(8 * size))
+        self._count = 0
+        self._next = 0
+
+    def update(self, timestamp: float, weight: float) -> float | None:
+        """Feed a sample and return the new estimate."""
+        i = self._next
+        self._t[i] = timestamp
+        self._w[i] = weight
+        self._next = (i + 1) % self._size
+        if self._count < self._size:
+            self._count += 1
+            if self._count < self._size:
+                return None
+
+        # the window is fixed size, so this is constant work per sample
+        oldest = self._next
+        spacing = (timestamp - self._t[oldest]) / (self._size - 1)
+        if spacing <= 0:
+            return self.value
+        size = self._size
+        w = self._w
+        slope = 0.0
+        for k, coefficient in enumerate(self._coefficients):
+            slope += coefficient * w[(oldest + k) % size]
+        self.value = slope / spacing
+        return self.value
+
+
+class KalmanFlow(FlowEstimator):
+    """Steady state Kalman (alpha-beta) filter of weight and flow.
+
+    The gains are chosen to match the noise reduction of a least squares
+    fit over a window of the given size, with less lag on flow changes.
+    """
+
+    __slots__ = ("_alpha", "_beta", "_last", "_weight")
+
+    def __init__(self, size: int) -> None:
+        """Initialize the estimator."""
+        super().__init__()
+        self._alpha = 2 * (2 * size - 1) / (size * (size + 1))
+        self._beta = 6 / (size * (size + 1))
+        self._last: float | None = None
+        self._weight = 0.0
+
+    def update(self, timestamp: float, weight: float) -> float | None:
+        """Feed a sample and return the new estimate."""
+        if self._last is None:
+            self._last = timestamp
+            self._weight = weight
+            self.value = 0.0
+            return self.value
+        dt = timestamp - self._last
+        if dt <= 0:
+            return self.value
+        self._last = timestamp
+        flow = self.value or 0.0
+        predicted = self._weight + flow * dt
+        residual = weight - predicted
+        self._weight = predicted + self._alpha * residual
+        self.value = flow + self._beta * residual / dt
+        return self.value
+
+
+ESTIMATORS: dict[FlowMethod, type[FlowEstimator]] = {
+    FlowMethod.LEAST_SQUARES: LeastSquaresFlow,
+    FlowMethod.SAVITZKY_GOLAY: SavitzkyGolayFlow,
+    FlowMethod.KALMAN: KalmanFlow,
+}
+
+
+def create_estimator(method: FlowMethod, size: int) -> FlowEstimator:
+    """Create an incremental flow estimator."""
+    return ESTIMATORS[method](size)  # type: ignore[call-arg]
+
@@ -0,0 +1,422 @@
+"""Persistent shot history for Bookoo scales."""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime
+import sqlite3
+import sys
+import threading
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .buffer import SampleView
+from .const import DOMAIN
+from .profiles import PROFILE_POINTS, resample_profile
+from .shot import Shot
+
+HISTORY_FILENAME = f"{DOMAIN}_shots.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shots (
+    id INTEGER PRIMARY KEY,
+    address TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    duration REAL NOT NULL,
+    yield REAL NOT NULL,
+    final_weight REAL NOT NULL,
+    peak_flow REAL NOT NULL,
+    samples INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_shots_address_started_at
+    ON shots (address, started_at);
+CREATE TABLE IF NOT EXISTS traces (
+    shot_id INTEGER PRIMARY KEY REFERENCES shots (id) ON DELETE CASCADE,
+    timestamp BLOB NOT NULL,
+    weight BLOB NOT NULL,
+    flow_rate BLOB NOT NULL,
+    timer BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS profiles (
+    shot_id INTEGER PRIMARY KEY REFERENCES shots (id) ON DELETE CASCADE,
+    vector BLOB NOT NULL
+);
+"""
+
+TRACE_COLUMNS = ("timestamp", "weight", "flow_rate", "timer")
+
+
+@dataclass(frozen=True, slots=True)
+class ShotRecord:
+    """Metadata of a stored shot."""
+
+    id: int
+    address: str
+    started_at: datetime
+    duration: float
+    yield_weight: float
+    final_weight: float
+    peak_flow: float
+    samples: int
+
+
+@dataclass(frozen=True, slots=True)
+class ShotTrace:
+    """Samples of a stored shot, timestamps are seconds since the shot start."""
+
+    timestamp: array[float]
+    weight: array[float]
+    flow_rate: array[float]
+    timer: array[float]
+
+    @classmethod
+    def from_view(cls, view: SampleView, start: float) -> ShotTrace:
+        """Copy a trace out of the sample buffer."""
+        timestamp = view.column("timestamp")
+        for i, value in enumerate(timestamp):
+            timestamp[i] = value - start
+        return cls(
+            timestamp=timestamp,
+            weight=view.column("weight"),
+            flow_rate=view.column("flow_rate"),
+            timer=view.column("timer"),
+        )
+
+    def __len__(self) -> int:
+        """Return the number of samples."""
+        return len(self.timestamp)
+
+
+@dataclass(frozen=True, slots=True)
+class ShotSummary:
+    """Aggregates of the shots started in a period."""
+
+    count: int
+    yield_min: float
+    yield_max: float
+    yield_mean: float
+    duration_min: float
+    duration_max: float
+    duration_mean: float
+    peak_flow_min: float
+    peak_flow_max: float
+    peak_flow_mean: float
+    total_yield: float
+    # totals over all shots started before the end of the period
+    cumulative_count: int
+    cumulative_yield: float
+
+
+RECORD_COLUMNS = (
+    "id, address, started_at, duration, yield, final_weight, peak_flow, samples"
+)
+
+
+def _record(row: tuple[Any, ...]) -> ShotRecord:
+    """Return the record of a row of RECORD_COLUMNS."""
+    return ShotRecord(
+        id=row[0],
+        address=row[1],
+        started_at=dt_util.utc_from_timestamp(row[2]),
+        duration=row[3],
+        yield_weight=row[4],
+        final_weight=row[5],
+        peak_flow=row[6],
+        samples=row[7],
+    )
+
+
+def _to_blob(column: array[float]) -> bytes:
+    """Encode a column as little endian doubles."""
+    if sys.byteorder == "big":
+        column = array("d", column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _from_blob(blob: bytes) -> array[float]:
+    """Decode a column stored with _to_blob."""
+    column = array("d")
+    column.frombytes(blob)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column
+
+
+class ShotHistory:
+    """Shot index and traces stored in a SQLite database.
+
+    All database access happens in the executor, the public coroutines are
+    safe to call from the event loop.
+    """
+
+    def __init__(self, hass: HomeAssistant, address: str) -> None:
+        """Initialize the history."""
+        self._hass = hass
+        self._address = address
+        self._path = hass.config.path(HISTORY_FILENAME)
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        self._closed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database, must be called with the lock held."""
+        if self._closed:
+            # like a closed sqlite3 connection, late calls must not reopen it
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        if self._connection is None:
+            connection = sqlite3.connect(self._path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA foreign_keys=ON")
+            connection.executescript(SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    async def async_add(
+        self,
+        shot: Shot,
+        started_at: datetime,
+        trace: ShotTrace,
+        profile: array[float],
+    ) -> int | None:
+        """Store a completed shot and its profile and return its id.
+
+        Returns None if the history was closed before the shot was stored.
+        """
+        return await self._hass.async_add_executor_job(
+            self._add, shot, started_at, trace, profile
+        )
+
+    def _add(
+        self,
+        shot: Shot,
+        started_at: datetime,
+        trace: ShotTrace,
+        profile: array[float],
+    ) -> int | None:
+        """Store a completed shot."""
+        with self._lock:
+            if self._closed:
+                # queued before the entry was unloaded
+                return None
+            connection = self._connect()
+            with connection:
+                cursor = connection.execute(
+                    "INSERT INTO shots (address, started_at, duration, yield,"
+                    " final_weight, peak_flow, samples)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        self._address,
+                        started_at.timestamp(),
+                        shot.duration,
+                        shot.yield_weight,
+                        shot.final_weight,
+                        shot.peak_flow,
+                        len(trace),
+                    ),
+                )
+                shot_id = cursor.lastrowid
+                connection.execute(
+                    "INSERT INTO traces (shot_id, timestamp, weight, flow_rate, timer)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (
+                        shot_id,
+                        *(_to_blob(getattr(trace, name)) for name in TRACE_COLUMNS),
+                    ),
+                )
+                connection.execute(
+                    "INSERT INTO profiles (shot_id, vector) VALUES (?, ?)",
+                    (shot_id, _to_blob(profile)),
+                )
+        assert shot_id is not None
+        return shot_id
+
+    async def async_load_profiles(self) -> list[tuple[int, array[float]]]:
+        """Return the profiles of all stored shots, oldest first."""
+        return await self._hass.async_add_executor_job(self._load_profiles)
+
+    def _load_profiles(self) -> list[tuple[int, array[float]]]:
+        """Load the profiles, computing those missing from the traces."""
+        profiles = []
+        with self._lock:
+            connection = self._connect()
+            rows = connection.execute(
+                "SELECT shots.id, profiles.vector FROM shots"
+                " LEFT JOIN profiles ON profiles.shot_id = shots.id"
+                " WHERE shots.address = ? ORDER BY shots.started_at",
+                (self._address,),
+            ).fetchall()
+            with connection:
+                for shot_id, vector in rows:
+                    profile = _from_blob(vector) if vector is not None else None
+                    if profile is None or len(profile) != PROFILE_POINTS:
+                        # stored before profiles existed or with another length
+                        timestamp, weight = connection.execute(
+                            "SELECT timestamp, weight FROM traces WHERE shot_id = ?",
+                            (shot_id,),
+                        ).fetchone()
+                        profile = resample_profile(
+                            _from_blob(timestamp), _from_blob(weight)
+                        )
+                        connection.execute(
+                            "INSERT OR REPLACE INTO profiles (shot_id, vector)"
+                            " VALUES (?, ?)",
+                            (shot_id, _to_blob(profile)),
+                        )
+                    profiles.append((shot_id, profile))
+        return profiles
+
+    async def async_list(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int | None = None,
+    ) -> list[ShotRecord]:
+        """Return the stored shots of the scale, newest first."""
+        return await self._hass.async_add_executor_job(self._list, start, end, limit)
+
+    def _list(
+        self, start: datetime | None, end: datetime | None, limit: int | None
+    ) -> list[ShotRecord]:
+        """Query the shot index."""
+        query = f"SELECT {RECORD_COLUMNS} FROM shots WHERE address = ?"  # noqa: S608
+        params: list[object] = [self._address]
+        if start is not None:
+            query += " AND started_at >= ?"
+            params.append(start.timestamp())
+        if end is not None:
+            query += " AND started_at < ?"
+            params.append(end.timestamp())
+        query += " ORDER BY started_at DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._connect().execute(query, params).fetchall()
+        return [_record(row) for row in rows]
+
+    def iter_traces(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        shot_ids: list[int] | None = None,
+    ) -> Iterator[tuple[ShotRecord, ShotTrace]]:
+        """Yield stored shots with their traces one at a time, oldest first.
+
+        Blocking, iterate in the executor. Rows are read lazily through a
+        separate connection, which in WAL mode doesn't block storing shots.
+        """
+        with self._lock:
+            # creates the tables if this is the first access
+            self._connect()
+        query = (
+            f"SELECT {RECORD_COLUMNS}, traces.timestamp, traces.weight,"  # noqa: S608
+            " traces.flow_rate, traces.timer"
+            " FROM shots JOIN traces ON traces.shot_id = shots.id"
+            " WHERE address = ?"
+        )
+        params: list[object] = [self._address]
+        if start is not None:
+            query += " AND started_at >= ?"
+            params.append(start.timestamp())
+        if end is not None:
+            query += " AND started_at < ?"
+            params.append(end.timestamp())
+        if shot_ids is not None:
+            query += f" AND id IN ({', '.join('?' * len(shot_ids))})"
+            params.extend(shot_ids)
+        query += " ORDER BY started_at"
+
+        connection = sqlite3.connect(self._path)
+        try:
+            for row in connection.execute(query, params):
+                yield _record(row), ShotTrace(*(_from_blob(blob) for blob in row[8:]))
+        finally:
+            connection.close()
+
+    async def async_get_shots(self, shot_ids: list[int]) -> dict[int, ShotRecord]:
+        """Return the stored shots with the given ids."""
+        return await self._hass.async_add_executor_job(self._get_shots, shot_ids)
+
+    def _get_shots(self, shot_ids: list[int]) -> dict[int, ShotRecord]:
+        """Query shots by id."""
+        if not shot_ids:
+            return {}
+        placeholders = ", ".join("?" * len(shot_ids))
+        with self._lock:
+            rows = (
+                self._connect()
+                .execute(
+                    f"SELECT {RECORD_COLUMNS} FROM shots"  # noqa: S608
+                    f" WHERE address = ? AND id IN ({placeholders})",
+                    (self._address, *shot_ids),
+                )
+                .fetchall()
+            )
+        return {row[0]: _record(row) for row in rows}
+
+    async def async_summarize(
+        self, start: datetime, end: datetime
+    ) -> ShotSummary | None:
+        """Return aggregates of the shots started in a period, if any."""
+        return await self._hass.async_add_executor_job(self._summarize, start, end)
+
+    def _summarize(self, start: datetime, end: datetime) -> ShotSummary | None:
+        """Aggregate the shot index."""
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT COUNT(*), MIN(yield), MAX(yield), AVG(yield),"
+                " MIN(duration), MAX(duration), AVG(duration),"
+                " MIN(peak_flow), MAX(peak_flow), AVG(peak_flow), TOTAL(yield)"
+                " FROM shots WHERE address = ? AND started_at >= ?"
+                " AND started_at < ?",
+                (self._address, start.timestamp(), end.timestamp()),
+            ).fetchone()
+            cumulative = connection.execute(
+                "SELECT COUNT(*), TOTAL(yield) FROM shots"
+                " WHERE address = ? AND started_at < ?",
+                (self._address, end.timestamp()),
+            ).fetchone()
+        if not row[0]:
+            return None
+        return ShotSummary(*row, *cumulative)
+
+    async def async_get_trace(self, shot_id: int) -> ShotTrace | None:
+        """Return the samples of a stored shot of the scale."""
+        return await self._hass.async_add_executor_job(self._get_trace, shot_id)
+
+    def _get_trace(self, shot_id: int) -> ShotTrace | None:
+        """Load the samples of a stored shot."""
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT traces.timestamp, traces.weight, traces.flow_rate,"
+                    " traces.timer FROM traces"
+                    " JOIN shots ON shots.id = traces.shot_id"
+                    " WHERE shots.address = ? AND traces.shot_id = ?",
+                    (self._address, shot_id),
+                )
+                .fetchone()
+            )
+        if row is None:
+            return None
+        return ShotTrace(*(_from_blob(blob) for blob in row))
+
+    async def async_close(self) -> None:
+        """Close the database, it is not opened again."""
+        await self._hass.async_add_executor_job(self._close)
+
+    def _close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._closed = True
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -0,0 +1,66 @@
+"""Detection of idle scales whose connection can be released."""
+
+from __future__ import annotations
+
+# weight changes up to this many grams don't count as using the scale
+WEIGHT_TOLERANCE = 0.3
+# seconds without advertisements after which an advertisement means the
+# scale was switched on again
+ADVERTISEMENT_GAP = 30.0
+
+
+class IdleTracker:
+    """Track when a scale was last used.
+
+    The scale counts as used while the weight moves or the timer runs, and
+    when a command is sent. Updating is a few comparisons per notification,
+    whether the scale is idle is only checked on the coordinator's polls.
+
+    A connected scale doesn't advertise, so the gap before the first
+    advertisement after releasing the connection is measured from the
+    release rather than from the last advertisement seen.
+    """
+
+    __slots__ = (
+        "_last_activity",
+        "_last_advertisement",
+        "_timer",
+        "_weight",
+        "timeout",
+    )
+
+    def __init__(self, timeout: float) -> None:
+        """Initialize the tracker, a timeout of 0 never reports idle."""
+        self.timeout = timeout
+        self._last_activity = 0.0
+        self._weight: float | None = None
+        self._timer: float | None = None
+        self._last_advertisement: float | None = None
+
+    def activity(self, now: float) -> None:
+        """Record that the scale is being used."""
+        self._last_activity = now
+
+    def update(self, now: float, weight: float | None, timer: float | None) -> None:
+        """Record a sample, changes of weight or timer are activity."""
+        if weight is not None and (
+            self._weight is None or abs(weight - self._weight) > WEIGHT_TOLERANCE
+        ):
+            self._weight = weight
+            self._last_activity = now
+        if timer != self._timer:
+            self._timer = timer
+            self._last_activity = now
+
+    def is_idle(self, now: float) -> bool:
+        """Return whether the scale was not used for the timeout."""
+        return bool(self.timeout) and now - self._last_activity >= self.timeout
+
+    def released(self, now: float) -> None:
+        """Record that the connection was released."""
+        self._last_advertisement = now
+
+    def advertised(self, now: float) -> bool:
+        """Record an advertisement, return whether it followed a gap."""
+        last, self._last_advertisement = self._last_advertisement, now
+        return last is None or now - last >= ADVERTISEMENT_GAP
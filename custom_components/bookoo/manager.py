@@ -0,0 +1,103 @@
+"""Bluetooth resources shared by all Bookoo scales."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+import heapq
+import itertools
+import time
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+
+DATA_MANAGER: HassKey[BookooConnectionManager] = HassKey(DOMAIN)
+
+# connection attempts running at the same time across all scales
+MAX_CONCURRENT_CONNECTS = 2
+# seconds an advertisement or a dropped connection marks a scale as in use
+ACTIVE_WINDOW = 60.0
+
+PRIORITY_ACTIVE = 0
+PRIORITY_IDLE = 1
+
+
+class BookooConnectionManager:
+    """Share the Bluetooth adapters and proxies between all Bookoo scales.
+
+    Connection attempts hold one of MAX_CONCURRENT_CONNECTS slots. When all
+    slots are taken, waiting scales that advertised or dropped a connection
+    recently, i.e. are being used, get the next free slot before scales
+    retrying blindly. Nothing here runs per notification, so the cost of a
+    notification doesn't grow with the number of scales.
+    """
+
+    def __init__(self, max_connects: int = MAX_CONCURRENT_CONNECTS) -> None:
+        """Initialize the manager."""
+        self._free = max_connects
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._order = itertools.count()
+        self._advertised: dict[str, float] = {}
+
+    @callback
+    def async_advertised(self, address: str) -> None:
+        """Remember that a scale advertised."""
+        self._advertised[address] = time.monotonic()
+
+    def priority(self, address: str, last_disconnect: float | None) -> int:
+        """Return the priority of a connection attempt, lower goes first."""
+        seen = self._advertised.get(address)
+        if seen is not None and time.monotonic() - seen < ACTIVE_WINDOW:
+            return PRIORITY_ACTIVE
+        # the scale reports the time of its last disconnect as a Unix time
+        if (
+            last_disconnect is not None
+            and time.time() - last_disconnect < ACTIVE_WINDOW
+        ):
+            return PRIORITY_ACTIVE
+        return PRIORITY_IDLE
+
+    @property
+    def waiting(self) -> int:
+        """Return the number of scales waiting for a connection slot."""
+        return sum(not future.done() for _, _, future in self._waiters)
+
+    @asynccontextmanager
+    async def async_connect_slot(self, priority: int) -> AsyncIterator[None]:
+        """Hold a connection slot for the duration of a connection attempt."""
+        if self._free and not self._waiters:
+            self._free -= 1
+        else:
+            future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._order), future))
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # the slot was handed over just before the cancellation
+                    self._release()
+                raise
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        """Hand a slot over to the next waiting scale or free it."""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._free += 1
+
+
+@callback
+def async_get_manager(hass: HomeAssistant) -> BookooConnectionManager:
+    """Return the connection manager, creating it on first use."""
+    if (manager := hass.data.get(DATA_MANAGER)) is None:
+        manager = hass.data[DATA_MANAGER] = BookooConnectionManager()
+    return manager
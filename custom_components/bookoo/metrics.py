@@ -0,0 +1,205 @@
+"""Latency and throughput instrumentation of the Bookoo pipeline."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import Counter, deque
+import time
+from typing import Any, NamedTuple
+
+# share of a new interval mixed into the notification rate
+RATE_SMOOTHING = 0.1
+# connection events kept for diagnostics
+TIMELINE_LENGTH = 50
+
+
+def log_bounds(low: float, high: float, per_decade: int = 4) -> tuple[float, ...]:
+    """Return logarithmically spaced bucket bounds from low to high."""
+    bounds = []
+    value = low
+    step = 10 ** (1 / per_decade)
+    while value < high * (1 + 1e-9):
+        bounds.append(round(value, 6))
+        value *= step
+    return tuple(bounds)
+
+
+# milliseconds, from 10 microseconds to 100 seconds
+MS_BOUNDS = log_bounds(0.01, 100_000)
+
+
+class Histogram:
+    """Fixed size histogram, recording a value is a bisect and an increment."""
+
+    __slots__ = ("bounds", "count", "counts", "max", "total")
+
+    def __init__(self, bounds: tuple[float, ...] = MS_BOUNDS) -> None:
+        """Initialize the histogram."""
+        self.bounds = bounds
+        # the last bucket collects everything above the highest bound
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        """Record a value."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, percent: float) -> float | None:
+        """Return the upper bound of the bucket holding the percentile."""
+        if not self.count:
+            return None
+        rank = self.count * percent / 100
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return self.max
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a summary for diagnostics."""
+        buckets = {
+            f"<={bound}": count
+            for bound, count in zip(self.bounds, self.counts, strict=False)
+            if count
+        }
+        if self.counts[-1]:
+            buckets[f">{self.bounds[-1]}"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max,
+            "buckets": buckets,
+        }
+
+
+class ConnectionEvent(NamedTuple):
+    """A connect, failed connect or disconnect of a scale."""
+
+    event: str
+    # Unix time
+    time: float
+    # seconds the attempt took, or the connection lasted for disconnects
+    duration: float | None
+    error: str | None = None
+
+
+class ConnectionTimeline:
+    """The last TIMELINE_LENGTH connection events of a scale."""
+
+    __slots__ = ("connected_since", "events")
+
+    def __init__(self) -> None:
+        """Initialize the timeline."""
+        self.events: deque[ConnectionEvent] = deque(maxlen=TIMELINE_LENGTH)
+        self.connected_since: float | None = None
+
+    def connected(self, now: float, attempt: float) -> None:
+        """Record a connect at a Unix time, attempt in seconds."""
+        self.connected_since = now
+        self.events.append(ConnectionEvent("connected", now, attempt))
+
+    def connect_failed(self, now: float, attempt: float, error: str) -> None:
+        """Record a failed connection attempt."""
+        self.events.append(ConnectionEvent("connect_failed", now, attempt, error))
+
+    def disconnected(self, now: float) -> None:
+        """Record a disconnect of an established connection."""
+        if self.connected_since is None:
+            return
+        duration = max(now - self.connected_since, 0.0)
+        self.connected_since = None
+        self.events.append(ConnectionEvent("disconnected", now, duration))
+
+    def as_list(self) -> list[dict[str, Any]]:
+        """Return the events for diagnostics, oldest first."""
+        return [event._asdict() for event in self.events]
+
+
+class BookooMetrics:
+    """Instrumentation collected by a coordinator, all durations in ms."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.notification_interval = Histogram()
+        self.callback_time = Histogram()
+        self.connect_time = Histogram()
+        self.connect_wait = Histogram()
+        self.connect_failures = 0
+        self.timeline = ConnectionTimeline()
+        self.command_time: dict[str, Histogram] = {}
+        self.command_failures: Counter[str] = Counter()
+        self.state_writes: Counter[str] = Counter()
+        self.notification_rate: float | None = None
+        self._last_notification: float | None = None
+        self.idle_disconnects = 0
+        self._slot_time_saved = 0.0
+        self._idle_since: float | None = None
+
+    def record_notification(self, now: float) -> None:
+        """Record the arrival of a notification, now in seconds."""
+        if self._last_notification is not None:
+            interval = now - self._last_notification
+            self.notification_interval.record(interval * 1000)
+            if interval > 0:
+                rate = 1 / interval
+                self.notification_rate = (
+                    rate
+                    if self.notification_rate is None
+                    else self.notification_rate
+                    + RATE_SMOOTHING * (rate - self.notification_rate)
+                )
+        self._last_notification = now
+
+    def record_command(self, name: str, duration: float, success: bool) -> None:
+        """Record the round trip of a command, duration in seconds."""
+        if (histogram := self.command_time.get(name)) is None:
+            histogram = self.command_time[name] = Histogram()
+        histogram.record(duration * 1000)
+        if not success:
+            self.command_failures[name] += 1
+
+    def idle_started(self, now: float) -> None:
+        """Record releasing the connection of an idle scale."""
+        self.idle_disconnects += 1
+        self._idle_since = now
+
+    def idle_ended(self, now: float) -> None:
+        """Record that the idle scale is needed again."""
+        if self._idle_since is not None:
+            self._slot_time_saved += now - self._idle_since
+            self._idle_since = None
+
+    def slot_time_saved(self, now: float) -> float:
+        """Return the seconds the connection was released, now included."""
+        if self._idle_since is None:
+            return self._slot_time_saved
+        return self._slot_time_saved + now - self._idle_since
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return all metrics for diagnostics."""
+        return {
+            "notification_interval_ms": self.notification_interval.as_dict(),
+            "notification_rate_hz": self.notification_rate,
+            "callback_time_ms": self.callback_time.as_dict(),
+            "connect_time_ms": self.connect_time.as_dict(),
+            "connect_wait_ms": self.connect_wait.as_dict(),
+            "connect_failures": self.connect_failures,
+            "idle_disconnects": self.idle_disconnects,
+            "slot_time_saved_s": round(self.slot_time_saved(time.monotonic()), 1),
+            "command_time_ms": {
+                name: histogram.as_dict()
+                for name, histogram in self.command_time.items()
+            },
+            "command_failures": dict(self.command_failures),
+            "state_writes": dict(self.state_writes),
+        }
@@ -1,32 +1,40 @@
 """Number platform for Bookoo integration."""
 from __future__ import annotations
 
+from collections.abc import Callable, Coroutine
 from dataclasses import dataclass
+from typing import Any
+
+from aiobookoo.bookooscale import BookooScale
 
 from homeassistant.components.number import (
     NumberEntity,
     NumberEntityDescription,
     NumberMode,
+    RestoreNumber,
 )
-from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfMass, UnitOfTime
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DOMAIN
-from .coordinator import BookooCoordinator
-from .entity import BookooEntity
+from .const import BookooSource
+from .coordinator import BookooConfigEntry, BookooCoordinator
+from .entity import BookooEntity, BookooEntityDescription
+from .snapshot import ScaleSnapshot
+from .target import MAX_LAG, TargetWeightController
 
 
-@dataclass
-class BookooNumberEntityDescription(NumberEntityDescription):
+@dataclass(kw_only=True, frozen=True)
+class BookooNumberEntityDescription(BookooEntityDescription, NumberEntityDescription):
     """Class describing Bookoo number entities."""
 
     min_value: float = 0
     max_value: float = 100
     step: float = 1
-    mode: str = NumberMode.AUTO
-    set_fn: callable = None
-    value_fn: callable = None
+    mode: NumberMode = NumberMode.AUTO
+    set_fn: Callable[[BookooScale, float], Coroutine[Any, Any, None]]
+    value_fn: Callable[[ScaleSnapshot], float | None]
+    sources: frozenset[BookooSource] | None = frozenset({BookooSource.DEVICE_STATE})
 
 
 NUMBER_TYPES: tuple[BookooNumberEntityDescription, ...] = (
@@ -38,7 +46,7 @@ NUMBER_TYPES: tuple[BookooNumberEntityDescription, ...] = (
         max_value=5,
         step=1,
         mode=NumberMode.SLIDER,
-        value_fn=lambda scale: scale.device_state.buzzer_gear if scale.device_state else 0,
+        value_fn=lambda snapshot: snapshot.buzzer_gear,
         set_fn=lambda scale, value: scale.set_beep_level(int(value)),
     ),
     BookooNumberEntityDescription(
@@ -49,25 +57,69 @@ NUMBER_TYPES: tuple[BookooNumberEntityDescription, ...] = (
         max_value=30,
         step=1,
         mode=NumberMode.BOX,
-        value_fn=lambda scale: scale.device_state.standby_time if scale.device_state else 5,
+        value_fn=lambda snapshot: snapshot.standby_time,
         set_fn=lambda scale, value: scale.set_auto_off(int(value)),
     ),
 )
 
 
+@dataclass(kw_only=True, frozen=True)
+class BookooTargetNumberEntityDescription(
+    BookooEntityDescription, NumberEntityDescription
+):
+    """Class describing the settings of the target weight stop."""
+
+    value_fn: Callable[[TargetWeightController], float | None]
+    set_fn: Callable[[BookooCoordinator, float], None]
+    sources: frozenset[BookooSource] | None = frozenset({BookooSource.TARGET})
+
+
+TARGET_NUMBER_TYPES: tuple[BookooTargetNumberEntityDescription, ...] = (
+    BookooTargetNumberEntityDescription(
+        key="target_weight",
+        translation_key="target_weight",
+        native_min_value=0,
+        native_max_value=200,
+        native_step=0.1,
+        native_unit_of_measurement=UnitOfMass.GRAMS,
+        mode=NumberMode.BOX,
+        value_fn=lambda target: target.target or 0,
+        set_fn=lambda coordinator, value: coordinator.async_set_target(value),
+    ),
+    BookooTargetNumberEntityDescription(
+        key="stop_lag",
+        translation_key="stop_lag",
+        entity_category=EntityCategory.CONFIG,
+        native_min_value=0,
+        native_max_value=MAX_LAG,
+        native_step=0.05,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        mode=NumberMode.BOX,
+        value_fn=lambda target: round(target.lag, 2),
+        set_fn=lambda coordinator, value: coordinator.async_set_target(
+            coordinator.target.target, value
+        ),
+    ),
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
-    entry: ConfigEntry,
+    entry: BookooConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Bookoo number entities."""
-    coordinator: BookooCoordinator = hass.data[DOMAIN][entry.entry_id]
+    coordinator = entry.runtime_data
 
-    entities = [
+    entities: list[NumberEntity] = [
         BookooNumber(coordinator, description) for description in NUMBER_TYPES
     ]
+    entities.extend(
+        BookooTargetNumber(coordinator, description)
+        for description in TARGET_NUMBER_TYPES
+    )
 
-    async_add_entities(entities, True)
+    async_add_entities(entities)
 
 
 class BookooNumber(BookooEntity, NumberEntity):
@@ -75,13 +127,6 @@ class BookooNumber(BookooEntity, NumberEntity):
 
     entity_description: BookooNumberEntityDescription
 
-    @property
-    def native_value(self) -> float | None:
-        """Return the current value."""
-        if not self._scale.device_state:
-            return None
-        return self.entity_description.value_fn(self._scale)
-
     @property
     def mode(self) -> NumberMode:
         """Return the mode of the entity."""
@@ -102,12 +147,59 @@ class BookooNumber(BookooEntity, NumberEntity):
         """Return the increment/decrement step."""
         return self.entity_description.step
 
+    @property
+    def _written_value(self) -> float | None:
+        """Return the value compared against the last written state."""
+        return self._attr_native_value
+
+    @callback
+    def _async_update_attrs(self) -> None:
+        """Update the cached entity attributes from the snapshot."""
+        self._attr_native_value = self.entity_description.value_fn(
+            self.coordinator.snapshot
+        )
+
     async def async_set_native_value(self, value: float) -> None:
         """Update the current value."""
-        await self.entity_description.set_fn(self._scale, value)
-        self.async_write_ha_state()
+        set_fn = self.entity_description.set_fn
+        await self.coordinator.commands.async_submit(
+            self.entity_description.key,
+            lambda scale: set_fn(scale, value),
+            setting=True,
+        )
+        self._handle_coordinator_update()
+
+
+class BookooTargetNumber(BookooEntity, RestoreNumber):
+    """Representation of a setting of the target weight stop."""
+
+    entity_description: BookooTargetNumberEntityDescription
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the last value."""
+        await super().async_added_to_hass()
+        last_data = await self.async_get_last_number_data()
+        if last_data is not None and last_data.native_value is not None:
+            self.entity_description.set_fn(self.coordinator, last_data.native_value)
+        self._async_update_attrs()
+
+    @property
+    def available(self) -> bool:
+        """Return True, the setting is kept by the integration."""
+        return True
+
+    @property
+    def _written_value(self) -> float | None:
+        """Return the value compared against the last written state."""
+        return self._attr_native_value
 
     @callback
-    def _handle_coordinator_update(self, *args, **kwargs) -> None:
-        """Handle updated data from the coordinator."""
-        self.async_write_ha_state()
+    def _async_update_attrs(self) -> None:
+        """Update the cached entity attributes from the controller."""
+        self._attr_native_value = self.entity_description.value_fn(
+            self.coordinator.target
+        )
+
+    async def async_set_native_value(self, value: float) -> None:
+        """Update the current value."""
+        self.entity_description.set_fn(self.coordinator, value)
@@ -0,0 +1,133 @@
+"""Shot profiles and similarity search over stored shots."""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Sequence
+import heapq
+import math
+
+# profiles are the yield sampled every PROFILE_STEP seconds of the shot
+PROFILE_STEP = 0.5
+PROFILE_POINTS = 120
+
+
+def resample_profile(
+    timestamps: Sequence[float], weights: Sequence[float]
+) -> array[float]:
+    """Return the yield of a trace resampled to a fixed length vector.
+
+    Timestamps are seconds since the shot start. The yield is the weight
+    minus the first weight, interpolated linearly and held after the end of
+    the trace. Missing weights (NaN) are skipped.
+    """
+    profile = array("d", bytes(8 * PROFILE_POINTS))
+    points = [
+        (t, w) for t, w in zip(timestamps, weights, strict=True) if not math.isnan(w)
+    ]
+    if not points:
+        return profile
+    base = points[0][1]
+    last = len(points) - 1
+    i = 0
+    for k in range(PROFILE_POINTS):
+        t = k * PROFILE_STEP
+        while i < last and points[i + 1][0] <= t:
+            i += 1
+        t0, w0 = points[i]
+        if i < last and t > t0:
+            t1, w1 = points[i + 1]
+            w0 += (w1 - w0) * (t - t0) / (t1 - t0)
+        profile[k] = w0 - base
+    return profile
+
+
+def profile_value(profile: Sequence[float], elapsed: float) -> float:
+    """Return the yield of a profile after the given seconds of a shot."""
+    position = min(max(elapsed / PROFILE_STEP, 0.0), PROFILE_POINTS - 1.0)
+    k = int(position)
+    if k == PROFILE_POINTS - 1:
+        return profile[k]
+    return profile[k] + (profile[k + 1] - profile[k]) * (position - k)
+
+
+class ProfileIndex:
+    """Profiles of the stored shots of a scale, kept in one flat array.
+
+    The array is a row-major matrix of one profile per row, so NumPy can
+    compute the distance to every stored shot in a single vectorized
+    operation without copying the profiles.
+    """
+
+    __slots__ = ("_rows", "_vectors", "ids")
+
+    def __init__(self) -> None:
+        """Initialize the index."""
+        self.ids: list[int] = []
+        self._rows: dict[int, int] = {}
+        self._vectors = array("d")
+
+    def __len__(self) -> int:
+        """Return the number of indexed shots."""
+        return len(self.ids)
+
+    def add(self, shot_id: int, profile: array[float]) -> None:
+        """Add the profile of a shot."""
+        if shot_id in self._rows:
+            return
+        self._rows[shot_id] = len(self.ids)
+        self.ids.append(shot_id)
+        self._vectors.extend(profile)
+
+    def get(self, shot_id: int) -> array[float] | None:
+        """Return the profile of a shot."""
+        if (row := self._rows.get(shot_id)) is None:
+            return None
+        start = row * PROFILE_POINTS
+        return self._vectors[start : start + PROFILE_POINTS]
+
+    def nearest(
+        self, profile: Sequence[float], limit: int, exclude: int | None = None
+    ) -> list[tuple[int, float]]:
+        """Return the ids and RMS distances in grams of the closest shots."""
+        distances = self._distances(profile)
+        candidates = (
+            (distance, shot_id)
+            for shot_id, distance in zip(self.ids, distances, strict=True)
+            if shot_id != exclude
+        )
+        return [
+            (shot_id, distance)
+            for distance, shot_id in heapq.nsmallest(limit, candidates)
+        ]
+
+    def _distances(self, profile: Sequence[float]) -> Sequence[float]:
+        """Return the RMS distance of the profile to every stored profile."""
+        if not self.ids:
+            return []
+        try:
+            import numpy as np  # noqa: PLC0415
+        except ImportError:
+            np = None
+
+        if np is None:
+            vectors = self._vectors
+            distances = []
+            for row in range(len(self.ids)):
+                start = row * PROFILE_POINTS
+                total = 0.0
+                for k, value in enumerate(profile):
+                    delta = vectors[start + k] - value
+                    total += delta * delta
+                distances.append(math.sqrt(total / PROFILE_POINTS))
+            return distances
+
+        # a view of the array, it must not outlive this call or the array
+        # could not grow anymore
+        matrix = np.frombuffer(self._vectors, dtype=np.float64).reshape(
+            -1, PROFILE_POINTS
+        )
+        deltas = matrix - np.asarray(profile, dtype=np.float64)
+        result = np.sqrt(np.einsum("ij,ij->i", deltas, deltas) / PROFILE_POINTS)
+        del matrix
+        return result.tolist()
@@ -0,0 +1,43 @@
+"""Reconnect scheduling for Bookoo scales."""
+
+from __future__ import annotations
+
+import random
+
+INITIAL_DELAY = 5.0
+MAX_DELAY = 300.0
+FACTOR = 2.0
+JITTER = 0.2
+
+
+class ReconnectBackoff:
+    """Jittered exponential backoff between connection attempts.
+
+    The scale is powered off most of the day, so failed attempts push the
+    next one further out. Seeing an advertisement of the scale resets the
+    backoff, which makes connecting event driven rather than polled.
+    """
+
+    __slots__ = ("_next_attempt", "failures")
+
+    def __init__(self) -> None:
+        """Initialize the backoff."""
+        self.failures = 0
+        self._next_attempt = 0.0
+
+    def ready(self, now: float) -> bool:
+        """Return whether a connection attempt is due."""
+        return now >= self._next_attempt
+
+    def failed(self, now: float) -> float:
+        """Record a failed attempt and return the delay until the next one."""
+        delay = min(MAX_DELAY, INITIAL_DELAY * FACTOR**self.failures)
+        delay *= random.uniform(1 - JITTER, 1 + JITTER)
+        self.failures += 1
+        self._next_attempt = now + delay
+        return delay
+
+    def reset(self) -> None:
+        """Allow the next attempt right away."""
+        self.failures = 0
+        self._next_attempt = 0.0
@@ -1,10 +1,13 @@
 """Sensor platform for Bookoo."""
 
+from __future__ import annotations
+
 from collections.abc import Callable  # noqa: I001
 from dataclasses import dataclass, field
+import time
 from typing import Callable
 
-from aiobookoo.bookooscale import BookooDeviceState, BookooScale
+from aiobookoo.bookooscale import BookooDeviceState
 from aiobookoo.const import UnitMass as BookooUnitOfMass
 from homeassistant.components.sensor import (
     RestoreSensor,
@@ -19,29 +22,37 @@ from homeassistant.const import (
     PERCENTAGE,
     TIME_SECONDS,
     TIME_MINUTES,
+    EntityCategory,
+    UnitOfFrequency,
     UnitOfMass,
     UnitOfTime,
 )
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.restore_state import RestoreEntity
+from homeassistant.helpers.typing import StateType
 
-from .const import DOMAIN
-from .coordinator import BookooConfigEntry
-from .entity import BookooEntity
+from .const import DOMAIN, BookooSource
+from .coordinator import BookooConfigEntry, BookooCoordinator
+from .entity import BookooEntity, BookooEntityDescription
+from .shot import ShotDetector, ShotState
+from .snapshot import ScaleSnapshot
 
 # Coordinator is used to centralize the data updates
 PARALLEL_UPDATES = 0
 
 
 @dataclass(frozen=True)
-class BookooSensorEntityDescription(SensorEntityDescription):
+class BookooSensorEntityDescription(BookooEntityDescription, SensorEntityDescription):
     """Description for Bookoo sensor entities."""
 
-    value_fn: Callable[[BookooScale], int | float | str | None] = field(default=lambda _: None)
-    attributes: dict[str, Callable[[BookooScale], dict]] = field(default_factory=dict)
+    value_fn: Callable[[ScaleSnapshot], int | float | str | None] = field(default=lambda _: None)
+    attributes: dict[str, Callable[[ScaleSnapshot], dict]] = field(default_factory=dict)
     native_unit_of_measurement: str | None = None
     device_class: str | None = None
     state_class: str | None = None
+    # keep the last known value while the scale is not connected
+    restore: bool = False
 
 
 @dataclass(frozen=True)
@@ -51,60 +62,99 @@ class BookooDynamicUnitSensorEntityDescription(BookooSensorEntityDescription):
     unit_fn: Callable[[BookooDeviceState], str] | None = None
 
 
+@dataclass(frozen=True, kw_only=True)
+class BookooDerivedSensorEntityDescription(
+    BookooEntityDescription, SensorEntityDescription
+):
+    """Description for sensors computed by the integration from the samples."""
+
+    value_fn: Callable[[BookooCoordinator], StateType]
+    sources: frozenset[BookooSource] | None = frozenset({BookooSource.SHOT})
+    # keep the last known value until the integration computed a new one
+    restore: bool = False
+
+
+def _shot_duration(shots: ShotDetector) -> float | None:
+    """Return the rounded duration of the current or last shot."""
+    duration = shots.duration(time.monotonic())
+    return round(duration, 1) if duration is not None else None
+
+
+def _estimated_flow(coordinator: BookooCoordinator) -> float | None:
+    """Return the rounded flow estimated by the integration."""
+    value = coordinator.flow.value
+    return round(value, 2) if value is not None else None
+
+
 SENSOR_TYPES: tuple[BookooSensorEntityDescription, ...] = (
     BookooSensorEntityDescription(
         key="weight",
         name="Weight",
+        sources=frozenset({BookooSource.WEIGHT, BookooSource.DEVICE_STATE}),
+        high_rate=True,
         icon="mdi:scale",
         device_class=SensorDeviceClass.WEIGHT,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=MASS_GRAMS,
-        value_fn=lambda scale: scale.weight,
+        value_fn=lambda snapshot: snapshot.weight,
         attributes={
-            "unit": lambda scale: scale.device_state.unit if scale.device_state else None,
+            "unit": lambda snapshot: snapshot.unit,
         },
     ),
     BookooSensorEntityDescription(
         key="flow_rate",
         name="Flow Rate",
+        sources=frozenset({BookooSource.FLOW}),
+        high_rate=True,
         icon="mdi:water-percent",
         device_class=SensorDeviceClass.WEIGHT,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=f"{MASS_GRAMS}/{UnitOfTime.SECONDS}",
-        value_fn=lambda scale: scale.flow_rate,
+        deadband=0.05,
+        value_fn=lambda snapshot: snapshot.flow_rate,
     ),
     BookooSensorEntityDescription(
         key="battery",
+        restore=True,
         name="Battery",
+        sources=frozenset({BookooSource.DEVICE_STATE}),
         device_class=SensorDeviceClass.BATTERY,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=PERCENTAGE,
         entity_registry_enabled_default=False,
-        value_fn=lambda scale: scale.device_state.battery_level if scale.device_state else None,
+        deadband=1,
+        min_write_interval=60,
+        value_fn=lambda snapshot: snapshot.battery_level,
     ),
     BookooSensorEntityDescription(
         key="timer",
         name="Timer",
+        sources=frozenset({BookooSource.TIMER}),
+        high_rate=True,
         icon="mdi:timer-outline",
         device_class=SensorDeviceClass.DURATION,
         state_class=SensorStateClass.TOTAL_INCREASING,
         native_unit_of_measurement=UnitOfTime.SECONDS,
-        value_fn=lambda scale: scale.timer,
+        value_fn=lambda snapshot: snapshot.timer,
     ),
     # New sensors
     BookooSensorEntityDescription(
         key="standby_time",
+        restore=True,
         name="Standby Time",
+        sources=frozenset({BookooSource.DEVICE_STATE}),
         icon="mdi:timer-sand",
         device_class=SensorDeviceClass.DURATION,
         native_unit_of_measurement=UnitOfTime.MINUTES,
-        value_fn=lambda scale: scale.device_state.standby_time if scale.device_state else None,
+        value_fn=lambda snapshot: snapshot.standby_time,
     ),
     BookooSensorEntityDescription(
         key="buzzer_gear",
+        restore=True,
         name="Beep Level",
+        sources=frozenset({BookooSource.DEVICE_STATE}),
         icon="mdi:volume-high",
-        value_fn=lambda scale: scale.device_state.buzzer_gear if scale.device_state else None,
+        value_fn=lambda snapshot: snapshot.buzzer_gear,
         attributes={
             "min_level": 0,
             "max_level": 5,
@@ -113,17 +163,138 @@ SENSOR_TYPES: tuple[BookooSensorEntityDescription, ...] = (
     BookooSensorEntityDescription(
         key="flow_smoothing_status",
         name="Flow Smoothing Status",
+        sources=frozenset({BookooSource.DEVICE_STATE}),
         icon="mdi:chart-line",
-        value_fn=lambda scale: "ON" if scale.device_state and scale.device_state.flow_rate_smoothing else "OFF" if scale.device_state else None,
+        value_fn=lambda snapshot: (
+            None
+            if snapshot.flow_rate_smoothing is None
+            else "ON"
+            if snapshot.flow_rate_smoothing
+            else "OFF"
+        ),
     ),
     BookooSensorEntityDescription(
         key="unit",
+        restore=True,
         name="Unit",
+        sources=frozenset({BookooSource.DEVICE_STATE}),
         icon="mdi:scale-balance",
-        value_fn=lambda scale: scale.device_state.unit if scale.device_state else None,
+        value_fn=lambda snapshot: snapshot.unit,
+    ),
+)
+
+
+DERIVED_SENSOR_TYPES: tuple[BookooDerivedSensorEntityDescription, ...] = (
+    BookooDerivedSensorEntityDescription(
+        key="shot_state",
+        translation_key="shot_state",
+        device_class=SensorDeviceClass.ENUM,
+        options=[state.value for state in ShotState],
+        value_fn=lambda coordinator: coordinator.shots.state,
+    ),
+    BookooDerivedSensorEntityDescription(
+        key="shot_duration",
+        translation_key="shot_duration",
+        restore=True,
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        suggested_display_precision=1,
+        min_write_interval=1,
+        value_fn=lambda coordinator: _shot_duration(coordinator.shots),
+    ),
+    BookooDerivedSensorEntityDescription(
+        key="shot_yield",
+        translation_key="shot_yield",
+        restore=True,
+        device_class=SensorDeviceClass.WEIGHT,
+        native_unit_of_measurement=UnitOfMass.GRAMS,
+        suggested_display_precision=1,
+        value_fn=lambda coordinator: (
+            round(coordinator.shots.last_shot.yield_weight, 1)
+            if coordinator.shots.last_shot
+            else None
+        ),
+    ),
+    BookooDerivedSensorEntityDescription(
+        key="estimated_flow_rate",
+        translation_key="estimated_flow_rate",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=f"{UnitOfMass.GRAMS}/{UnitOfTime.SECONDS}",
+        suggested_display_precision=1,
+        deadband=0.05,
+        high_rate=True,
+        sources=frozenset({BookooSource.WEIGHT}),
+        value_fn=_estimated_flow,
+    ),
+    BookooDerivedSensorEntityDescription(
+        key="stable_weight",
+        translation_key="stable_weight",
+        restore=True,
+        device_class=SensorDeviceClass.WEIGHT,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfMass.GRAMS,
+        suggested_display_precision=1,
+        sources=frozenset({BookooSource.SETTLED}),
+        value_fn=lambda coordinator: coordinator.settle.value,
+    ),
+    BookooDerivedSensorEntityDescription(
+        key="notification_rate",
+        translation_key="notification_rate",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfFrequency.HERTZ,
+        suggested_display_precision=1,
+        min_write_interval=10,
+        sources=None,
+        value_fn=lambda coordinator: (
+            round(rate, 1)
+            if (rate := coordinator.metrics.notification_rate) is not None
+            else None
+        ),
+    ),
+    BookooDerivedSensorEntityDescription(
+        key="spikes_rejected",
+        translation_key="spikes_rejected",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        min_write_interval=10,
+        sources=None,
+        value_fn=lambda coordinator: (
+            coordinator.spikes.rejected if coordinator.spikes is not None else None
+        ),
+    ),
+    BookooDerivedSensorEntityDescription(
+        key="callback_time",
+        translation_key="callback_time",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        suggested_display_precision=3,
+        min_write_interval=10,
+        sources=None,
+        value_fn=lambda coordinator: coordinator.metrics.callback_time.percentile(95),
+    ),
+)
+
+
+REFERENCE_DEVIATION_SENSOR = BookooDerivedSensorEntityDescription(
+    key="reference_deviation",
+    translation_key="reference_deviation",
+    device_class=SensorDeviceClass.WEIGHT,
+    native_unit_of_measurement=UnitOfMass.GRAMS,
+    suggested_display_precision=1,
+    value_fn=lambda coordinator: (
+        round(deviation, 1)
+        if (deviation := coordinator.reference_deviation) is not None
+        else None
     ),
 )
 
+ATTR_REFERENCE_SHOT_ID = "reference_shot_id"
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -134,16 +305,132 @@ async def async_setup_entry(
 
     coordinator = entry.runtime_data
     entities: list[SensorEntity] = [
-        BookooSensor(coordinator, entity_description) for entity_description in SENSOR_TYPES
+        (BookooRestoreSensor if entity_description.restore else BookooSensor)(
+            coordinator, entity_description
+        )
+        for entity_description in SENSOR_TYPES
     ]
+    entities.extend(
+        (
+            BookooRestoreDerivedSensor
+            if entity_description.restore
+            else BookooDerivedSensor
+        )(coordinator, entity_description)
+        for entity_description in DERIVED_SENSOR_TYPES
+    )
+    entities.append(
+        BookooReferenceDeviationSensor(coordinator, REFERENCE_DEVIATION_SENSOR)
+    )
     async_add_entities(entities)
 
 
 class BookooSensor(BookooEntity, SensorEntity):
     """Representation of a Bookoo sensor."""
-    def native_value(self) -> int | float | None:
-        """Return the state of the entity."""
-        return self.entity_description.value_fn(self._scale)
+
+    entity_description: BookooSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: BookooCoordinator,
+        entity_description: BookooSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, entity_description)
+        if self._throttled:
+            self._attr_state_class = None
+
+    @property
+    def _written_value(self) -> int | float | str | None:
+        """Return the value compared against the last written state."""
+        return self._attr_native_value
+
+    @callback
+    def _async_update_attrs(self) -> None:
+        """Update the cached entity attributes from the snapshot."""
+        self._attr_native_value = self.entity_description.value_fn(
+            self.coordinator.snapshot
+        )
+
+
+class BookooDerivedSensor(BookooEntity, SensorEntity):
+    """Representation of a sensor computed by the integration."""
+
+    entity_description: BookooDerivedSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: BookooCoordinator,
+        entity_description: BookooDerivedSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, entity_description)
+        if self._throttled:
+            self._attr_state_class = None
+
+    @property
+    def _written_value(self) -> StateType:
+        """Return the value compared against the last written state."""
+        return self._attr_native_value
+
+    @callback
+    def _async_update_attrs(self) -> None:
+        """Update the cached entity attributes from the coordinator."""
+        self._attr_native_value = self.entity_description.value_fn(self.coordinator)
+
+
+class BookooRestoreDerivedSensor(BookooDerivedSensor, RestoreSensor):
+    """Sensor computed by the integration that keeps its last known value."""
+
+    _restored_data: SensorExtraStoredData | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the last value until a new one is computed."""
+        await super().async_added_to_hass()
+        self._restored_data = await self.async_get_last_sensor_data()
+        self._async_update_attrs()
+
+    @callback
+    def _async_update_attrs(self) -> None:
+        """Update the cached entity attributes from the coordinator."""
+        super()._async_update_attrs()
+        if self._attr_native_value is None and self._restored_data is not None:
+            self._attr_native_value = self._restored_data.native_value
+
+    @property
+    def available(self) -> bool:
+        """Return True if entity is available."""
+        return super().available or self._restored_data is not None
+
+
+class BookooReferenceDeviationSensor(BookooDerivedSensor, RestoreEntity):
+    """Grams the running shot is ahead of the reference shot."""
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the reference shot."""
+        await super().async_added_to_hass()
+        if (
+            self.coordinator.reference_shot_id is None
+            and (last_state := await self.async_get_last_state()) is not None
+            and (shot_id := last_state.attributes.get(ATTR_REFERENCE_SHOT_ID))
+        ):
+            self.coordinator.config_entry.async_create_background_task(
+                self.hass,
+                self.coordinator.async_set_reference(shot_id),
+                name="bookoo_restore_reference",
+            )
+
+    @property
+    def _written_value(self) -> tuple[StateType, int | None]:
+        """Return the value compared against the last written state."""
+        return self._attr_native_value, self.coordinator.reference_shot_id
+
+    @callback
+    def _async_update_attrs(self) -> None:
+        """Update the cached entity attributes from the coordinator."""
+        super()._async_update_attrs()
+        self._attr_extra_state_attributes = {
+            ATTR_REFERENCE_SHOT_ID: self.coordinator.reference_shot_id
+        }
 
 
 class BookooRestoreSensor(BookooEntity, RestoreSensor):
@@ -163,15 +450,19 @@ class BookooRestoreSensor(BookooEntity, RestoreSensor):
                 self._restored_data.native_unit_of_measurement
             )
 
-        if self._scale.device_state is not None:
-            self._attr_native_value = self.entity_description.value_fn(self._scale)
+        self._async_update_attrs()
+
+    @property
+    def _written_value(self) -> int | float | str | None:
+        """Return the value compared against the last written state."""
+        return self._attr_native_value
 
     @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        if self._scale.device_state is not None:
-            self._attr_native_value = self.entity_description.value_fn(self._scale)
-        self._async_write_ha_state()
+    def _async_update_attrs(self) -> None:
+        """Update the cached entity attributes from the snapshot."""
+        snapshot = self.coordinator.snapshot
+        if snapshot.has_device_state:
+            self._attr_native_value = self.entity_description.value_fn(snapshot)
 
     @property
     def available(self) -> bool:
@@ -0,0 +1,253 @@
+"""Services for the Bookoo integration."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+import voluptuous as vol
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_END,
+    ATTR_FILENAME,
+    ATTR_FORMAT,
+    ATTR_LAG,
+    ATTR_LIMIT,
+    ATTR_SHOT_ID,
+    ATTR_SHOT_IDS,
+    ATTR_SOURCE,
+    ATTR_START,
+    ATTR_TARGET_WEIGHT,
+    DOMAIN,
+    SERVICE_EXPORT_SHOTS,
+    SERVICE_FIND_SIMILAR_SHOTS,
+    SERVICE_SET_REFERENCE_SHOT,
+    SERVICE_SET_TARGET_WEIGHT,
+    ExportFormat,
+    ExportSource,
+)
+from .coordinator import BookooConfigEntry, BookooCoordinator
+from .target import MAX_LAG
+
+SET_TARGET_WEIGHT_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_TARGET_WEIGHT): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=200)
+        ),
+        vol.Optional(ATTR_LAG): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=MAX_LAG)
+        ),
+    }
+)
+
+FIND_SIMILAR_SHOTS_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_SHOT_ID): cv.positive_int,
+        vol.Optional(ATTR_LIMIT, default=5): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=50)
+        ),
+    }
+)
+
+SET_REFERENCE_SHOT_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_SHOT_ID): cv.positive_int,
+    }
+)
+
+EXPORT_SHOTS_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_FILENAME): cv.string,
+        vol.Optional(ATTR_FORMAT, default=ExportFormat.CSV): vol.Coerce(
+            ExportFormat
+        ),
+        vol.Optional(ATTR_SOURCE, default=ExportSource.HISTORY): vol.Coerce(
+            ExportSource
+        ),
+        vol.Optional(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+        vol.Optional(ATTR_SHOT_IDS): vol.All(cv.ensure_list, [cv.positive_int]),
+    }
+)
+
+
+def _get_coordinator(call: ServiceCall) -> BookooCoordinator:
+    """Return the coordinator of the config entry targeted by a service call."""
+    entry_id: str = call.data[ATTR_CONFIG_ENTRY_ID]
+    entry: BookooConfigEntry | None = call.hass.config_entries.async_get_entry(
+        entry_id
+    )
+    if entry is None or entry.domain != DOMAIN:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="entry_not_found",
+            translation_placeholders={"entry_id": entry_id},
+        )
+    if entry.state is not ConfigEntryState.LOADED:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="entry_not_loaded",
+            translation_placeholders={"title": entry.title},
+        )
+    return entry.runtime_data
+
+
+async def _async_set_target_weight(call: ServiceCall) -> None:
+    """Set the target yield of the predictive stop."""
+    coordinator = _get_coordinator(call)
+    coordinator.async_set_target(
+        call.data[ATTR_TARGET_WEIGHT], call.data.get(ATTR_LAG)
+    )
+
+
+def _shot_not_found(shot_id: int) -> ServiceValidationError:
+    """Return the error raised for an unknown shot id."""
+    return ServiceValidationError(
+        translation_domain=DOMAIN,
+        translation_key="shot_not_found",
+        translation_placeholders={"shot_id": str(shot_id)},
+    )
+
+
+async def _async_find_similar_shots(call: ServiceCall) -> ServiceResponse:
+    """Return the stored shots closest to a shot."""
+    coordinator = _get_coordinator(call)
+    profiles = await coordinator.async_get_profiles()
+    shot_id: int | None = call.data.get(ATTR_SHOT_ID)
+    if shot_id is not None:
+        profile = profiles.get(shot_id)
+        if profile is None:
+            raise _shot_not_found(shot_id)
+    elif (profile := coordinator.current_profile()) is None:
+        # compare the last shot unless one is running
+        shot_id = coordinator.last_shot_id or (
+            profiles.ids[-1] if len(profiles) else None
+        )
+        if shot_id is None or (profile := profiles.get(shot_id)) is None:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN, translation_key="no_shots"
+            )
+
+    nearest = profiles.nearest(profile, call.data[ATTR_LIMIT], exclude=shot_id)
+    records = await coordinator.history.async_get_shots(
+        [nearest_id for nearest_id, _ in nearest]
+    )
+    return {
+        "shot_id": shot_id,
+        "shots": [
+            {
+                "id": nearest_id,
+                "started_at": record.started_at.isoformat(),
+                "distance": round(distance, 2),
+                "yield": round(record.yield_weight, 1),
+                "duration": round(record.duration, 1),
+            }
+            for nearest_id, distance in nearest
+            if (record := records.get(nearest_id)) is not None
+        ],
+    }
+
+
+async def _async_set_reference_shot(call: ServiceCall) -> None:
+    """Compare shots against a stored shot, or stop comparing."""
+    coordinator = _get_coordinator(call)
+    shot_id: int | None = call.data.get(ATTR_SHOT_ID)
+    if not await coordinator.async_set_reference(shot_id):
+        raise _shot_not_found(shot_id)  # type: ignore[arg-type]
+
+
+def _as_aware(value: datetime | None) -> datetime | None:
+    """Return a datetime without time zone as one in the configured zone."""
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+
+
+async def _async_export_shots(call: ServiceCall) -> ServiceResponse:
+    """Write stored shots or buffered samples to a file."""
+    # only needed when exporting, keep it out of the integration import
+    from .export import (  # noqa: PLC0415
+        async_export_buffer,
+        async_export_history,
+        parquet_available,
+        resolve_path,
+    )
+
+    coordinator = _get_coordinator(call)
+    filename: str = call.data[ATTR_FILENAME]
+    export_format: ExportFormat = call.data[ATTR_FORMAT]
+    if (path := resolve_path(call.hass, filename)) is None:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="path_not_allowed",
+            translation_placeholders={"filename": filename},
+        )
+    if export_format is ExportFormat.PARQUET and not parquet_available():
+        raise ServiceValidationError(
+            translation_domain=DOMAIN, translation_key="pyarrow_missing"
+        )
+
+    start = _as_aware(call.data.get(ATTR_START))
+    end = _as_aware(call.data.get(ATTR_END))
+    if call.data[ATTR_SOURCE] is ExportSource.BUFFER:
+        result = await async_export_buffer(
+            call.hass, coordinator.samples, path, export_format, start, end
+        )
+    else:
+        result = await async_export_history(
+            call.hass,
+            coordinator.history,
+            path,
+            export_format,
+            start,
+            end,
+            call.data.get(ATTR_SHOT_IDS),
+        )
+    return {"path": result.path, "shots": result.shots, "samples": result.samples}
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_TARGET_WEIGHT,
+        _async_set_target_weight,
+        schema=SET_TARGET_WEIGHT_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_FIND_SIMILAR_SHOTS,
+        _async_find_similar_shots,
+        schema=FIND_SIMILAR_SHOTS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_REFERENCE_SHOT,
+        _async_set_reference_shot,
+        schema=SET_REFERENCE_SHOT_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_SHOTS,
+        _async_export_shots,
+        schema=EXPORT_SHOTS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
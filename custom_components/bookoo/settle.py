@@ -0,0 +1,88 @@
+"""Detection of a settled weight from the weight samples of the scale."""
+
+from __future__ import annotations
+
+from array import array
+import math
+
+from .buffer import SAMPLE_RATE
+
+# a standard deviation needs a few samples to mean anything
+MIN_WINDOW = 3
+
+
+class SettleDetector:
+    """Rolling variance of the weight over the hold time, O(1) per sample.
+
+    The weight is settled while the standard deviation of the samples of
+    the last hold time is within the tolerance. Each time the weight
+    settles its mean becomes the stable weight, ``update`` reports only
+    these transitions so entities are written when a new stable value
+    appears instead of with every sample.
+    """
+
+    __slots__ = (
+        "_count",
+        "_limit",
+        "_m2",
+        "_mean",
+        "_next",
+        "_size",
+        "_w",
+        "settled",
+        "value",
+    )
+
+    def __init__(self, tolerance: float, hold_time: float) -> None:
+        """Initialize the detector, tolerance in g and hold time in s."""
+        self._size = size = max(MIN_WINDOW, round(hold_time * SAMPLE_RATE))
+        self._w = array("d", bytes(8 * size))
+        # compared against the sum of squared deviations, saves a division
+        self._limit = tolerance * tolerance * size
+        self._count = 0
+        self._next = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self.settled = False
+        self.value: float | None = None
+
+    def update(self, weight: float) -> bool:
+        """Feed a sample and return whether the weight settled or unsettled."""
+        i = self._next
+        if self._count == self._size:
+            # Welford's update for replacing the oldest sample of the window
+            old = self._w[i]
+            mean = self._mean + (weight - old) / self._size
+            self._m2 += (weight - old) * (weight - mean + old - self._mean)
+            self._mean = mean
+        else:
+            self._count += 1
+            delta = weight - self._mean
+            self._mean += delta / self._count
+            self._m2 += delta * (weight - self._mean)
+        self._w[i] = weight
+
+        self._next = i = (i + 1) % self._size
+        if not i:
+            # rebuild the sums once per window so rounding errors don't add up
+            self._rebuild()
+
+        settled = self._count == self._size and self._m2 <= self._limit
+        if settled is self.settled:
+            return False
+        self.settled = settled
+        if settled:
+            self.value = round(self._mean, 1)
+        return True
+
+    def _rebuild(self) -> None:
+        """Recompute the mean and squared deviations of the window."""
+        self._mean = mean = math.fsum(self._w[: self._count]) / self._count
+        self._m2 = sum((w - mean) ** 2 for w in self._w[: self._count])
+
+    def reset(self) -> bool:
+        """Forget the samples, return whether the weight was settled."""
+        self._count = self._next = 0
+        self._mean = self._m2 = 0.0
+        settled, self.settled = self.settled, False
+        return settled
@@ -0,0 +1,216 @@
+"""Shot detection for Bookoo scales."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from enum import StrEnum
+import math
+
+# flow above which weight is considered to be dripping into the cup
+START_FLOW = 0.5
+# consecutive samples above START_FLOW needed to start a shot
+START_SAMPLES = 3
+# flow below which the weight is considered to be settling
+END_FLOW = 0.2
+# seconds the weight has to stay within WEIGHT_TOLERANCE to end a shot
+PLATEAU_TIME = 3.0
+WEIGHT_TOLERANCE = 0.3
+# a weight drop larger than this means the cup was removed
+REMOVAL_DROP = 10.0
+# shots shorter than this are discarded
+MIN_DURATION = 5.0
+
+
+class ShotState(StrEnum):
+    """State of the shot detector."""
+
+    IDLE = "idle"
+    BREWING = "brewing"
+
+
+class ShotEvent(StrEnum):
+    """Transition reported by the shot detector."""
+
+    STARTED = "started"
+    ENDED = "ended"
+    CANCELLED = "cancelled"
+
+
+@dataclass(frozen=True, slots=True)
+class Shot:
+    """A completed shot."""
+
+    start: float
+    end: float
+    start_seq: int
+    end_seq: int
+    start_weight: float
+    final_weight: float
+    peak_flow: float
+
+    @property
+    def duration(self) -> float:
+        """Return the duration of the shot in seconds."""
+        return self.end - self.start
+
+    @property
+    def yield_weight(self) -> float:
+        """Return the weight dispensed during the shot."""
+        return self.final_weight - self.start_weight
+
+
+class ShotDetector:
+    """Incremental shot detector fed with every sample from the scale.
+
+    A shot starts when the scale timer starts running or when the flow stays
+    above START_FLOW for START_SAMPLES samples. It ends once the weight has
+    plateaued for PLATEAU_TIME, the timer is reset or the cup is removed.
+    The plateau only counts once coffee flowed or the timer stopped, the
+    weight doesn't move during pre-infusion either. Every update is O(1).
+    """
+
+    __slots__ = (
+        "_above_since",
+        "_above_start",
+        "_flowing",
+        "_idle_weight",
+        "_last_timer",
+        "_max_weight",
+        "_plateau_seq",
+        "_plateau_since",
+        "_plateau_weight",
+        "last_shot",
+        "last_weight",
+        "peak_flow",
+        "start",
+        "start_seq",
+        "start_weight",
+        "state",
+    )
+
+    def __init__(self) -> None:
+        """Initialize the detector."""
+        self.state = ShotState.IDLE
+        self.last_shot: Shot | None = None
+        self.start = 0.0
+        self.start_seq = 0
+        self.start_weight = 0.0
+        self.peak_flow = 0.0
+        self.last_weight = 0.0
+        self._above_start = 0
+        self._above_since = 0.0
+        self._flowing = False
+        self._idle_weight = 0.0
+        self._last_timer = math.nan
+        self._max_weight = 0.0
+        self._plateau_seq = 0
+        self._plateau_since = math.nan
+        self._plateau_weight = math.nan
+
+    def duration(self, now: float) -> float | None:
+        """Return the duration of the current or the last shot."""
+        if self.state is ShotState.BREWING:
+            return now - self.start
+        if self.last_shot is not None:
+            return self.last_shot.duration
+        return None
+
+    def update(
+        self,
+        seq: int,
+        timestamp: float,
+        weight: float | None,
+        flow_rate: float | None,
+        timer: float | None,
+    ) -> ShotEvent | None:
+        """Feed a sample and return the transition it caused, if any."""
+        if weight is None:
+            return None
+        flow = flow_rate or 0.0
+        timer_started = (
+            timer is not None
+            and timer > 0
+            and (math.isnan(self._last_timer) or self._last_timer == 0)
+        )
+        timer_reset = timer is not None and timer == 0 and self._last_timer > 0
+        timer_stopped = timer is not None and timer > 0 and timer == self._last_timer
+        self._last_timer = math.nan if timer is None else timer
+
+        if self.state is ShotState.IDLE:
+            if flow < START_FLOW:
+                self._above_start = 0
+            else:
+                if not self._above_start:
+                    self._above_since = timestamp
+                self._above_start += 1
+            if timer_started or self._above_start >= START_SAMPLES:
+                self._start(seq, timestamp)
+                return ShotEvent.STARTED
+            if not self._above_start:
+                self._idle_weight = weight
+            self.last_weight = weight
+            return None
+
+        self.last_weight = weight
+        self.peak_flow = max(self.peak_flow, flow)
+        self._max_weight = max(self._max_weight, weight)
+        if flow >= START_FLOW:
+            self._flowing = True
+
+        if timer_reset or self._max_weight - weight > REMOVAL_DROP:
+            return self._end(seq + 1, timestamp, self._max_weight)
+
+        if (
+            (self._flowing or timer_stopped)
+            and abs(flow) < END_FLOW
+            and abs(weight - self._plateau_weight) <= WEIGHT_TOLERANCE
+        ):
+            if timestamp - self._plateau_since >= PLATEAU_TIME:
+                # the shot ended when the plateau began
+                return self._end(self._plateau_seq + 1, self._plateau_since, weight)
+        else:
+            self._plateau_seq = seq
+            self._plateau_since = timestamp
+            self._plateau_weight = weight
+        return None
+
+    def finish(self, seq: int, timestamp: float) -> ShotEvent | None:
+        """End a running shot, e.g. when the scale disconnects."""
+        if self.state is not ShotState.BREWING:
+            return None
+        return self._end(seq, timestamp, self.last_weight)
+
+    def _start(self, seq: int, timestamp: float) -> None:
+        """Start a shot at its first sample with flow, if any."""
+        self.state = ShotState.BREWING
+        if self._above_start:
+            self.start = self._above_since
+            self.start_seq = max(0, seq - self._above_start + 1)
+        else:
+            self.start = timestamp
+            self.start_seq = seq
+        self.start_weight = self._idle_weight
+        self.peak_flow = 0.0
+        self._flowing = self._above_start >= START_SAMPLES
+        self._above_start = 0
+        self._max_weight = self._idle_weight
+        self._plateau_seq = seq
+        self._plateau_since = timestamp
+        self._plateau_weight = math.nan
+
+    def _end(self, end_seq: int, end: float, final_weight: float) -> ShotEvent:
+        """End the running shot, end_seq is past its last sample."""
+        self.state = ShotState.IDLE
+        self._idle_weight = self.last_weight
+        if end - self.start < MIN_DURATION:
+            return ShotEvent.CANCELLED
+        self.last_shot = Shot(
+            start=self.start,
+            end=end,
+            start_seq=self.start_seq,
+            end_seq=end_seq,
+            start_weight=self.start_weight,
+            final_weight=final_weight,
+            peak_flow=self.peak_flow,
+        )
+        return ShotEvent.ENDED
@@ -0,0 +1,70 @@
+"""Immutable snapshots of the decoded state of a scale."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from aiobookoo.bookooscale import BookooScale
+
+from .const import BookooSource
+
+
+@dataclass(frozen=True, slots=True)
+class ScaleSnapshot:
+    """State of a scale after a notification, read by all entities.
+
+    Device state fields are None until the scale reported its device state,
+    so entities don't need to check for it.
+    """
+
+    connected: bool = False
+    weight: float | None = None
+    flow_rate: float | None = None
+    timer: float | None = None
+    battery_level: int | None = None
+    unit: str | None = None
+    standby_time: int | None = None
+    buzzer_gear: int | None = None
+    flow_rate_smoothing: bool | None = None
+    has_device_state: bool = False
+
+    @classmethod
+    def from_scale(cls, scale: BookooScale) -> ScaleSnapshot:
+        """Decode the current state of a scale."""
+        if (state := scale.device_state) is None:
+            return cls(scale.connected, scale.weight, scale.flow_rate, scale.timer)
+        return cls(
+            scale.connected,
+            scale.weight,
+            scale.flow_rate,
+            scale.timer,
+            state.battery_level,
+            state.unit,
+            state.standby_time,
+            state.buzzer_gear,
+            state.flow_rate_smoothing,
+            True,
+        )
+
+    def changed_sources(self, previous: ScaleSnapshot) -> set[BookooSource]:
+        """Return the sources whose fields differ from a previous snapshot."""
+        changed: set[BookooSource] = set()
+        if self.weight != previous.weight:
+            changed.add(BookooSource.WEIGHT)
+        if self.flow_rate != previous.flow_rate:
+            changed.add(BookooSource.FLOW)
+        if self.timer != previous.timer:
+            changed.add(BookooSource.TIMER)
+        if self.connected != previous.connected:
+            changed.add(BookooSource.CONNECTION)
+        if (
+            self.has_device_state != previous.has_device_state
+            or self.battery_level != previous.battery_level
+            or self.unit != previous.unit
+            or self.standby_time != previous.standby_time
+            or self.buzzer_gear != previous.buzzer_gear
+            or self.flow_rate_smoothing != previous.flow_rate_smoothing
+        ):
+            changed.add(BookooSource.DEVICE_STATE)
+        return changed
+
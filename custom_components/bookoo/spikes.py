@@ -0,0 +1,167 @@
+"""Rejection of single-sample spikes in the readings of the scale."""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, insort
+from dataclasses import replace
+
+from .snapshot import ScaleSnapshot
+
+# samples the median is taken over, odd so the median is a sample; a real
+# step passes after WINDOW // 2 + 1 samples
+WINDOW = 5
+# deviations from the median beyond this many scaled MADs are spikes
+THRESHOLD = 3.0
+# the MAD of normally distributed samples times this is their standard deviation
+MAD_SCALE = 1.4826
+# deviations within these are never spikes, a steady scale has a MAD of 0
+WEIGHT_MIN_DEVIATION = 1.0
+FLOW_MIN_DEVIATION = 1.0
+
+
+class HampelFilter:
+    """Causal Hampel filter over a sliding window, O(WINDOW) per sample.
+
+    A sample deviating from the median of the window by more than the
+    threshold times the scaled median absolute deviation is replaced with
+    the median. The window and its sorted copy are preallocated, finding
+    the median and the MAD allocates nothing.
+
+    Replaced samples are held until the next sample passes: if the window
+    moved to them they were the start of a real step and count as delayed,
+    otherwise they count as rejected spikes.
+    """
+
+    __slots__ = (
+        "_count",
+        "_held",
+        "_last_held",
+        "_min_deviation",
+        "_next",
+        "_ring",
+        "_size",
+        "_sorted",
+        "_threshold",
+        "delayed",
+        "rejected",
+    )
+
+    def __init__(
+        self,
+        min_deviation: float,
+        size: int = WINDOW,
+        threshold: float = THRESHOLD,
+    ) -> None:
+        """Initialize the filter."""
+        self._size = size | 1
+        self._min_deviation = min_deviation
+        self._threshold = threshold * MAD_SCALE
+        self._ring = array("d", bytes(8 * self._size))
+        self._sorted: list[float] = []
+        self._count = 0
+        self._next = 0
+        self._held = 0
+        self._last_held = 0.0
+        self.rejected = 0
+        self.delayed = 0
+
+    def update(self, value: float) -> float:
+        """Feed a sample and return it, or the median if it is a spike."""
+        ordered = self._sorted
+        i = self._next
+        if self._count == self._size:
+            del ordered[bisect_left(ordered, self._ring[i])]
+        else:
+            self._count += 1
+        self._ring[i] = value
+        self._next = (i + 1) % self._size
+        insort(ordered, value)
+        if self._count < self._size:
+            return value
+
+        median = ordered[self._size // 2]
+        if not self._is_outlier(value, median):
+            if self._held:
+                self._resolve(median)
+            return value
+        self._held += 1
+        self._last_held = value
+        return median
+
+    def _is_outlier(self, value: float, median: float) -> bool:
+        """Return whether a value deviates too far from the window median."""
+        deviation = abs(value - median)
+        return deviation > self._min_deviation and deviation > (
+            self._threshold * self._mad(median)
+        )
+
+    def _resolve(self, median: float) -> None:
+        """Count the held samples as delayed by a step or as spikes."""
+        if self._is_outlier(self._last_held, median):
+            self.rejected += self._held
+        else:
+            self.delayed += self._held
+        self._held = 0
+
+    def _mad(self, median: float) -> float:
+        """Return the median absolute deviation of the window."""
+        # deviations grow outwards from the median of the sorted window, the
+        # median deviation is found by merging both sides
+        ordered = self._sorted
+        mid = self._size // 2
+        low, high = mid - 1, mid + 1
+        deviation = 0.0
+        for _ in range(mid):
+            if high == self._size or (
+                low >= 0 and median - ordered[low] <= ordered[high] - median
+            ):
+                deviation = median - ordered[low]
+                low -= 1
+            else:
+                deviation = ordered[high] - median
+                high += 1
+        return deviation
+
+    def reset(self) -> None:
+        """Forget the samples, the counts are kept."""
+        self._sorted.clear()
+        self._count = self._next = self._held = 0
+
+
+class SpikeFilter:
+    """Hampel filters for the weight and flow rate of the snapshots."""
+
+    __slots__ = ("flow_rate", "weight")
+
+    def __init__(self) -> None:
+        """Initialize the filters."""
+        self.weight = HampelFilter(WEIGHT_MIN_DEVIATION)
+        self.flow_rate = HampelFilter(FLOW_MIN_DEVIATION)
+
+    @property
+    def rejected(self) -> int:
+        """Return the number of rejected samples."""
+        return self.weight.rejected + self.flow_rate.rejected
+
+    @property
+    def delayed(self) -> int:
+        """Return the number of samples held back by real steps."""
+        return self.weight.delayed + self.flow_rate.delayed
+
+    def filter(self, snapshot: ScaleSnapshot) -> ScaleSnapshot:
+        """Return the snapshot, with spikes replaced by the window medians."""
+        weight = snapshot.weight
+        if weight is not None:
+            weight = self.weight.update(weight)
+        flow_rate = snapshot.flow_rate
+        if flow_rate is not None:
+            flow_rate = self.flow_rate.update(flow_rate)
+        if weight is snapshot.weight and flow_rate is snapshot.flow_rate:
+            return snapshot
+        return replace(snapshot, weight=weight, flow_rate=flow_rate)
+
+    def reset(self) -> None:
+        """Forget the samples, e.g. after a disconnect."""
+        self.weight.reset()
+        self.flow_rate.reset()
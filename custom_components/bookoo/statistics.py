@@ -0,0 +1,127 @@
+"""Long-term statistics of the shots of Bookoo scales."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.const import UnitOfMass, UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.device_registry import format_mac
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .history import ShotHistory, ShotSummary
+
+FLOW_UNIT = f"{UnitOfMass.GRAMS}/{UnitOfTime.SECONDS}"
+
+# statistic key, name, unit and the summary fields of min, max and mean
+MEAN_STATISTICS: tuple[tuple[str, str, str | None, str], ...] = (
+    ("shot_yield", "shot yield", UnitOfMass.GRAMS, "yield"),
+    ("shot_duration", "shot duration", UnitOfTime.SECONDS, "duration"),
+    ("shot_peak_flow", "shot peak flow", FLOW_UNIT, "peak_flow"),
+)
+
+
+def statistic_id(address: str, key: str) -> str:
+    """Return the id of an external statistic of a scale."""
+    return f"{DOMAIN}:{format_mac(address).replace(':', '')}_{key}"
+
+
+def _hour_start(timestamp: datetime) -> datetime:
+    """Return the start of the hour a timestamp falls into."""
+    return dt_util.as_utc(timestamp).replace(minute=0, second=0, microsecond=0)
+
+
+async def async_import_shot_statistics(
+    hass: HomeAssistant,
+    history: ShotHistory,
+    address: str,
+    title: str,
+    started_at: datetime,
+) -> None:
+    """Import the statistics of the hour a shot started in.
+
+    The statistics are aggregated from the shot history, so importing an
+    hour again after a restart or another shot replaces it with complete
+    numbers. The recorder stores one row per statistic and hour with shots.
+    """
+    start = _hour_start(started_at)
+    summary = await history.async_summarize(start, start + timedelta(hours=1))
+    if summary is None:
+        return
+
+    for key, name, unit, field in MEAN_STATISTICS:
+        _async_import(
+            hass,
+            address,
+            key,
+            f"{title} {name}",
+            unit,
+            StatisticData(
+                start=start,
+                min=getattr(summary, f"{field}_min"),
+                max=getattr(summary, f"{field}_max"),
+                mean=getattr(summary, f"{field}_mean"),
+            ),
+            has_mean=True,
+        )
+    _async_import_totals(hass, address, title, start, summary)
+
+
+def _async_import_totals(
+    hass: HomeAssistant,
+    address: str,
+    title: str,
+    start: datetime,
+    summary: ShotSummary,
+) -> None:
+    """Import the shot count and the grams dispensed as growing totals."""
+    _async_import(
+        hass,
+        address,
+        "shots",
+        f"{title} shots",
+        None,
+        StatisticData(
+            start=start, state=summary.count, sum=summary.cumulative_count
+        ),
+        has_sum=True,
+    )
+    _async_import(
+        hass,
+        address,
+        "dispensed",
+        f"{title} dispensed",
+        UnitOfMass.GRAMS,
+        StatisticData(
+            start=start,
+            state=summary.total_yield,
+            sum=summary.cumulative_yield,
+        ),
+        has_sum=True,
+    )
+
+
+def _async_import(
+    hass: HomeAssistant,
+    address: str,
+    key: str,
+    name: str,
+    unit: str | None,
+    data: StatisticData,
+    *,
+    has_mean: bool = False,
+    has_sum: bool = False,
+) -> None:
+    """Import one hour of an external statistic."""
+    metadata = StatisticMetaData(
+        has_mean=has_mean,
+        has_sum=has_sum,
+        name=name,
+        source=DOMAIN,
+        statistic_id=statistic_id(address, key),
+        unit_of_measurement=unit,
+    )
+    async_add_external_statistics(hass, metadata, [data])
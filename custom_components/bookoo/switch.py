@@ -1,27 +1,32 @@
 """Switch platform for Bookoo integration."""
 from __future__ import annotations
 
+from collections.abc import Callable, Coroutine
 from dataclasses import dataclass
+from typing import Any
+
+from aiobookoo.bookooscale import BookooScale
 
 from homeassistant.components.switch import (
     SwitchEntity,
     SwitchEntityDescription,
 )
-from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DOMAIN
-from .coordinator import BookooCoordinator
-from .entity import BookooEntity
+from .const import BookooSource
+from .coordinator import BookooConfigEntry
+from .entity import BookooEntity, BookooEntityDescription
+from .snapshot import ScaleSnapshot
 
 
-@dataclass
-class BookooSwitchEntityDescription(SwitchEntityDescription):
+@dataclass(kw_only=True, frozen=True)
+class BookooSwitchEntityDescription(BookooEntityDescription, SwitchEntityDescription):
     """Class describing Bookoo switch entities."""
 
-    is_on_fn: callable = None
-    set_fn: callable = None
+    is_on_fn: Callable[[ScaleSnapshot], bool | None]
+    set_fn: Callable[[BookooScale, bool], Coroutine[Any, Any, None]]
+    sources: frozenset[BookooSource] | None = frozenset({BookooSource.DEVICE_STATE})
 
 
 SWITCH_TYPES: tuple[BookooSwitchEntityDescription, ...] = (
@@ -29,7 +34,7 @@ SWITCH_TYPES: tuple[BookooSwitchEntityDescription, ...] = (
         key="flow_smoothing",
         name="Flow Smoothing",
         icon="mdi:chart-line",
-        is_on_fn=lambda scale: scale.device_state.flow_rate_smoothing if scale.device_state else False,
+        is_on_fn=lambda snapshot: snapshot.flow_rate_smoothing,
         set_fn=lambda scale, value: scale.set_flow_smoothing(value),
     ),
 )
@@ -37,17 +42,17 @@ SWITCH_TYPES: tuple[BookooSwitchEntityDescription, ...] = (
 
 async def async_setup_entry(
     hass: HomeAssistant,
-    entry: ConfigEntry,
+    entry: BookooConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Bookoo switch entities."""
-    coordinator: BookooCoordinator = hass.data[DOMAIN][entry.entry_id]
+    coordinator = entry.runtime_data
 
     entities = [
         BookooSwitch(coordinator, description) for description in SWITCH_TYPES
     ]
 
-    async_add_entities(entities, True)
+    async_add_entities(entities)
 
 
 class BookooSwitch(BookooEntity, SwitchEntity):
@@ -56,23 +61,31 @@ class BookooSwitch(BookooEntity, SwitchEntity):
     entity_description: BookooSwitchEntityDescription
 
     @property
-    def is_on(self) -> bool | None:
-        """Return true if the switch is on."""
-        if not self._scale.device_state:
-            return None
-        return self.entity_description.is_on_fn(self._scale)
+    def _written_value(self) -> bool | None:
+        """Return the value compared against the last written state."""
+        return self._attr_is_on
+
+    @callback
+    def _async_update_attrs(self) -> None:
+        """Update the cached entity attributes from the snapshot."""
+        self._attr_is_on = self.entity_description.is_on_fn(self.coordinator.snapshot)
 
     async def async_turn_on(self, **kwargs) -> None:
         """Turn the entity on."""
-        await self.entity_description.set_fn(self._scale, True)
-        self.async_write_ha_state()
+        set_fn = self.entity_description.set_fn
+        await self.coordinator.commands.async_submit(
+            self.entity_description.key,
+            lambda scale: set_fn(scale, True),
+            setting=True,
+        )
+        self._handle_coordinator_update()
 
     async def async_turn_off(self, **kwargs) -> None:
         """Turn the entity off."""
-        await self.entity_description.set_fn(self._scale, False)
-        self.async_write_ha_state()
-
-    @callback
-    def _handle_coordinator_update(self, *args, **kwargs) -> None:
-        """Handle updated data from the coordinator."""
-        self.async_write_ha_state()
+        set_fn = self.entity_description.set_fn
+        await self.coordinator.commands.async_submit(
+            self.entity_description.key,
+            lambda scale: set_fn(scale, False),
+            setting=True,
+        )
+        self._handle_coordinator_update()
@@ -0,0 +1,83 @@
+"""Predictive stop at a target shot yield."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+# lag between the stop signal and the last drop reaching the cup
+DEFAULT_LAG = 1.0
+MAX_LAG = 5.0
+# share of a measured lag that is mixed into the learned lag after a shot
+LEARNING_RATE = 0.3
+# flow below which a measured overshoot says nothing about the lag
+MIN_LEARNING_FLOW = 0.3
+# seconds after the stop signal within which a stopped shot ends, shots
+# ending later weren't stopped and say nothing about the lag
+STOP_WINDOW = MAX_LAG + 1.0
+
+
+@dataclass(frozen=True, slots=True)
+class TargetReached:
+    """Details of the moment the stop was triggered."""
+
+    target: float
+    yield_weight: float
+    predicted_yield: float
+    flow: float
+    lag: float
+    time: float
+
+
+class TargetWeightController:
+    """Decide when to stop a shot so it ends at the target yield.
+
+    The final yield is predicted as the current yield plus the flow times
+    the lag, i.e. the coffee still dripping after the stop. The lag is
+    learned from the overshoot of each shot that ended within STOP_WINDOW
+    of the stop signal. ``update`` runs for every sample of a shot and is
+    O(1).
+    """
+
+    __slots__ = ("lag", "reached", "target")
+
+    def __init__(self) -> None:
+        """Initialize the controller."""
+        self.target: float | None = None
+        self.lag = DEFAULT_LAG
+        self.reached: TargetReached | None = None
+
+    def start(self) -> None:
+        """Arm the controller for a new shot."""
+        self.reached = None
+
+    def update(
+        self, timestamp: float, yield_weight: float, flow: float
+    ) -> TargetReached | None:
+        """Feed the current yield and flow, return details once the stop is due."""
+        if not self.target or self.reached is not None:
+            return None
+        predicted = yield_weight + max(flow, 0.0) * self.lag
+        if predicted < self.target:
+            return None
+        self.reached = TargetReached(
+            target=self.target,
+            yield_weight=yield_weight,
+            predicted_yield=predicted,
+            flow=flow,
+            lag=self.lag,
+            time=timestamp,
+        )
+        return self.reached
+
+    def learn(self, final_yield: float, end: float) -> None:
+        """Adjust the lag from the overshoot of a shot stopped at the signal."""
+        if (
+            (reached := self.reached) is None
+            or reached.flow < MIN_LEARNING_FLOW
+            or end - reached.time > STOP_WINDOW
+        ):
+            return
+        measured = (final_yield - reached.yield_weight) / reached.flow
+        if not 0.0 <= measured <= MAX_LAG:
+            return
+        self.lag += LEARNING_RATE * (measured - self.lag)
@@ -0,0 +1,246 @@
+"""Websocket API streaming the samples of Bookoo scales."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.util.hass_dict import HassKey
+
+from .buffer import SAMPLE_RATE
+from .const import ATTR_CONFIG_ENTRY_ID, DOMAIN
+from .coordinator import BookooConfigEntry, BookooCoordinator
+
+# frames per second a client can ask for
+DEFAULT_STREAM_RATE = 5.0
+MIN_STREAM_RATE = 0.2
+# samples sent per frame at most, older samples are dropped
+MAX_FRAME_SAMPLES = round(SAMPLE_RATE / MIN_STREAM_RATE)
+
+# frames sent but not yet acknowledged by the subscriber, samples arriving
+# meanwhile are merged into the next frame
+MAX_UNACKED_FRAMES = 2
+
+FRAME_COLUMNS = ("timestamp", "weight", "flow_rate", "timer")
+
+# open streams by config entry id, then by websocket connection and
+# subscription id
+DATA_STREAMS: HassKey[dict[str, dict[tuple[int, int], SampleStream]]] = HassKey(
+    f"{DOMAIN}_streams"
+)
+
+
+@callback
+def async_setup_websocket_api(hass: HomeAssistant) -> None:
+    """Register the websocket commands."""
+    websocket_api.async_register_command(hass, websocket_subscribe_stream)
+    websocket_api.async_register_command(hass, websocket_ack_stream)
+
+
+@callback
+def _async_entry_streams(
+    hass: HomeAssistant, entry: BookooConfigEntry
+) -> dict[tuple[int, int], SampleStream]:
+    """Return the open streams of an entry, ending them when it unloads."""
+    streams_by_entry = hass.data.setdefault(DATA_STREAMS, {})
+    if (streams := streams_by_entry.get(entry.entry_id)) is not None:
+        return streams
+    streams = streams_by_entry[entry.entry_id] = {}
+
+    @callback
+    def async_end_streams() -> None:
+        """End the streams, the samples come from a new coordinator next."""
+        for stream in list(streams_by_entry.pop(entry.entry_id, {}).values()):
+            stream.async_end()
+
+    # one hook per loaded entry, however often clients subscribe
+    entry.async_on_unload(async_end_streams)
+    return streams
+
+
+class SampleStream:
+    """Send the samples of a scale to a websocket subscriber in frames.
+
+    New samples only schedule a frame, the frame reads everything appended
+    since the previous one straight from the sample buffer. The subscriber
+    acknowledges each frame; while MAX_UNACKED_FRAMES are unacknowledged
+    no frame is sent and new samples are merged into the next one. A frame
+    holds at most MAX_FRAME_SAMPLES samples, so what is queued for a
+    subscriber is bounded however slow it is. A stream that falls behind
+    skips the oldest samples and reports them as dropped. The stream ends
+    with an error when the config entry of the scale is unloaded.
+    """
+
+    def __init__(
+        self,
+        entry: BookooConfigEntry,
+        connection: websocket_api.ActiveConnection,
+        msg_id: int,
+        rate: float,
+    ) -> None:
+        """Initialize the stream."""
+        self._coordinator: BookooCoordinator = entry.runtime_data
+        self._streams = _async_entry_streams(self._coordinator.hass, entry)
+        self._connection = connection
+        self._msg_id = msg_id
+        self._key = (id(connection), msg_id)
+        self._interval = 1 / rate
+        self._loop = self._coordinator.hass.loop
+        self._cursor = self._coordinator.samples.total
+        self._last_frame = 0.0
+        self._unacked = 0
+        self._handle: asyncio.Handle | None = None
+        self._remove_listener: CALLBACK_TYPE | None = None
+        # sample timestamps are monotonic, frames carry unix timestamps
+        self._clock_offset = time.time() - time.monotonic()
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Start streaming and return a callback stopping it."""
+        self._remove_listener = self._coordinator.async_add_sample_listener(
+            self._async_schedule_frame
+        )
+        self._streams[self._key] = self
+        return self.async_stop
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop streaming."""
+        if self._streams.get(self._key) is self:
+            del self._streams[self._key]
+        if self._remove_listener is not None:
+            self._remove_listener()
+            self._remove_listener = None
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    @callback
+    def async_end(self) -> None:
+        """Stop streaming and end the subscription with an error."""
+        if self._remove_listener is None:
+            # unsubscribed already
+            return
+        self.async_stop()
+        self._connection.subscriptions.pop(self._msg_id, None)
+        self._connection.send_error(
+            self._msg_id, websocket_api.ERR_NOT_FOUND, "Config entry unloaded"
+        )
+
+    @callback
+    def async_ack(self) -> None:
+        """Handle the acknowledgement of a frame by the subscriber."""
+        if self._unacked:
+            self._unacked -= 1
+        if self._cursor < self._coordinator.samples.total:
+            # samples were held back while the subscriber was busy
+            self._async_schedule_frame()
+
+    @callback
+    def _async_schedule_frame(self) -> None:
+        """Schedule a frame at the rate requested by the subscriber."""
+        if self._handle is not None or self._unacked >= MAX_UNACKED_FRAMES:
+            return
+        delay = self._last_frame + self._interval - self._loop.time()
+        if delay > 0:
+            self._handle = self._loop.call_later(delay, self._async_send_frame)
+        else:
+            self._handle = self._loop.call_soon(self._async_send_frame)
+
+    @callback
+    def _async_send_frame(self) -> None:
+        """Send the samples appended since the last frame."""
+        self._handle = None
+        self._last_frame = self._loop.time()
+        samples = self._coordinator.samples
+        start = max(self._cursor, samples.first_seq, samples.total - MAX_FRAME_SAMPLES)
+        dropped = start - self._cursor
+        view = samples.view(start)
+        self._cursor = view.end
+        if not len(view):
+            return
+
+        frame: dict[str, Any] = {"seq": view.start, "dropped": dropped}
+        for name in FRAME_COLUMNS:
+            offset = self._clock_offset if name == "timestamp" else 0.0
+            frame[name] = [
+                None if math.isnan(value) else round(value + offset, 3)
+                for value in view.column(name)
+            ]
+        self._unacked += 1
+        self._connection.send_message(
+            websocket_api.event_message(self._msg_id, frame)
+        )
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "bookoo/subscribe_stream",
+        vol.Required(ATTR_CONFIG_ENTRY_ID): str,
+        vol.Optional("rate", default=DEFAULT_STREAM_RATE): vol.All(
+            vol.Coerce(float), vol.Range(min=MIN_STREAM_RATE, max=SAMPLE_RATE)
+        ),
+    }
+)
+@callback
+def websocket_subscribe_stream(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Subscribe to the samples of a scale, sent in frames of columns."""
+    entry: BookooConfigEntry | None = hass.config_entries.async_get_entry(
+        msg[ATTR_CONFIG_ENTRY_ID]
+    )
+    if entry is None or entry.domain != DOMAIN:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, "Config entry not found"
+        )
+        return
+    if entry.state is not ConfigEntryState.LOADED:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, "Config entry not loaded"
+        )
+        return
+
+    stream = SampleStream(entry, connection, msg["id"], msg["rate"])
+    connection.subscriptions[msg["id"]] = stream.async_start()
+    connection.send_result(msg["id"])
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "bookoo/ack_stream",
+        vol.Required("subscription"): int,
+    }
+)
+@callback
+def websocket_ack_stream(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Acknowledge a frame of a stream so the next one can be sent."""
+    key = (id(connection), msg["subscription"])
+    stream = next(
+        (
+            streams[key]
+            for streams in hass.data.get(DATA_STREAMS, {}).values()
+            if key in streams
+        ),
+        None,
+    )
+    if stream is None:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, "Subscription not found"
+        )
+        return
+    stream.async_ack()
+    connection.send_result(msg["id"])
@@ -0,0 +1,73 @@
+"""Fixtures of the Bookoo tests."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.const import CONF_ADDRESS
+from homeassistant.core import HomeAssistant
+
+from benchmarks.simulator import SimulatedBookooScale
+from custom_components.bookoo.const import CONF_IS_VALID_SCALE, DOMAIN
+from custom_components.bookoo.coordinator import BookooCoordinator
+
+ADDRESS = "AA:BB:CC:DD:EE:FF"
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations: None) -> None:
+    """Load the integration from custom_components."""
+
+
+@pytest.fixture
+def entry_options() -> dict[str, Any]:
+    """Return the options of the config entry, parametrize to change them."""
+    return {}
+
+
+@pytest.fixture
+def mock_config_entry(
+    hass: HomeAssistant, entry_options: dict[str, Any]
+) -> MockConfigEntry:
+    """Return the config entry of a scale."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="BOOKOO_SC",
+        unique_id=ADDRESS,
+        data={CONF_ADDRESS: ADDRESS, CONF_IS_VALID_SCALE: True},
+        options=entry_options,
+    )
+    entry.add_to_hass(hass)
+    return entry
+
+
+@pytest.fixture
+async def coordinator(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry
+) -> AsyncIterator[BookooCoordinator]:
+    """Set up the integration with a simulated, connected scale."""
+    # the simulated scale needs no Bluetooth adapter
+    hass.config.components.update({"bluetooth", "bluetooth_adapters"})
+    with (
+        patch(
+            "custom_components.bookoo.coordinator.BookooScale", SimulatedBookooScale
+        ),
+        patch(
+            "custom_components.bookoo.coordinator.async_register_callback",
+            return_value=lambda: None,
+        ),
+    ):
+        assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+        coordinator: BookooCoordinator = mock_config_entry.runtime_data
+        # the first connect runs in the background, wait for it
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+        assert coordinator.scale.connected
+        yield coordinator
+        await hass.config_entries.async_unload(mock_config_entry.entry_id)
+        await hass.async_block_till_done()
@@ -0,0 +1,106 @@
+"""Tests of the sample ring buffer."""
+
+from __future__ import annotations
+
+import math
+
+from custom_components.bookoo.buffer import SAMPLE_RATE, SampleBuffer
+
+
+def filled(capacity: int, count: int) -> SampleBuffer:
+    """Return a buffer with samples whose weight is their sequence number."""
+    buffer = SampleBuffer(capacity)
+    for seq in range(count):
+        buffer.append(seq / SAMPLE_RATE, float(seq), 0.0, None)
+    return buffer
+
+
+def test_for_minutes() -> None:
+    """The capacity covers the minutes at the sample rate."""
+    assert SampleBuffer.for_minutes(2).capacity == 2 * 60 * SAMPLE_RATE
+    assert SampleBuffer.for_minutes(0).capacity == 1
+
+
+def test_empty() -> None:
+    """An empty buffer has no samples and empty views."""
+    buffer = SampleBuffer(4)
+
+    assert len(buffer) == 0
+    assert buffer.latest() is None
+    assert len(buffer.view()) == 0
+    assert buffer.view().segments("weight") == ()
+
+
+def test_wraparound_keeps_newest() -> None:
+    """A full buffer overwrites its oldest samples."""
+    buffer = filled(4, 10)
+
+    assert len(buffer) == 4
+    assert buffer.total == 10
+    assert buffer.first_seq == 6
+    assert list(buffer.view().column("weight")) == [6.0, 7.0, 8.0, 9.0]
+    latest = buffer.latest()
+    assert latest is not None
+    assert latest[:3] == (0.9, 9.0, 0.0)
+
+
+def test_missing_values_are_nan() -> None:
+    """None is stored as NaN."""
+    buffer = SampleBuffer(4)
+    buffer.append(0.0, None, None, None)
+
+    latest = buffer.latest()
+    assert latest is not None
+    assert latest[0] == 0.0
+    assert all(math.isnan(value) for value in latest[1:])
+
+
+def test_segments_are_zero_copy() -> None:
+    """A wrapped view is two memoryviews into the buffer."""
+    buffer = filled(4, 6)
+    view = buffer.view()
+
+    segments = view.segments("weight")
+
+    assert all(isinstance(segment, memoryview) for segment in segments)
+    assert [list(segment) for segment in segments] == [[2.0, 3.0], [4.0, 5.0]]
+    # the views see the samples appended later
+    buffer.append(0.6, 6.0, 0.0, None)
+    assert list(segments[0]) == [6.0, 3.0]
+
+
+def test_column_copies() -> None:
+    """A column is a copy that survives the buffer wrapping."""
+    buffer = filled(4, 6)
+    column = buffer.view().column("weight")
+
+    for seq in range(6, 10):
+        buffer.append(seq / SAMPLE_RATE, float(seq), 0.0, None)
+
+    assert list(column) == [2.0, 3.0, 4.0, 5.0]
+
+
+def test_view_clamped_to_held_samples() -> None:
+    """Views never reach before the oldest or past the newest sample."""
+    buffer = filled(4, 10)
+
+    view = buffer.view(0, 100)
+
+    assert (view.start, view.end) == (6, 10)
+    assert len(buffer.view(8, 7)) == 0
+    assert [sample[1] for sample in buffer.view_last(2)] == [8.0, 9.0]
+
+
+def test_view_since() -> None:
+    """A view since a time starts at the first sample taken at or after it."""
+    buffer = filled(8, 20)
+
+    assert list(buffer.view_since(1.45).column("weight")) == [
+        15.0,
+        16.0,
+        17.0,
+        18.0,
+        19.0,
+    ]
+    assert len(buffer.view_since(0.0)) == 8
+    assert len(buffer.view_since(10.0)) == 0
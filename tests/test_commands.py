@@ -0,0 +1,150 @@
+"""Tests of the command queue."""
+
+from __future__ import annotations
+
+import asyncio
+
+from aiobookoo.exceptions import BookooError
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+
+from benchmarks.simulator import SimulatedBookooScale
+from custom_components.bookoo.commands import CommandQueue
+from custom_components.bookoo.const import DOMAIN
+from custom_components.bookoo.metrics import BookooMetrics
+
+
+@pytest.fixture
+def scale() -> SimulatedBookooScale:
+    """Return a simulated scale."""
+    return SimulatedBookooScale("AA:BB:CC:DD:EE:FF")
+
+
+@pytest.fixture
+def metrics() -> BookooMetrics:
+    """Return the metrics the queue records into."""
+    return BookooMetrics()
+
+
+@pytest.fixture
+def queue(
+    hass: HomeAssistant, scale: SimulatedBookooScale, metrics: BookooMetrics
+) -> CommandQueue:
+    """Return a command queue of the scale."""
+    entry = MockConfigEntry(domain=DOMAIN)
+    entry.add_to_hass(hass)
+    return CommandQueue(hass, entry, scale, metrics)
+
+
+async def test_settings_coalesced(
+    queue: CommandQueue, scale: SimulatedBookooScale
+) -> None:
+    """Only the last of the queued values of a setting is written."""
+    futures = [
+        queue.async_submit(
+            "beep_level",
+            lambda scale, level=level: scale.set_beep_level(level),
+            setting=True,
+        )
+        for level in range(5)
+    ]
+
+    await asyncio.gather(*futures)
+
+    assert scale.commands == [("set_beep_level", 4)]
+
+
+async def test_tare_and_start_merged(
+    queue: CommandQueue, scale: SimulatedBookooScale, metrics: BookooMetrics
+) -> None:
+    """A tare followed by a start is sent as one command."""
+    await asyncio.gather(
+        queue.async_submit("tare", lambda scale: scale.tare()),
+        queue.async_submit("start", lambda scale: scale.start_timer()),
+    )
+
+    assert scale.commands == [("tare_and_start_timer", None)]
+    assert metrics.command_time["tare_and_start"].count == 1
+
+
+async def test_control_before_settings(
+    queue: CommandQueue, scale: SimulatedBookooScale
+) -> None:
+    """Control commands overtake queued settings."""
+    await asyncio.gather(
+        queue.async_submit(
+            "auto_off", lambda scale: scale.set_auto_off(5), setting=True
+        ),
+        queue.async_submit("tare", lambda scale: scale.tare()),
+    )
+
+    assert scale.commands == [("tare", None), ("set_auto_off", 5)]
+
+
+async def test_failure_raised_to_caller(
+    queue: CommandQueue, scale: SimulatedBookooScale, metrics: BookooMetrics
+) -> None:
+    """A failed command raises to its caller and the queue keeps going."""
+
+    async def fail(scale: SimulatedBookooScale) -> None:
+        raise BookooError("write failed")
+
+    failing = queue.async_submit("stop", fail)
+    following = queue.async_submit(
+        "reset_timer", lambda scale: scale.reset_timer()
+    )
+
+    with pytest.raises(BookooError):
+        await failing
+    await following
+    assert scale.commands == [("reset_timer", None)]
+    assert metrics.command_failures == {"stop": 1}
+
+
+async def test_connect_and_sent_hooks(
+    hass: HomeAssistant, scale: SimulatedBookooScale, metrics: BookooMetrics
+) -> None:
+    """The queue connects before each command and reports sent commands."""
+    entry = MockConfigEntry(domain=DOMAIN)
+    entry.add_to_hass(hass)
+    calls: list[str] = []
+
+    async def connect() -> None:
+        calls.append("connect")
+
+    queue = CommandQueue(
+        hass, entry, scale, metrics, connect=connect, sent=calls.append
+    )
+    await asyncio.gather(
+        queue.async_submit("tare", lambda scale: scale.tare()),
+        queue.async_submit("start", lambda scale: scale.start_timer()),
+    )
+
+    assert calls == ["connect", "tare_and_start"]
+
+
+async def test_sending(
+    queue: CommandQueue, scale: SimulatedBookooScale
+) -> None:
+    """The command being sent is reported until it completes."""
+    scale.command_delay = 0.01
+    future = queue.async_submit("tare", lambda scale: scale.tare())
+    await asyncio.sleep(0)
+
+    assert queue.sending == "tare"
+    assert len(queue) == 0
+    await future
+    assert queue.sending is None
+
+
+async def test_cancel(queue: CommandQueue) -> None:
+    """Cancelling the queue cancels the waiting callers."""
+    future = queue.async_submit("tare", lambda scale: scale.tare())
+
+    queue.async_cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await future
+    assert len(queue) == 0
@@ -0,0 +1,91 @@
+"""Tests of the coordinator."""
+
+from __future__ import annotations
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.bookoo.const import CONF_SPIKE_FILTER, BookooSource
+from custom_components.bookoo.coordinator import BookooCoordinator
+
+
+@pytest.mark.parametrize("entry_options", [{CONF_SPIKE_FILTER: True}])
+async def test_spike_filter_keeps_raw_samples(
+    hass: HomeAssistant, coordinator: BookooCoordinator
+) -> None:
+    """Entities see spikes replaced, the sample buffer keeps them."""
+    scale = coordinator.scale
+    for _ in range(5):
+        scale.push(18.0, 0.0, 0.0)
+
+    scale.push(60.0, 0.0, 0.0)
+    await hass.async_block_till_done()
+
+    assert coordinator.snapshot.weight == 18.0
+    assert coordinator.settle.value == 18.0
+    latest = coordinator.samples.latest()
+    assert latest is not None
+    assert latest[1] == 60.0
+
+
+async def test_listeners_woken_by_their_sources(
+    hass: HomeAssistant, coordinator: BookooCoordinator
+) -> None:
+    """A weight change wakes the weight listeners only."""
+    woken: list[str] = []
+    coordinator.async_add_listener(
+        lambda: woken.append("weight"), frozenset({BookooSource.WEIGHT})
+    )
+    coordinator.async_add_listener(
+        lambda: woken.append("device_state"), frozenset({BookooSource.DEVICE_STATE})
+    )
+    coordinator.scale.push(18.0, 0.0, 0.0)
+    await hass.async_block_till_done()
+    woken.clear()
+
+    coordinator.scale.push(20.0, 0.0, 0.0)
+    await hass.async_block_till_done()
+
+    assert woken == ["weight"]
+
+
+async def test_connection_change_wakes_all_listeners(
+    hass: HomeAssistant, coordinator: BookooCoordinator
+) -> None:
+    """Availability depends on the connection, so everyone is woken."""
+    woken: list[str] = []
+    coordinator.async_add_listener(
+        lambda: woken.append("weight"), frozenset({BookooSource.WEIGHT})
+    )
+    coordinator.async_add_listener(
+        lambda: woken.append("device_state"), frozenset({BookooSource.DEVICE_STATE})
+    )
+
+    coordinator.scale.device_disconnected_handler()
+    await hass.async_block_till_done()
+
+    assert sorted(woken) == ["device_state", "weight"]
+
+
+async def test_coalesced_notifications_wake_once(
+    hass: HomeAssistant, coordinator: BookooCoordinator
+) -> None:
+    """Notifications within a frame share a single listener update."""
+    woken: list[str] = []
+    coordinator.async_add_listener(
+        lambda: woken.append("weight"), frozenset({BookooSource.WEIGHT})
+    )
+    coordinator.scale.push(18.0, 0.0, 0.0)
+    await hass.async_block_till_done()
+    woken.clear()
+    dropped = coordinator.state_writes_dropped
+
+    for weight in (20.0, 21.0, 22.0):
+        coordinator.scale.push(weight, 0.0, 0.0)
+    await hass.async_block_till_done()
+
+    assert woken == ["weight"]
+    assert coordinator.snapshot.weight == 22.0
+    # the two coalesced notifications would each have woken the listener
+    assert coordinator.state_writes_dropped - dropped >= 2
@@ -0,0 +1,117 @@
+"""Tests of the classification of discovered devices."""
+
+from __future__ import annotations
+
+import time
+from unittest.mock import AsyncMock, patch
+
+from aiobookoo.exceptions import BookooUnknownDevice
+from bleak.backends.device import BLEDevice
+import pytest
+
+from homeassistant.components.bluetooth import BluetoothServiceInfoBleak
+from homeassistant.core import HomeAssistant
+
+from custom_components.bookoo.discovery import (
+    CACHE_TTL,
+    SERVICE_UUID,
+    async_classify_device,
+    is_bookoo_advertisement,
+    is_scale_advertisement,
+)
+
+ADDRESS = "AA:BB:CC:DD:EE:FF"
+
+
+def service_info(name: str, service_uuids: list[str]) -> BluetoothServiceInfoBleak:
+    """Return an advertisement of a device."""
+    return BluetoothServiceInfoBleak(
+        name=name,
+        address=ADDRESS,
+        rssi=-60,
+        manufacturer_data={},
+        service_data={},
+        service_uuids=service_uuids,
+        source="local",
+        device=BLEDevice(ADDRESS, name, None, -60),
+        advertisement=None,
+        connectable=True,
+        time=0,
+        tx_power=None,
+    )
+
+
+@pytest.mark.parametrize(
+    ("name", "service_uuids", "bookoo", "scale"),
+    [
+        ("BOOKOO_SC", [SERVICE_UUID], True, True),
+        ("bookoo_sc", [SERVICE_UUID], True, True),
+        ("BOOKOO_EM", [], True, False),
+        ("", [SERVICE_UUID], True, False),
+        ("Other", [], False, False),
+    ],
+)
+def test_advertisement_matching(
+    name: str, service_uuids: list[str], bookoo: bool, scale: bool
+) -> None:
+    """Name and service both identify a scale, either one a Bookoo device."""
+    info = service_info(name, service_uuids)
+
+    assert is_bookoo_advertisement(info) is bookoo
+    assert is_scale_advertisement(info) is scale
+
+
+async def test_scale_advertisement_needs_no_connection(hass: HomeAssistant) -> None:
+    """A conclusive advertisement classifies without connecting."""
+    with patch(
+        "custom_components.bookoo.discovery.is_bookoo_scale", AsyncMock()
+    ) as is_bookoo_scale:
+        assert await async_classify_device(
+            hass, ADDRESS, service_info("BOOKOO_SC", [SERVICE_UUID])
+        )
+        # remembered for devices that are rediscovered by name only
+        assert await async_classify_device(hass, ADDRESS, service_info("", []))
+
+    is_bookoo_scale.assert_not_awaited()
+
+
+async def test_classification_cached(hass: HomeAssistant) -> None:
+    """A device is connected to once, then its classification is reused."""
+    with patch(
+        "custom_components.bookoo.discovery.is_bookoo_scale",
+        AsyncMock(return_value=False),
+    ) as is_bookoo_scale:
+        info = service_info("BOOKOO_EM", [])
+        assert not await async_classify_device(hass, ADDRESS, info)
+        assert not await async_classify_device(hass, ADDRESS, info)
+
+    is_bookoo_scale.assert_awaited_once_with(ADDRESS)
+
+
+async def test_unknown_device_cached(hass: HomeAssistant) -> None:
+    """Unsupported devices keep raising without a connection."""
+    with patch(
+        "custom_components.bookoo.discovery.is_bookoo_scale",
+        AsyncMock(side_effect=BookooUnknownDevice),
+    ) as is_bookoo_scale:
+        for _ in range(2):
+            with pytest.raises(BookooUnknownDevice):
+                await async_classify_device(hass, ADDRESS)
+
+    is_bookoo_scale.assert_awaited_once()
+
+
+async def test_outdated_classification_checked_again(hass: HomeAssistant) -> None:
+    """Classifications older than the TTL connect again."""
+    with patch(
+        "custom_components.bookoo.discovery.is_bookoo_scale",
+        AsyncMock(return_value=True),
+    ) as is_bookoo_scale:
+        assert await async_classify_device(hass, ADDRESS)
+        with patch(
+            "custom_components.bookoo.discovery.time.time",
+            return_value=time.time() + CACHE_TTL + 1,
+        ):
+            assert await async_classify_device(hass, ADDRESS)
+
+    assert is_bookoo_scale.await_count == 2
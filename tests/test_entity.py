@@ -0,0 +1,92 @@
+"""Tests of the state writes of the entities."""
+
+from __future__ import annotations
+
+import pytest
+
+from homeassistant.const import STATE_UNAVAILABLE, Platform
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.device_registry import format_mac
+
+from custom_components.bookoo.const import CONF_LONG_TERM_STATISTICS, DOMAIN
+from custom_components.bookoo.coordinator import BookooCoordinator
+
+from .conftest import ADDRESS
+
+
+def entity_id(hass: HomeAssistant, key: str) -> str:
+    """Return the entity id of a sensor of the scale."""
+    entity = er.async_get(hass).async_get_entity_id(
+        Platform.SENSOR, DOMAIN, f"{format_mac(ADDRESS)}_{key}"
+    )
+    assert entity is not None
+    return entity
+
+
+async def push(
+    hass: HomeAssistant,
+    coordinator: BookooCoordinator,
+    weight: float,
+    flow_rate: float = 0.0,
+) -> None:
+    """Deliver a notification and let the entities write their states."""
+    coordinator.scale.push(weight, flow_rate, 0.0)
+    await hass.async_block_till_done()
+
+
+async def test_unchanged_value_not_written(
+    hass: HomeAssistant, coordinator: BookooCoordinator
+) -> None:
+    """Notifications repeating the value write no state."""
+    await push(hass, coordinator, 18.0)
+    writes = coordinator.metrics.state_writes["weight"]
+
+    await push(hass, coordinator, 18.0)
+
+    assert coordinator.metrics.state_writes["weight"] == writes
+
+
+async def test_deadband(hass: HomeAssistant, coordinator: BookooCoordinator) -> None:
+    """Changes within the deadband are skipped, larger ones written."""
+    flow_rate = entity_id(hass, "flow_rate")
+    await push(hass, coordinator, 0.0, 1.0)
+    assert hass.states.get(flow_rate).state == "1.0"
+
+    await push(hass, coordinator, 0.0, 1.04)
+    assert hass.states.get(flow_rate).state == "1.0"
+
+    await push(hass, coordinator, 0.0, 1.1)
+    assert hass.states.get(flow_rate).state == "1.1"
+
+
+@pytest.mark.parametrize("entry_options", [{CONF_LONG_TERM_STATISTICS: True}])
+async def test_min_write_interval(
+    hass: HomeAssistant, coordinator: BookooCoordinator
+) -> None:
+    """Writes within the minimum interval are delayed, the latest one wins."""
+    weight = entity_id(hass, "weight")
+    # the connect was just written, so these are within the interval
+    await push(hass, coordinator, 1.0)
+    await push(hass, coordinator, 2.0)
+    writes = coordinator.metrics.state_writes["weight"]
+
+    await push(hass, coordinator, 3.0)
+
+    assert hass.states.get(weight).state == "0.0"
+    assert coordinator.metrics.state_writes["weight"] == writes
+
+
+@pytest.mark.parametrize("entry_options", [{CONF_LONG_TERM_STATISTICS: True}])
+async def test_availability_written_right_away(
+    hass: HomeAssistant, coordinator: BookooCoordinator
+) -> None:
+    """A disconnect isn't held back by a delayed write."""
+    weight = entity_id(hass, "weight")
+    await push(hass, coordinator, 1.0)
+    await push(hass, coordinator, 2.0)
+
+    coordinator.scale.device_disconnected_handler()
+    await hass.async_block_till_done()
+
+    assert hass.states.get(weight).state == STATE_UNAVAILABLE
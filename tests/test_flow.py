@@ -0,0 +1,79 @@
+"""Tests of the flow estimators."""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from benchmarks.simulator import SAMPLE_INTERVAL, shot_stream
+from custom_components.bookoo.flow import (
+    FlowEstimator,
+    FlowMethod,
+    create_estimator,
+    window_size,
+)
+
+SIZE = window_size(1.0)
+
+
+@pytest.mark.parametrize("method", list(FlowMethod))
+def test_constant_flow(method: FlowMethod) -> None:
+    """A steady flow is estimated exactly."""
+    estimator = create_estimator(method, SIZE)
+
+    for i in range(100):
+        value = estimator.update(i * SAMPLE_INTERVAL, 2.5 * i * SAMPLE_INTERVAL)
+
+    assert value == pytest.approx(2.5, abs=1e-6)
+
+
+@pytest.mark.parametrize("method", list(FlowMethod))
+def test_noisy_flow(method: FlowMethod) -> None:
+    """Scale noise averages out over the window."""
+    rng = random.Random(0)
+    estimator = create_estimator(method, SIZE)
+    errors = []
+
+    for i in range(300):
+        t = i * SAMPLE_INTERVAL
+        value = estimator.update(t, round(1.5 * t + rng.gauss(0, 0.05), 1))
+        if i >= 50:
+            errors.append(value - 1.5)
+
+    assert sum(errors) / len(errors) == pytest.approx(0, abs=0.05)
+    rms = (sum(error * error for error in errors) / len(errors)) ** 0.5
+    assert rms < 0.4
+
+
+@pytest.mark.parametrize("method", list(FlowMethod))
+def test_shot_flow(method: FlowMethod) -> None:
+    """The estimate follows the flow of a simulated shot."""
+    samples = list(shot_stream(seed=0))
+    estimator = create_estimator(method, SIZE)
+    errors = []
+
+    for timestamp, weight, flow_rate, _ in samples:
+        value = estimator.update(timestamp, weight)
+        # the ramp settles within a couple of seconds, compare near the peak
+        if flow_rate > 1.5:
+            errors.append(value - flow_rate)
+
+    assert errors
+    assert sum(errors) / len(errors) == pytest.approx(0, abs=0.2)
+
+
+def test_window_size() -> None:
+    """Windows are at least a few samples long."""
+    assert window_size(1.0) == 10
+    assert window_size(0.1) == 5
+
+
+def test_estimator_must_implement_update() -> None:
+    """An estimator without update fails when it is created."""
+
+    class Incomplete(FlowEstimator):
+        __slots__ = ()
+
+    with pytest.raises(TypeError):
+        Incomplete()  # type: ignore[abstract]
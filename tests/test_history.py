@@ -0,0 +1,127 @@
+"""Tests of the shot history."""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
+import math
+from pathlib import Path
+import sqlite3
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.bookoo.history import ShotHistory, ShotTrace
+from custom_components.bookoo.profiles import resample_profile
+from custom_components.bookoo.shot import Shot
+
+ADDRESS = "AA:BB:CC:DD:EE:01"
+OTHER_ADDRESS = "AA:BB:CC:DD:EE:02"
+STARTED_AT = datetime(2026, 10, 17, 8, 30, tzinfo=UTC)
+
+
+@pytest.fixture
+async def history(
+    hass: HomeAssistant, tmp_path: Path
+) -> AsyncIterator[ShotHistory]:
+    """Return the shot history of a scale, stored in a temporary directory."""
+    hass.config.config_dir = str(tmp_path)
+    history = ShotHistory(hass, ADDRESS)
+    yield history
+    await history.async_close()
+
+
+def make_trace(yield_weight: float) -> ShotTrace:
+    """Return a trace of a shot linearly reaching the yield in 25 s."""
+    timestamps = array("d", (i * 0.1 for i in range(251)))
+    return ShotTrace(
+        timestamp=timestamps,
+        weight=array("d", (yield_weight * t / 25 for t in timestamps)),
+        flow_rate=array("d", (yield_weight / 25 for _ in timestamps)),
+        # the timer of the first sample was missing
+        timer=array("d", (math.nan, *timestamps[1:])),
+    )
+
+
+async def add_shot(history: ShotHistory, yield_weight: float) -> int | None:
+    """Store a shot with the given yield."""
+    trace = make_trace(yield_weight)
+    shot = Shot(
+        start=0.0,
+        end=25.0,
+        start_seq=0,
+        end_seq=len(trace),
+        start_weight=0.0,
+        final_weight=yield_weight,
+        peak_flow=yield_weight / 25,
+    )
+    profile = resample_profile(trace.timestamp, trace.weight)
+    return await history.async_add(shot, STARTED_AT, trace, profile)
+
+
+async def test_add_and_get(history: ShotHistory) -> None:
+    """A stored shot comes back with its trace, missing values included."""
+    shot_id = await add_shot(history, 36.0)
+    assert shot_id is not None
+
+    records = await history.async_list()
+    assert [record.id for record in records] == [shot_id]
+    assert records[0].yield_weight == 36.0
+    assert records[0].started_at == STARTED_AT
+    assert records[0].samples == 251
+
+    trace = await history.async_get_trace(shot_id)
+    assert trace is not None
+    assert trace.weight == make_trace(36.0).weight
+    assert math.isnan(trace.timer[0])
+
+
+async def test_scales_share_the_file_not_their_shots(
+    hass: HomeAssistant, history: ShotHistory
+) -> None:
+    """The shots of another scale in the same database aren't visible."""
+    other = ShotHistory(hass, OTHER_ADDRESS)
+    try:
+        other_id = await add_shot(other, 40.0)
+        shot_id = await add_shot(history, 36.0)
+        assert other_id is not None
+        assert shot_id is not None
+
+        assert await history.async_get_trace(other_id) is None
+        assert await history.async_get_shots([shot_id, other_id]) == {
+            shot_id: (await history.async_list())[0]
+        }
+        assert [record.id for record in await other.async_list()] == [other_id]
+        assert [shot for shot, _ in await history.async_load_profiles()] == [shot_id]
+    finally:
+        await other.async_close()
+
+
+async def test_summarize(history: ShotHistory) -> None:
+    """Shots are aggregated per period."""
+    await add_shot(history, 30.0)
+    await add_shot(history, 40.0)
+
+    summary = await history.async_summarize(
+        STARTED_AT.replace(hour=8, minute=0), STARTED_AT.replace(hour=9, minute=0)
+    )
+
+    assert summary is not None
+    assert summary.count == 2
+    assert summary.yield_mean == 35.0
+    assert summary.total_yield == 70.0
+    assert await history.async_summarize(
+        STARTED_AT.replace(hour=9, minute=0), STARTED_AT.replace(hour=10, minute=0)
+    ) is None
+
+
+async def test_closed_history_stays_closed(history: ShotHistory) -> None:
+    """A store queued before closing doesn't reopen the database."""
+    await add_shot(history, 36.0)
+    await history.async_close()
+
+    assert await add_shot(history, 36.0) is None
+    with pytest.raises(sqlite3.ProgrammingError):
+        await history.async_list()
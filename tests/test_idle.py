@@ -0,0 +1,73 @@
+"""Tests of the idle detection."""
+
+from __future__ import annotations
+
+from custom_components.bookoo.idle import (
+    ADVERTISEMENT_GAP,
+    WEIGHT_TOLERANCE,
+    IdleTracker,
+)
+
+TIMEOUT = 60.0
+
+
+def test_idle_after_timeout() -> None:
+    """A scale left alone is idle once the timeout passed."""
+    tracker = IdleTracker(TIMEOUT)
+    tracker.update(0.0, 18.0, 0.0)
+
+    assert not tracker.is_idle(TIMEOUT - 0.1)
+    assert tracker.is_idle(TIMEOUT)
+
+
+def test_noise_is_no_activity() -> None:
+    """Weight changes within the tolerance don't count as use."""
+    tracker = IdleTracker(TIMEOUT)
+    tracker.update(0.0, 18.0, 0.0)
+
+    tracker.update(30.0, 18.0 + WEIGHT_TOLERANCE / 2, 0.0)
+    assert tracker.is_idle(TIMEOUT)
+
+    tracker.update(40.0, 18.0 + 2 * WEIGHT_TOLERANCE, 0.0)
+    assert not tracker.is_idle(TIMEOUT)
+    assert tracker.is_idle(40.0 + TIMEOUT)
+
+
+def test_timer_and_commands_are_activity() -> None:
+    """A running timer and sent commands keep the scale in use."""
+    tracker = IdleTracker(TIMEOUT)
+    tracker.update(0.0, 18.0, 0.0)
+
+    tracker.update(30.0, 18.0, 0.1)
+    assert not tracker.is_idle(TIMEOUT)
+    tracker.activity(80.0)
+    assert not tracker.is_idle(30.0 + TIMEOUT)
+    assert tracker.is_idle(80.0 + TIMEOUT)
+
+
+def test_disabled() -> None:
+    """A timeout of 0 never reports idle."""
+    tracker = IdleTracker(0)
+
+    assert not tracker.is_idle(1e6)
+
+
+def test_advertising_after_release_is_no_wake_up() -> None:
+    """A released scale advertising right away wasn't switched off and on."""
+    tracker = IdleTracker(TIMEOUT)
+    # seen advertising long ago, then connected and released
+    assert tracker.advertised(0.0)
+    tracker.released(1000.0)
+
+    assert not tracker.advertised(1001.0)
+    assert not tracker.advertised(1002.0)
+
+
+def test_advertising_after_gap_wakes() -> None:
+    """A scale advertising again after a gap was switched on."""
+    tracker = IdleTracker(TIMEOUT)
+    tracker.released(0.0)
+    tracker.advertised(1.0)
+
+    assert not tracker.advertised(1.0 + ADVERTISEMENT_GAP - 0.1)
+    assert tracker.advertised(1.0 + 3 * ADVERTISEMENT_GAP)
@@ -0,0 +1,104 @@
+"""Tests of the connection manager."""
+
+from __future__ import annotations
+
+import asyncio
+
+from custom_components.bookoo.manager import (
+    PRIORITY_ACTIVE,
+    PRIORITY_IDLE,
+    BookooConnectionManager,
+)
+
+
+async def _hold(
+    manager: BookooConnectionManager,
+    priority: int,
+    name: str,
+    order: list[str],
+    release: asyncio.Event,
+) -> None:
+    """Take a slot, note the order it was granted in and hold it."""
+    async with manager.async_connect_slot(priority):
+        order.append(name)
+        await release.wait()
+
+
+async def test_concurrent_connects_limited() -> None:
+    """No more than the allowed connection attempts run at once."""
+    manager = BookooConnectionManager(max_connects=2)
+    order: list[str] = []
+    release = asyncio.Event()
+    tasks = [
+        asyncio.create_task(_hold(manager, PRIORITY_IDLE, str(i), order, release))
+        for i in range(4)
+    ]
+    await asyncio.sleep(0)
+
+    assert order == ["0", "1"]
+    assert manager.waiting == 2
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert order == ["0", "1", "2", "3"]
+    assert manager.waiting == 0
+
+
+async def test_active_scales_first() -> None:
+    """Waiting scales in use get a slot before idle ones, else first come."""
+    manager = BookooConnectionManager(max_connects=1)
+    order: list[str] = []
+    releases = {name: asyncio.Event() for name in ("held", "idle", "a", "b")}
+    tasks = [
+        asyncio.create_task(
+            _hold(manager, PRIORITY_IDLE, "held", order, releases["held"])
+        )
+    ]
+    await asyncio.sleep(0)
+    for name, priority in (
+        ("idle", PRIORITY_IDLE),
+        ("a", PRIORITY_ACTIVE),
+        ("b", PRIORITY_ACTIVE),
+    ):
+        tasks.append(
+            asyncio.create_task(_hold(manager, priority, name, order, releases[name]))
+        )
+    await asyncio.sleep(0)
+
+    for release in releases.values():
+        release.set()
+    await asyncio.gather(*tasks)
+
+    assert order == ["held", "a", "b", "idle"]
+
+
+async def test_cancelled_waiter_keeps_slot_free() -> None:
+    """A scale giving up while waiting doesn't take the slot with it."""
+    manager = BookooConnectionManager(max_connects=1)
+    order: list[str] = []
+    release = asyncio.Event()
+    held = asyncio.create_task(_hold(manager, PRIORITY_IDLE, "held", order, release))
+    await asyncio.sleep(0)
+    waiting = asyncio.create_task(
+        _hold(manager, PRIORITY_ACTIVE, "cancelled", order, release)
+    )
+    await asyncio.sleep(0)
+
+    waiting.cancel()
+    await asyncio.gather(waiting, return_exceptions=True)
+    release.set()
+    await held
+
+    async with asyncio.timeout(1):
+        async with manager.async_connect_slot(PRIORITY_IDLE):
+            pass
+    assert order == ["held"]
+
+
+def test_priority_of_advertising_scale() -> None:
+    """A scale that advertised recently is in use."""
+    manager = BookooConnectionManager()
+
+    assert manager.priority("AA:BB:CC:DD:EE:FF", None) == PRIORITY_IDLE
+    manager.async_advertised("AA:BB:CC:DD:EE:FF")
+    assert manager.priority("AA:BB:CC:DD:EE:FF", None) == PRIORITY_ACTIVE
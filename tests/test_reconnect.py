@@ -0,0 +1,64 @@
+"""Tests of the reconnect backoff."""
+
+from __future__ import annotations
+
+import random
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.bookoo.reconnect import (
+    FACTOR,
+    INITIAL_DELAY,
+    JITTER,
+    MAX_DELAY,
+    ReconnectBackoff,
+)
+
+
+def test_delays_within_jitter_bounds() -> None:
+    """Each delay is the exponential step, capped, within the jitter."""
+    random.seed(0)
+    backoff = ReconnectBackoff()
+
+    for failures in range(12):
+        expected = min(MAX_DELAY, INITIAL_DELAY * FACTOR**failures)
+        delay = backoff.failed(0.0)
+        assert expected * (1 - JITTER) <= delay <= expected * (1 + JITTER)
+
+    assert backoff.failures == 12
+
+
+@pytest.mark.parametrize("jitter", [1 - JITTER, 1 + JITTER])
+def test_jitter_extremes(jitter: float) -> None:
+    """The jitter scales the capped delay."""
+    backoff = ReconnectBackoff()
+    with patch.object(random, "uniform", return_value=jitter):
+        delays = [backoff.failed(0.0) for _ in range(10)]
+
+    assert delays[0] == pytest.approx(INITIAL_DELAY * jitter)
+    assert delays[-1] == pytest.approx(MAX_DELAY * jitter)
+
+
+def test_ready_after_delay() -> None:
+    """An attempt is due once the delay passed."""
+    backoff = ReconnectBackoff()
+    assert backoff.ready(0.0)
+
+    delay = backoff.failed(100.0)
+
+    assert not backoff.ready(100.0 + delay - 0.1)
+    assert backoff.ready(100.0 + delay)
+
+
+def test_reset() -> None:
+    """A reset allows an attempt right away and starts the backoff over."""
+    backoff = ReconnectBackoff()
+    for _ in range(5):
+        backoff.failed(0.0)
+
+    backoff.reset()
+
+    assert backoff.ready(0.0)
+    assert backoff.failures == 0
+    assert backoff.failed(0.0) <= INITIAL_DELAY * (1 + JITTER)
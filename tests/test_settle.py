@@ -0,0 +1,81 @@
+"""Tests of the settled weight detection."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from benchmarks.simulator import Sample, idle_stream, shot_stream
+from custom_components.bookoo.const import (
+    DEFAULT_SETTLE_TIME,
+    DEFAULT_SETTLE_TOLERANCE,
+)
+from custom_components.bookoo.settle import MIN_WINDOW, SettleDetector
+
+
+def transitions(
+    detector: SettleDetector, samples: Iterable[Sample]
+) -> list[tuple[float, bool, float | None]]:
+    """Feed the weights and return the time and outcome of each transition."""
+    return [
+        (timestamp, detector.settled, detector.value)
+        for timestamp, weight, _, _ in samples
+        if detector.update(weight)
+    ]
+
+
+def test_settles_after_hold_time() -> None:
+    """A steady weight settles once it was steady for the hold time."""
+    detector = SettleDetector(DEFAULT_SETTLE_TOLERANCE, DEFAULT_SETTLE_TIME)
+
+    result = transitions(detector, idle_stream(5, 18.0, seed=0))
+
+    assert result == [(DEFAULT_SETTLE_TIME - 0.1, True, 18.0)]
+
+
+def test_shot_unsettles_and_settles_at_final_weight() -> None:
+    """A pour unsettles the weight, it settles again once the drips stop."""
+    detector = SettleDetector(DEFAULT_SETTLE_TOLERANCE, DEFAULT_SETTLE_TIME)
+    samples = list(shot_stream(seed=0))
+
+    stopped = next(t for t, weight, _, _ in samples if weight >= 36.0)
+
+    result = transitions(detector, samples)
+
+    # settled on the empty cup, then nothing until the pour started
+    assert result[0][1:] == (True, 0.0)
+    assert result[1][1] is False
+    assert result[1][0] > 8.0
+    # never settled while pouring, settled at the final weight at the end
+    assert all(t > stopped for t, _, _ in result[2:])
+    assert result[-1][1:] == (True, samples[-1][1])
+
+
+def test_noise_beyond_tolerance_never_settles() -> None:
+    """A weight wavering more than the tolerance doesn't settle."""
+    detector = SettleDetector(DEFAULT_SETTLE_TOLERANCE, DEFAULT_SETTLE_TIME)
+
+    assert transitions(detector, idle_stream(5, 18.0, noise=0.5, seed=0)) == []
+    assert detector.value is None
+
+
+def test_short_hold_time() -> None:
+    """A hold time shorter than a few samples uses the minimal window."""
+    detector = SettleDetector(DEFAULT_SETTLE_TOLERANCE, 0.0)
+
+    for _ in range(MIN_WINDOW - 1):
+        assert not detector.update(18.0)
+    assert detector.update(18.0)
+
+
+def test_reset() -> None:
+    """Resetting forgets the samples and reports whether it was settled."""
+    detector = SettleDetector(DEFAULT_SETTLE_TOLERANCE, DEFAULT_SETTLE_TIME)
+    transitions(detector, idle_stream(5, 18.0, seed=0))
+
+    assert detector.reset()
+    assert not detector.settled
+    assert not detector.reset()
+    # the window has to fill again before the weight settles
+    assert transitions(detector, idle_stream(5, 18.0, seed=1)) == [
+        (DEFAULT_SETTLE_TIME - 0.1, True, 18.0)
+    ]
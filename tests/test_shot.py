@@ -0,0 +1,142 @@
+"""Tests of the shot detector."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+import pytest
+
+from benchmarks.simulator import Sample, session_stream, shot_stream
+from custom_components.bookoo.shot import (
+    MIN_DURATION,
+    START_FLOW,
+    ShotDetector,
+    ShotEvent,
+    ShotState,
+)
+
+
+def replay(
+    detector: ShotDetector, samples: Iterable[Sample]
+) -> list[tuple[ShotEvent, float]]:
+    """Feed samples to the detector and return the events with their times."""
+    events = []
+    for seq, (timestamp, weight, flow_rate, timer) in enumerate(samples):
+        if (event := detector.update(seq, timestamp, weight, flow_rate, timer)):
+            events.append((event, timestamp))
+    return events
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_shot_with_preinfusion(seed: int) -> None:
+    """A shot pausing in pre-infusion is detected once, from timer start."""
+    samples = list(shot_stream(seed=seed))
+    detector = ShotDetector()
+
+    events = replay(detector, samples)
+
+    assert [event for event, _ in events] == [ShotEvent.STARTED, ShotEvent.ENDED]
+    shot = detector.last_shot
+    assert shot is not None
+    timer_start = next(seq for seq, sample in enumerate(samples) if sample[3] > 0)
+    assert shot.start_seq == timer_start
+    assert shot.start == samples[timer_start][0]
+    # the stream settles at its final weight, dripping included
+    assert shot.yield_weight == pytest.approx(samples[-1][1], abs=0.3)
+    assert detector.state is ShotState.IDLE
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_session(seed: int) -> None:
+    """Every shot of a session is started and ended exactly once."""
+    detector = ShotDetector()
+
+    events = replay(detector, session_stream(shots=3, seed=seed))
+
+    assert [event for event, _ in events] == [
+        ShotEvent.STARTED,
+        ShotEvent.ENDED,
+    ] * 3
+
+
+def test_trace_range_matches_times() -> None:
+    """The sample range of a shot covers exactly its start to its end."""
+    samples = list(shot_stream(seed=0))
+    detector = ShotDetector()
+
+    replay(detector, samples)
+
+    shot = detector.last_shot
+    assert shot is not None
+    assert samples[shot.start_seq][0] == shot.start
+    assert samples[shot.end_seq - 1][0] == shot.end
+    # the trailing plateau isn't part of the shot
+    assert samples[-1][0] - shot.end >= 3.0
+
+
+def test_start_by_flow() -> None:
+    """Without the timer a shot starts at its first sample with flow."""
+    samples = [
+        (timestamp, weight, flow_rate, 0.0)
+        for timestamp, weight, flow_rate, _ in shot_stream(seed=0)
+    ]
+    detector = ShotDetector()
+
+    events = replay(detector, samples)
+
+    assert [event for event, _ in events] == [ShotEvent.STARTED, ShotEvent.ENDED]
+    shot = detector.last_shot
+    assert shot is not None
+    first_flow = next(
+        seq for seq, sample in enumerate(samples) if sample[2] >= START_FLOW
+    )
+    assert shot.start_seq == first_flow
+    assert shot.start == samples[first_flow][0]
+
+
+def test_short_shot_cancelled() -> None:
+    """A burst of flow shorter than MIN_DURATION is cancelled."""
+    samples: list[Sample] = [(i * 0.1, 0.0, 0.0, 0.0) for i in range(10)]
+    weight = 0.0
+    for i in range(10, 20):
+        weight += 0.1
+        samples.append((i * 0.1, round(weight, 1), 1.0, 0.0))
+    samples.extend((i * 0.1, round(weight, 1), 0.0, 0.0) for i in range(20, 80))
+    detector = ShotDetector()
+
+    events = replay(detector, samples)
+
+    assert [event for event, _ in events] == [
+        ShotEvent.STARTED,
+        ShotEvent.CANCELLED,
+    ]
+    assert events[1][1] - events[0][1] < MIN_DURATION + 3.5
+    assert detector.last_shot is None
+
+
+def test_cup_removed() -> None:
+    """Removing the cup ends the shot with the weight before the removal."""
+    samples = [sample for sample in shot_stream(seed=0) if sample[0] < 20]
+    timestamp, weight, _, timer = samples[-1]
+    samples.append((timestamp + 0.1, 0.0, 0.0, timer + 0.1))
+    detector = ShotDetector()
+
+    events = replay(detector, samples)
+
+    assert [event for event, _ in events] == [ShotEvent.STARTED, ShotEvent.ENDED]
+    shot = detector.last_shot
+    assert shot is not None
+    assert shot.final_weight == pytest.approx(weight, abs=0.2)
+
+
+def test_timer_reset() -> None:
+    """Resetting the timer ends the shot."""
+    samples = [sample for sample in shot_stream(seed=0) if sample[0] < 20]
+    timestamp, weight, flow_rate, _ = samples[-1]
+    samples.append((timestamp + 0.1, weight, flow_rate, 0.0))
+    detector = ShotDetector()
+
+    events = replay(detector, samples)
+
+    assert [event for event, _ in events] == [ShotEvent.STARTED, ShotEvent.ENDED]
+    assert events[-1][1] == timestamp + 0.1
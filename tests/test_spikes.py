@@ -0,0 +1,102 @@
+"""Tests of the spike rejection."""
+
+from __future__ import annotations
+
+from benchmarks.simulator import add_spikes, idle_stream, shot_stream
+from custom_components.bookoo.snapshot import ScaleSnapshot
+from custom_components.bookoo.spikes import (
+    WEIGHT_MIN_DEVIATION,
+    WINDOW,
+    HampelFilter,
+    SpikeFilter,
+)
+
+
+def test_single_spikes_rejected() -> None:
+    """Single-sample spikes are replaced, the other samples pass unchanged."""
+    clean = [weight for _, weight, _, _ in idle_stream(60, 18.0, seed=0)]
+    spiked, indices = add_spikes(
+        ((0.0, weight, 0.0, 0.0) for weight in clean[WINDOW:]), every=20, seed=0
+    )
+    samples = clean[:WINDOW] + [weight for _, weight, _, _ in spiked]
+    indices = {index + WINDOW for index in indices}
+    spike_filter = HampelFilter(WEIGHT_MIN_DEVIATION)
+
+    filtered = [spike_filter.update(weight) for weight in samples]
+    # a spike is counted once the next sample shows it wasn't a step
+    spike_filter.update(clean[-1])
+
+    assert spike_filter.rejected == len(indices)
+    assert spike_filter.delayed == 0
+    for index, (weight, original) in enumerate(zip(filtered, clean, strict=True)):
+        if index in indices:
+            assert abs(weight - original) <= 0.3
+        else:
+            assert weight == original
+
+
+def test_real_step_passes() -> None:
+    """A real change of the weight passes after half the window, delayed."""
+    spike_filter = HampelFilter(WEIGHT_MIN_DEVIATION)
+    for _ in range(WINDOW):
+        spike_filter.update(0.0)
+
+    filtered = [spike_filter.update(20.0) for _ in range(WINDOW)]
+
+    held = WINDOW // 2
+    assert filtered == [0.0] * held + [20.0] * (WINDOW - held)
+    assert spike_filter.rejected == 0
+    assert spike_filter.delayed == held
+
+
+def test_shot_passes_unchanged() -> None:
+    """Nothing of a clean shot is rejected, the snapshots are passed on."""
+    spike_filter = SpikeFilter()
+
+    for _, weight, flow_rate, timer in shot_stream(seed=0):
+        snapshot = ScaleSnapshot(True, weight, flow_rate, timer)
+        assert spike_filter.filter(snapshot) is snapshot
+    assert spike_filter.rejected == 0
+
+
+def test_flow_spike_rejected() -> None:
+    """A flow rate spike is replaced while the weight is kept."""
+    spike_filter = SpikeFilter()
+    for _ in range(WINDOW):
+        spike_filter.filter(ScaleSnapshot(True, 18.0, 1.5, 10.0))
+
+    snapshot = ScaleSnapshot(True, 18.2, 12.0, 10.1)
+    filtered = spike_filter.filter(snapshot)
+
+    assert filtered == ScaleSnapshot(True, 18.2, 1.5, 10.1)
+    assert spike_filter.rejected == 0
+    spike_filter.filter(ScaleSnapshot(True, 18.3, 1.5, 10.2))
+    assert spike_filter.flow_rate.rejected == 1
+    assert spike_filter.rejected == 1
+
+
+def test_missing_readings_pass() -> None:
+    """Snapshots without readings pass through the filter."""
+    spike_filter = SpikeFilter()
+    snapshot = ScaleSnapshot()
+
+    assert spike_filter.filter(snapshot) is snapshot
+
+
+def test_reset() -> None:
+    """Resetting forgets the window but keeps the counts."""
+    spike_filter = SpikeFilter()
+    for _ in range(WINDOW):
+        spike_filter.filter(ScaleSnapshot(True, 18.0, 0.0, 0.0))
+    spike_filter.filter(ScaleSnapshot(True, 60.0, 0.0, 0.0))
+    spike_filter.filter(ScaleSnapshot(True, 18.0, 0.0, 0.0))
+    spike_filter.filter(ScaleSnapshot(True, 60.0, 0.0, 0.0))
+
+    spike_filter.reset()
+
+    # with an empty window the first samples can't be judged, neither can
+    # the sample held when resetting
+    snapshot = ScaleSnapshot(True, 60.0, 0.0, 0.0)
+    assert spike_filter.filter(snapshot) is snapshot
+    assert spike_filter.rejected == 1
+    assert spike_filter.delayed == 0
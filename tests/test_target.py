@@ -0,0 +1,106 @@
+"""Tests of the predictive stop at a target yield."""
+
+from __future__ import annotations
+
+import pytest
+
+from custom_components.bookoo.target import (
+    DEFAULT_LAG,
+    LEARNING_RATE,
+    STOP_WINDOW,
+    TargetWeightController,
+)
+
+TARGET = 36.0
+FLOW = 2.0
+
+
+def stopped(controller: TargetWeightController) -> float | None:
+    """Feed a shot at a constant flow, return the yield at the stop signal."""
+    controller.start()
+    for tick in range(300):
+        timestamp = tick / 10
+        yield_weight = FLOW * timestamp
+        if controller.update(timestamp, yield_weight, FLOW) is not None:
+            return yield_weight
+    return None
+
+
+def test_stops_ahead_of_target() -> None:
+    """The stop is due once the yield plus the dripping lag reaches the target."""
+    controller = TargetWeightController()
+    controller.target = TARGET
+
+    yield_weight = stopped(controller)
+
+    assert yield_weight == pytest.approx(TARGET - FLOW * DEFAULT_LAG)
+    reached = controller.reached
+    assert reached is not None
+    assert reached.predicted_yield >= TARGET
+    assert reached.lag == DEFAULT_LAG
+
+
+def test_triggers_once_per_shot() -> None:
+    """Once reached, the controller stays quiet until the next shot."""
+    controller = TargetWeightController()
+    controller.target = TARGET
+    stopped(controller)
+
+    assert controller.update(30.0, 60.0, FLOW) is None
+    assert stopped(controller) is not None
+
+
+def test_no_target() -> None:
+    """Without a target the stop is never due."""
+    controller = TargetWeightController()
+
+    assert stopped(controller) is None
+
+
+def test_learns_lag_from_overshoot() -> None:
+    """An overshoot moves the lag towards the measured one."""
+    controller = TargetWeightController()
+    controller.target = TARGET
+    stop_yield = stopped(controller)
+    assert stop_yield is not None
+    reached = controller.reached
+    assert reached is not None
+
+    # the shot kept dripping for 2 s at the stop flow
+    controller.learn(stop_yield + 2 * FLOW, reached.time + 3.0)
+
+    assert controller.lag == pytest.approx(
+        DEFAULT_LAG + LEARNING_RATE * (2.0 - DEFAULT_LAG)
+    )
+
+
+def test_ignores_shots_not_stopped() -> None:
+    """Shots ending long after the signal, or with no flow, teach nothing."""
+    controller = TargetWeightController()
+    controller.target = TARGET
+    stopped(controller)
+    reached = controller.reached
+    assert reached is not None
+
+    controller.learn(TARGET + 10, reached.time + STOP_WINDOW + 1)
+    assert controller.lag == DEFAULT_LAG
+
+    controller.start()
+    controller.update(0.0, TARGET, 0.0)
+    controller.learn(TARGET + 1, 1.0)
+    assert controller.lag == DEFAULT_LAG
+
+
+def test_ignores_implausible_lag() -> None:
+    """Measured lags beyond the limits are dropped."""
+    controller = TargetWeightController()
+    controller.target = TARGET
+    stop_yield = stopped(controller)
+    assert stop_yield is not None
+    reached = controller.reached
+    assert reached is not None
+
+    controller.learn(stop_yield - 1, reached.time + 1.0)
+    controller.learn(stop_yield + 100, reached.time + 1.0)
+
+    assert controller.lag == DEFAULT_LAG
@@ -0,0 +1,171 @@
+"""Tests of the sample stream websocket API."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.typing import (
+    MockHAClientWebSocket,
+    WebSocketGenerator,
+)
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.bookoo.coordinator import BookooCoordinator
+from custom_components.bookoo.websocket_api import DATA_STREAMS, MAX_UNACKED_FRAMES
+
+# frames per second, the most a client can ask for
+RATE = 10
+
+
+@pytest.fixture
+async def client(
+    hass: HomeAssistant,
+    hass_ws_client: WebSocketGenerator,
+    coordinator: BookooCoordinator,
+) -> MockHAClientWebSocket:
+    """Return a websocket client subscribed to the samples of the scale."""
+    client = await hass_ws_client(hass)
+    await client.send_json_auto_id(
+        {
+            "type": "bookoo/subscribe_stream",
+            "config_entry_id": coordinator.config_entry.entry_id,
+            "rate": RATE,
+        }
+    )
+    result = await client.receive_json()
+    assert result["success"]
+    return client
+
+
+async def receive_frame(client: MockHAClientWebSocket) -> dict[str, Any]:
+    """Return the next frame of the stream."""
+    async with asyncio.timeout(1):
+        message = await client.receive_json()
+    assert message["type"] == "event"
+    return message["event"]
+
+
+async def ack(client: MockHAClientWebSocket, subscription: int) -> None:
+    """Acknowledge a frame."""
+    await client.send_json_auto_id(
+        {"type": "bookoo/ack_stream", "subscription": subscription}
+    )
+    result = await client.receive_json()
+    assert result["success"]
+
+
+async def test_frames(
+    client: MockHAClientWebSocket, coordinator: BookooCoordinator
+) -> None:
+    """The samples arrive as columns, starting with the next sample."""
+    seq = coordinator.samples.total
+    coordinator.scale.push(1.5, 0.2, 1.0)
+    coordinator.scale.push(1.7, 0.4, 1.1)
+
+    frame = await receive_frame(client)
+
+    assert frame["seq"] == seq
+    assert frame["dropped"] == 0
+    assert frame["weight"] == [1.5, 1.7]
+    assert frame["flow_rate"] == [0.2, 0.4]
+    assert frame["timer"] == [1.0, 1.1]
+    assert len(frame["timestamp"]) == 2
+
+
+async def test_backpressure(
+    client: MockHAClientWebSocket, coordinator: BookooCoordinator
+) -> None:
+    """Unacknowledged frames hold back the stream, samples are merged."""
+    scale = coordinator.scale
+    for weight in range(MAX_UNACKED_FRAMES):
+        scale.push(float(weight), 0.0, 0.0)
+        await receive_frame(client)
+
+    for weight in (10.0, 11.0, 12.0):
+        scale.push(weight, 0.0, 0.0)
+    with pytest.raises(TimeoutError):
+        await receive_frame(client)
+
+    await ack(client, 1)
+    frame = await receive_frame(client)
+    assert frame["weight"] == [10.0, 11.0, 12.0]
+    assert frame["dropped"] == 0
+
+
+async def test_unsubscribe(
+    hass: HomeAssistant,
+    client: MockHAClientWebSocket,
+    coordinator: BookooCoordinator,
+) -> None:
+    """Unsubscribing stops the stream and forgets it."""
+    await client.send_json_auto_id({"type": "unsubscribe_events", "subscription": 1})
+    result = await client.receive_json()
+    assert result["success"]
+
+    assert hass.data[DATA_STREAMS][coordinator.config_entry.entry_id] == {}
+    coordinator.scale.push(1.0, 0.0, 0.0)
+    with pytest.raises(TimeoutError):
+        await receive_frame(client)
+
+    await client.send_json_auto_id({"type": "bookoo/ack_stream", "subscription": 1})
+    result = await client.receive_json()
+    assert not result["success"]
+    assert result["error"]["code"] == "not_found"
+
+
+async def test_resubscribing_registers_one_unload_hook(
+    hass: HomeAssistant,
+    client: MockHAClientWebSocket,
+    mock_config_entry: MockConfigEntry,
+) -> None:
+    """Streams of an entry share one unload hook."""
+    hooks = len(mock_config_entry._on_unload or [])  # noqa: SLF001
+    for _ in range(3):
+        await client.send_json_auto_id(
+            {
+                "type": "bookoo/subscribe_stream",
+                "config_entry_id": mock_config_entry.entry_id,
+            }
+        )
+        subscription = (await client.receive_json())["id"]
+        await client.send_json_auto_id(
+            {"type": "unsubscribe_events", "subscription": subscription}
+        )
+        assert (await client.receive_json())["success"]
+
+    assert len(mock_config_entry._on_unload or []) == hooks  # noqa: SLF001
+
+
+async def test_unload_ends_stream(
+    hass: HomeAssistant,
+    client: MockHAClientWebSocket,
+    mock_config_entry: MockConfigEntry,
+) -> None:
+    """Unloading the entry ends its streams with an error."""
+    await hass.config_entries.async_unload(mock_config_entry.entry_id)
+
+    message = await client.receive_json()
+    assert message["id"] == 1
+    assert not message["success"]
+    assert message["error"]["code"] == "not_found"
+    assert mock_config_entry.entry_id not in hass.data[DATA_STREAMS]
+
+
+async def test_unknown_entry(
+    hass: HomeAssistant,
+    hass_ws_client: WebSocketGenerator,
+    coordinator: BookooCoordinator,
+) -> None:
+    """Subscribing to an entry that doesn't exist fails."""
+    client = await hass_ws_client(hass)
+    await client.send_json_auto_id(
+        {"type": "bookoo/subscribe_stream", "config_entry_id": "unknown"}
+    )
+
+    result = await client.receive_json()
+    assert not result["success"]
+    assert result["error"]["code"] == "not_found"